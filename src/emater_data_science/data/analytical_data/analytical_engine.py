@@ -0,0 +1,152 @@
+import os
+from threading import Lock
+from typing import Any
+import polars as pl
+
+from emater_data_science.data.database_data.central_database_connection import (
+    DATABASE_FILE_NAME, CentralDatabaseConnection,
+)
+from emater_data_science.data.parquet_data.parquet_storage import YEAR_PARTITION, ParquetStorage
+
+# Alias of the attached SQLite database inside DuckDB.
+_SQLITE_ALIAS = "local_db"
+_SCAN_BATCH_ROWS = 100_000
+
+
+class AnalyticalEngine:
+    """
+    Optional DuckDB engine for analytical queries over the local SQLite database and
+    the Parquet datasets. The database is attached read-only and every table is exposed
+    as a view under its own name, so one SQL statement can join disk and Parquet tables.
+    Queries run vectorized and multi-threaded inside DuckDB and return Arrow tables;
+    nothing goes through SQLAlchemy rows.
+
+    DuckDB is an optional dependency (the "analytics" extra); the engine raises
+    ImportError on first use when it is not installed.
+    """
+    _instance: "AnalyticalEngine | None" = None
+    _initialized: bool
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "AnalyticalEngine":
+        if cls._instance is None:
+            cls._instance = super(AnalyticalEngine, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+        try:
+            import duckdb
+        except ImportError as importError:
+            raise ImportError(
+                "The analytical engine needs DuckDB; install the 'analytics' extra (pip install duckdb pyarrow)."
+            ) from importError
+        self.databasePath = os.path.join(CentralDatabaseConnection.databaseDirectory, DATABASE_FILE_NAME)
+        self._connection = duckdb.connect(database=":memory:")
+        self._databaseAttached = False
+        if os.path.exists(self.databasePath):
+            try:
+                self._connection.execute(
+                    f"ATTACH '{self._escape(self.databasePath)}' AS {_SQLITE_ALIAS} (TYPE sqlite, READ_ONLY)"
+                )
+                self._databaseAttached = True
+            except duckdb.Error as attachError:
+                # The sqlite extension is downloaded on first use; offline, only Parquet tables are available.
+                print(f"analytical engine: local database not attached, disk tables unavailable ({attachError})")
+        self._lock = Lock()
+        # Tables exposed as views, with the source they were registered from.
+        self._views: dict[str, str] = {}
+        self._signatures: dict[str, object] = {}
+        self._initialized = True
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        return text.replace("'", "''")
+
+    @staticmethod
+    def _quote(identifier: str) -> str:
+        return '"' + identifier.replace('"', '""') + '"'
+
+    def fRegisterTables(self, tablesMapping: dict[str, str]) -> None:
+        """
+        Expose the disk and Parquet tables of the mapping (table name -> source) as views.
+        A Parquet view lists the dataset files, so it is re-created when files were written
+        since the last call; API tables are ignored.
+        """
+        with self._lock:
+            for tableName, source in tablesMapping.items():
+                if source == "disk":
+                    if not self._databaseAttached or self._views.get(tableName) == source:
+                        continue
+                    definition = f"SELECT * FROM {_SQLITE_ALIAS}.{self._quote(tableName)}"
+                    signature: object = source
+                elif source == "parquet":
+                    files = self._parquetFiles(tableName)
+                    if not files or self._signatures.get(tableName) == files:
+                        # DuckDB cannot read an empty file list; the view is created once the dataset has files.
+                        continue
+                    definition = self._parquetDefinition(tableName, files)
+                    signature = files
+                else:
+                    continue
+                self._connection.execute(f"CREATE OR REPLACE VIEW {self._quote(tableName)} AS {definition}")
+                self._views[tableName] = source
+                self._signatures[tableName] = signature
+
+    @staticmethod
+    def _parquetFiles(tableName: str) -> tuple[str, ...]:
+        storage = ParquetStorage()
+        # Like the storage's own reads, the view sees every write queued before the query.
+        with storage._lock:
+            writes = list(storage._pendingWrites.get(tableName, []))
+        storage._waitForWrites(writes)
+        dataPath = os.path.join(storage._tablePath(tableName), "data")
+        return tuple(sorted(
+            os.path.abspath(os.path.join(directory, name))
+            for directory, _, names in os.walk(dataPath)
+            for name in names
+            if name.endswith(".parquet")
+        ))
+
+    def _parquetDefinition(self, tableName: str, files: tuple[str, ...]) -> str:
+        layout = ParquetStorage()._loadLayout(tableName)
+        fileList = ", ".join(f"'{self._escape(path)}'" for path in files)
+        # The year partition is derived from the date column, not a column of the table.
+        exclude = f" EXCLUDE ({YEAR_PARTITION})" if layout["dateColumn"] else ""
+        return f"SELECT *{exclude} FROM read_parquet([{fileList}], hive_partitioning = true, union_by_name = true)"
+
+    def fQuery(self, query: "str | pl.LazyFrame", parameters: list[Any] | None = None) -> Any:
+        """
+        Run a DuckDB SQL statement, or collect a Polars lazy plan built from fScan, and
+        return the result as a pyarrow Table. The scans of a plan run inside DuckDB with
+        the plan's filters and columns pushed into them; the rest of the plan runs in Polars.
+        """
+        if isinstance(query, pl.LazyFrame):
+            return query.collect().to_arrow()
+        # Each call gets its own cursor; a DuckDB connection is not shared between threads.
+        cursor = self._connection.cursor()
+        try:
+            return cursor.execute(query, parameters).fetch_arrow_table()
+        finally:
+            cursor.close()
+
+    def fScan(self, tableName: str) -> pl.LazyFrame:
+        """
+        Lazy scan of a registered table for Polars plans. The scan reads the table's DuckDB
+        view: the columns the plan selects and the filters DuckDB can evaluate become part
+        of the DuckDB query (so Parquet files and row groups are pruned, and SQLite rows are
+        filtered before they reach Polars); other filters are applied to each Arrow batch.
+        """
+        if tableName not in self._views:
+            raise ValueError(f"Table '{tableName}' is not registered in the analytical engine.")
+        # The cursor stays open with the relation, which only runs when the plan is collected.
+        relation = self._connection.cursor().sql(f"SELECT * FROM {self._quote(tableName)}")
+        return relation.pl(_SCAN_BATCH_ROWS, lazy=True)
+
+    def fClose(self) -> None:
+        with self._lock:
+            self._connection.close()
+            self._views.clear()
+            self._signatures.clear()
+        AnalyticalEngine._instance = None
+        self._initialized = False
@@ -1,20 +1,25 @@
+from collections.abc import Callable
 import threading
 import time
 import json
 import polars as pl
 import asyncio
+from concurrent.futures import Future
+from typing import Any
 
 # Adjust the import paths according to your project structure.
 from emater_data_science.data.api_data.generic_api_fetcher import GenericApiFetcher
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
 class ApiDataInterface:
-    _instance = None
+    _instance: "ApiDataInterface | None" = None
+    _initialized: bool
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, *args: Any, **kwargs: Any) -> "ApiDataInterface":
         if cls._instance is None:
             cls._instance = super(ApiDataInterface, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self) -> None:
         if hasattr(self, "_initialized") and self._initialized:
             return
         self._initialized = True
@@ -25,8 +30,20 @@ class ApiDataInterface:
     def fStoreTable(self,model, data) -> None:
         print(f"Simulating API POST /store. Data: {json.dumps([d.__dict__ for d in data], indent=2)}")
 
-    def fFetchTable(self, tableName, callback, tableFilter) -> None:
-        threading.Thread(target=lambda: (time.sleep(1), callback(pl.DataFrame())), daemon=True).start()
+    def fFetchTable(
+        self, tableName: str, callback: Callable[[pl.DataFrame], None] | None, tableFilter: Any
+    ) -> "Future[pl.DataFrame]":
+        future: "Future[pl.DataFrame]" = Future()
+
+        def _simulateFetch() -> None:
+            time.sleep(1)
+            df = pl.DataFrame()
+            # Like the other sources: the callback runs on the callback executor and a
+            # failing callback resolves the Future with its exception.
+            CallbackDispatcher().fDeliver(future, df, callback)
+
+        threading.Thread(target=_simulateFetch, daemon=True).start()
+        return future
 
     def fDeleteRows(self, tableName, tableFilter) -> None:
         print(f"Simulating API DELETE /delete for table {tableName} with filter: {json.dumps(tableFilter, indent=2)}")
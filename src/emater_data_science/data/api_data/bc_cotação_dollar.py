@@ -3,10 +3,12 @@ import pandas as pd
 from datetime import date, datetime
 import polars as pl
 from pathlib import Path
+from sqlalchemy import Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 import os
 from io import StringIO
 from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate
 import gc
 
 
@@ -72,6 +74,8 @@ class Base(DeclarativeBase):
 
 class CotacaoDolar(Base):
     __tablename__ = "cotacao_dolar"
+    # Natural key: fWrite upserts on it, so reloading a CSV does not duplicate rows.
+    __table_args__ = (Index("ux_cotacao_dolar_natural_key", "data", unique=True, info={"naturalKey": True}),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     data: Mapped[date]
@@ -79,6 +83,18 @@ class CotacaoDolar(Base):
     cotacao_venda: Mapped[float]
 
 
+# Monthly means kept current by fStoreTable; read them with DataInterface().fFetchAggregate.
+COTACAO_DOLAR_MENSAL = MaterializedAggregate(
+    name="cotacao_dolar_mensal",
+    sourceTable="cotacao_dolar",
+    dateColumn="data",
+    aggregations=[
+        pl.col("cotacao_compra").mean().alias("dolar_compra_mensal"),
+        pl.col("cotacao_venda").mean().alias("dolar_venda_mensal"),
+    ],
+)
+
+
 def fProcessAndSaveCotacaoDolarCsv(csvPath: Path) -> None:
     df = pl.read_csv(
         csvPath,
@@ -118,14 +134,16 @@ def fProcessAndSaveCotacaoDolarCsv(csvPath: Path) -> None:
 
 def fLoadAllCotacaoDolarCsvs() -> None:
     basePath = Path("C:/emater_data_science")
-    for year in range(2000, 2025):
-        
-        print(f"Loading data for year {year}...")
-        filePath = basePath / f"cotacao_dolar_{year}.csv"
-        if filePath.exists():
-            fProcessAndSaveCotacaoDolarCsv(filePath)
-        else:
-            print(f"File not found: {filePath}")
+    # The indexes are rebuilt when the bulk load ends.
+    with DataInterface().fBulkLoad([CotacaoDolar]):
+        for year in range(2000, 2025):
+
+            print(f"Loading data for year {year}...")
+            filePath = basePath / f"cotacao_dolar_{year}.csv"
+            if filePath.exists():
+                fProcessAndSaveCotacaoDolarCsv(filePath)
+            else:
+                print(f"File not found: {filePath}")
 
 
 if __name__ == "__main__":
@@ -3,10 +3,13 @@ import pandas as pd
 from datetime import date
 import polars as pl
 from pathlib import Path
+from sqlalchemy import Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 import os
 from io import StringIO
+from emater_data_science.data.compact_encoding import CompactEncoding
 from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate
 import gc
 
 def fetch_credit_rural_data(year: int) -> pd.DataFrame:
@@ -55,7 +58,21 @@ class Base(DeclarativeBase):
     pass
 
 class CreditoRural(Base):
+    """
+    Crédito rural de MG somado por município e mês de emissão; as linhas do SICOR
+    (por produto, programa e fonte) não são guardadas.
+    """
     __tablename__ = "credito_rural"
+    __table_args__ = (
+        Index("ix_credito_rural_data", "data"),
+        # Natural key: fWrite upserts on it, so reloading a CSV does not duplicate rows.
+        Index(
+            "ux_credito_rural_natural_key", "cod_munic_ibge", "data",
+            unique=True, info={"naturalKey": True},
+        ),
+    )
+    # Layout used when the table is stored with storageTarget="parquet".
+    __parquet_date_column__ = "data"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     data: Mapped[date]  # You can derive this from MesEmissao + AnoEmissao
@@ -68,6 +85,26 @@ class CreditoRural(Base):
     area_custeio: Mapped[float | None]
     area_investimento: Mapped[float | None]
 
+
+# Amounts in reais and areas in hectares keep Float64: state totals exceed a Float32's precision.
+CREDITO_RURAL_COMPACT = CompactEncoding(
+    tableName=CreditoRural.__tablename__,
+    categoricalColumns=["municipio"],
+)
+
+
+# Monthly totals for the whole state, kept current by fStoreTable; read them with DataInterface().fFetchAggregate.
+CREDITO_RURAL_MENSAL = MaterializedAggregate(
+    name="credito_rural_mensal",
+    sourceTable="credito_rural",
+    dateColumn="data",
+    aggregations=[
+        pl.col("vl_custeio").sum().alias("custeio_mensal"),
+        pl.col("vl_investimento").sum().alias("investimento_mensal"),
+        pl.col("vl_comercializacao").sum().alias("comercializacao_mensal"),
+    ],
+)
+
 def fProcessAndSaveCreditoRuralCsv(csvPath: Path) -> None:
     df = pl.read_csv(
         csvPath,
@@ -120,6 +157,20 @@ def fProcessAndSaveCreditoRuralCsv(csvPath: Path) -> None:
         "AreaInvestimento": "area_investimento"
     })
 
+    # A tabela guarda um total por município e mês (a chave natural), não as linhas do CSV,
+    # que vêm por produto, programa e fonte de recurso: as linhas de cada chave são somadas.
+    # Uma coluna sem nenhum valor na chave continua nula em vez de virar 0.
+    sourceRows = df.height
+    valueColumns = [name for name in df.columns if name.startswith(("vl_", "area_"))]
+    df = df.group_by(["data", "cod_munic_ibge"], maintain_order=True).agg(
+        pl.col("municipio").first(),
+        *(
+            pl.when(pl.col(name).is_null().all()).then(None).otherwise(pl.col(name).sum()).alias(name)
+            for name in valueColumns
+        ),
+    )
+    print(f"crédito rural {csvPath.name}: {sourceRows} linhas do CSV somadas em {df.height} municípios/mês")
+
     DataInterface().fStoreTable(model=CreditoRural, data=df)
 
     # Clean up memory
@@ -128,13 +179,15 @@ def fProcessAndSaveCreditoRuralCsv(csvPath: Path) -> None:
 
 def fLoadAllCreditoRuralCsvs() -> None:
     basePath = Path("C:/emater_data_science")
-    for year in range(2013, 2025):
-        print(f"Loading crédito rural data for year {year}...")
-        filePath = basePath / f"credito_rural_{year}.csv"
-        if filePath.exists():
-            fProcessAndSaveCreditoRuralCsv(filePath)
-        else:
-            print(f"File not found: {filePath}")
+    # The indexes are rebuilt when the bulk load ends.
+    with DataInterface().fBulkLoad([CreditoRural]):
+        for year in range(2013, 2025):
+            print(f"Loading crédito rural data for year {year}...")
+            filePath = basePath / f"credito_rural_{year}.csv"
+            if filePath.exists():
+                fProcessAndSaveCreditoRuralCsv(filePath)
+            else:
+                print(f"File not found: {filePath}")
 
 
 if __name__ == "__main__":
@@ -3,10 +3,12 @@ import pandas as pd
 from datetime import date, datetime
 import polars as pl
 from pathlib import Path
+from sqlalchemy import Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 import os
 from io import StringIO
 from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate
 import gc
 
 def fetch_data(start_date, end_date):
@@ -57,11 +59,22 @@ class Base(DeclarativeBase):
 
 class TaxaSelic(Base):
     __tablename__ = "taxa_selic"
+    # Natural key: fWrite upserts on it, so reloading a CSV does not duplicate rows.
+    __table_args__ = (Index("ux_taxa_selic_natural_key", "data", unique=True, info={"naturalKey": True}),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     data: Mapped[date]
     valor: Mapped[float]
 
+
+# Monthly mean kept current by fStoreTable; read it with DataInterface().fFetchAggregate.
+TAXA_SELIC_MENSAL = MaterializedAggregate(
+    name="taxa_selic_mensal",
+    sourceTable="taxa_selic",
+    dateColumn="data",
+    aggregations=[pl.col("valor").mean().alias("selic_mensal")],
+)
+
 def fProcessAndSaveTaxaSelicCsv(csvPath: Path) -> None:
     df = pl.read_csv(
         csvPath,
@@ -87,13 +100,15 @@ def fProcessAndSaveTaxaSelicCsv(csvPath: Path) -> None:
 
 def fLoadAllTaxaSelicCsvs() -> None:
     basePath = Path("C:/emater_data_science")
-    for year in range(2000, 2025):
-        print(f"Loading SELIC data for year {year}...")
-        filePath = basePath / f"taxa_selic_{year}.csv"
-        if filePath.exists():
-            fProcessAndSaveTaxaSelicCsv(filePath)
-        else:
-            print(f"File not found: {filePath}")
+    # The indexes are rebuilt when the bulk load ends.
+    with DataInterface().fBulkLoad([TaxaSelic]):
+        for year in range(2000, 2025):
+            print(f"Loading SELIC data for year {year}...")
+            filePath = basePath / f"taxa_selic_{year}.csv"
+            if filePath.exists():
+                fProcessAndSaveTaxaSelicCsv(filePath)
+            else:
+                print(f"File not found: {filePath}")
 
 
 
@@ -1,4 +1,5 @@
 import asyncio
+from collections.abc import Iterator
 from datetime import date, time
 import aiohttp
 from pathlib import Path
@@ -7,21 +8,70 @@ from zipfile import ZipFile
 from io import  StringIO
 import polars as pl
 from typing import Final, cast, Any
+from sqlalchemy import Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from emater_data_science.data.compact_encoding import CompactEncoding
+from emater_data_science.data.dimension_join import DimensionJoin
+
 # ---------------------------
 # SQLAlchemy Base and Model
 # ---------------------------
 class Base(DeclarativeBase):
     pass
 
+class EstacaoInmet(Base):
+    """
+    Station dimension: one row per INMET station, referenced by estacao_id in the
+    weather tables instead of repeating the station attributes on every reading.
+    """
+    __tablename__ = "estacao_inmet"
+    __table_args__ = (
+        # Natural key: a station keeps its id when its metadata is loaded again.
+        Index("ux_estacao_inmet_natural_key", "codigo", unique=True, info={"naturalKey": True}),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    codigo: Mapped[str]
+    estacao: Mapped[str]
+    uf: Mapped[str | None] = mapped_column(nullable=True)
+    regiao: Mapped[str | None] = mapped_column(nullable=True)
+    latitude: Mapped[float | None] = mapped_column(nullable=True)
+    longitude: Mapped[float | None] = mapped_column(nullable=True)
+    altitude: Mapped[float | None] = mapped_column(nullable=True)
+    data_fundacao: Mapped[date | None] = mapped_column(nullable=True)
+
+
+# Columns of the station dimension that the CSV repeats on every row.
+STATION_COLUMNS = ["codigo", "estacao", "uf", "regiao", "latitude", "longitude", "altitude", "data_fundacao"]
+
+ESTACAO_INMET_COMPACT = CompactEncoding(
+    tableName=EstacaoInmet.__tablename__,
+    float32Columns=["latitude", "longitude", "altitude"],
+    categoricalColumns=["codigo", "estacao", "uf", "regiao"],
+)
+
+
 class EstacaoInmetComDadosMeteorologicos(Base):
     __tablename__ = "estacao_inmet_com_dados_meteorologicos"
+    __table_args__ = (
+        Index("ix_estacao_inmet_com_dados_meteorologicos_data_estacao_id", "data", "estacao_id"),
+        # Natural key: fWrite upserts on it, so reloading a period does not duplicate rows.
+        Index(
+            "ux_estacao_inmet_com_dados_meteorologicos_natural_key", "estacao_id", "data", "hora",
+            unique=True, info={"naturalKey": True},
+        ),
+    )
+    # Stored as a Parquet dataset partitioned by year (and station), so reads of a date
+    # range only open those years and a year is re-ingested with fReplacePartition.
+    __parquet_date_column__ = "data"
+    __parquet_partition_by__ = ("estacao_id",)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     data: Mapped[date]  # Mandatory
     hora: Mapped[time]  # Mandatory
-    data_fundacao: Mapped[date]
+    # Key of the station in estacao_inmet; fFetchTable(..., withDimensions=True) joins its attributes.
+    estacao_id: Mapped[int]
 
     precipitacao: Mapped[float | None] = mapped_column(nullable=True)
     pressao: Mapped[float | None] = mapped_column(nullable=True)
@@ -41,12 +91,26 @@ class EstacaoInmetComDadosMeteorologicos(Base):
     vento_rajada: Mapped[float | None] = mapped_column(nullable=True)
     vento_vel: Mapped[float | None] = mapped_column(nullable=True)
 
-    # Station metadata.
-    estacao: Mapped[str]  # Mandatory
-    codigo: Mapped[str | None] = mapped_column(nullable=True)
-    latitude: Mapped[float | None] = mapped_column(nullable=True)
-    longitude: Mapped[float | None] = mapped_column(nullable=True)
-    altitude: Mapped[float | None] = mapped_column(nullable=True)
+
+# Sensor readings have at most two decimals, which a Float32 holds without visible loss.
+INMET_MEASURE_COLUMNS = [
+    "precipitacao", "pressao", "pressao_max", "pressao_min", "radiacao", "temp_bulbo_seco", "temp_orvalho",
+    "temp_max_ant", "temp_min_ant", "orvalho_max_ant", "orvalho_min_ant", "umidade_max_ant", "umidade_min_ant",
+    "umidade", "vento_dir", "vento_rajada", "vento_vel",
+]
+
+# Readings are hourly (UTC), so data and hora pack into one Int32 hour timestamp.
+ESTACAO_INMET_HORARIO_COMPACT = CompactEncoding(
+    tableName=EstacaoInmetComDadosMeteorologicos.__tablename__,
+    float32Columns=INMET_MEASURE_COLUMNS,
+    hourTimestamp=("data", "hora", "data_hora"),
+)
+
+ESTACAO_INMET_HORARIO = DimensionJoin(
+    factTable=EstacaoInmetComDadosMeteorologicos.__tablename__,
+    keyColumn="estacao_id",
+    dimensionTable=EstacaoInmet.__tablename__,
+)
 
 # ---------------------------
 # Helper Functions
@@ -180,21 +244,7 @@ def enforce_schema_and_parse(df: pl.DataFrame) -> pl.DataFrame:
             print("Error parsing 'data' with both '/' and '-' formats.")
             print("Available columns:", df.columns)
             raise e_date
-    try:
-        # First, try with "/" delimiter.
-        df = df.with_columns(
-            pl.col("data_fundacao").str.strptime(pl.Date, format="%d/%m/%y").alias("data_fundacao")
-        )
-    except pl.exceptions.InvalidOperationError:
-        # If that fails, try with "-" delimiter.
-        try:
-            df = df.with_columns(
-                pl.col("data_fundacao").str.strptime(pl.Date, format="%Y-%m-%d").alias("data_fundacao")
-            )
-        except pl.exceptions.InvalidOperationError as e_data_fundacao:
-            print("Error parsing 'data_fundacao' with both '/' and '-' formats.")
-            print("Available columns:", df.columns)
-            raise e_data_fundacao
+    df = parse_foundation_date(df)
 
     # Parse the time column.
     try:
@@ -221,6 +271,25 @@ def enforce_schema_and_parse(df: pl.DataFrame) -> pl.DataFrame:
 
     return df
 
+def parse_foundation_date(df: pl.DataFrame) -> pl.DataFrame:
+    """Parses the 'data_fundacao' strings, written as dd/mm/yy or yyyy-mm-dd."""
+    try:
+        # First, try with "/" delimiter.
+        df = df.with_columns(
+            pl.col("data_fundacao").str.strptime(pl.Date, format="%d/%m/%y").alias("data_fundacao")
+        )
+    except pl.exceptions.InvalidOperationError:
+        # If that fails, try with "-" delimiter.
+        try:
+            df = df.with_columns(
+                pl.col("data_fundacao").str.strptime(pl.Date, format="%Y-%m-%d").alias("data_fundacao")
+            )
+        except pl.exceptions.InvalidOperationError as e_data_fundacao:
+            print("Error parsing 'data_fundacao' with both '/' and '-' formats.")
+            print("Available columns:", df.columns)
+            raise e_data_fundacao
+    return df
+
 def clean_dataframe(df: pl.DataFrame) -> pl.DataFrame:
     """
     Drops rows only if both 'data' and 'hora' are null.
@@ -289,7 +358,43 @@ def rename_columns_to_model(df: pl.DataFrame) -> pl.DataFrame:
     actual_rename_map = {k: v for k, v in rename_map.items() if k in df.columns}
     return df.rename(actual_rename_map)
 
-def fSaveInmetCsvToDb(textStream: str) -> None:
+def fStationKey(station: pl.DataFrame) -> int:
+    """
+    Key of the station in the estacao_inmet dimension, adding the station, or updating
+    its attributes, when the one-row frame differs from the stored row.
+    """
+    from emater_data_science.data.data_interface import DataInterface
+    codigo = station["codigo"][0]
+    stored = pl.DataFrame(schema={"id": pl.Int64, **station.schema})
+    if EstacaoInmet.__tablename__ in DataInterface().tablesMapping:
+        stored = DataInterface().fFetchTable(EstacaoInmet.__tablename__, columns=["id", *STATION_COLUMNS]).result()
+    match = stored.filter(pl.col("codigo") == codigo)
+    if match.height:
+        stationKey = int(match["id"][0])
+        if match.drop("id").cast(station.schema).equals(station):  # type: ignore[arg-type]
+            return stationKey
+    else:
+        stationKey = int(stored["id"].max() or 0) + 1  # type: ignore[arg-type]
+    DataInterface().fStoreTable(model=EstacaoInmet, data=station.with_columns(pl.lit(stationKey).alias("id")))
+    return stationKey
+
+def fParseInmetStation(lines: list[str]) -> pl.DataFrame:
+    """
+    One-row station frame, as fStationKey takes it, from the header lines of an INMET CSV
+    (the first nine are enough), without parsing the readings.
+    """
+    metadata = extract_metadata(lines)
+    station = pl.DataFrame({column: [metadata[column]] for column in STATION_COLUMNS})
+    # Same cleaning the readings get: the header values keep the ';' after the label.
+    station = station.with_columns(pl.col(pl.Utf8).exclude("data_fundacao").str.strip_prefix(";"))
+    return parse_foundation_date(station)
+
+def fParseInmetCsv(textStream: str, stationKey: int | None = None) -> pl.DataFrame:
+    """
+    Hourly readings of one INMET CSV, keyed by the station's estacao_id. Without stationKey
+    the station is looked up (and stored) with fStationKey, which waits on storage: pass
+    the key when the frame is consumed by a storage writer.
+    """
     # Split file into lines and extract metadata.
     lines = textStream.splitlines()
     metadata = extract_metadata(lines)
@@ -310,7 +415,10 @@ def fSaveInmetCsvToDb(textStream: str) -> None:
     if "id" in df4.columns:
         df4 = df4.drop("id")
     
-    df = df4
+    # The station attributes go to the station dimension; the rows keep only its key.
+    if stationKey is None:
+        stationKey = fStationKey(df4.select(STATION_COLUMNS).head(1))
+    df = df4.drop(STATION_COLUMNS).with_columns(pl.lit(stationKey, dtype=pl.Int64).alias("estacao_id"))
 
     if df.height == 0:
         print('NOME DA CIDADE ?????????????????????????')
@@ -322,9 +430,13 @@ def fSaveInmetCsvToDb(textStream: str) -> None:
         print("DataFrame shape:", df.shape)
         print("DataFrame columns:", df.columns)
         print(df.head())
+    return df
+
+def fSaveInmetCsvToDb(textStream: str) -> None:
+    df = fParseInmetCsv(textStream)
     # Store the DataFrame using the DataInterface.
     from emater_data_science.data.data_interface import DataInterface
-    DataInterface().fStoreTable(model=EstacaoInmetComDadosMeteorologicos, data=df)
+    DataInterface().fStoreTable(model=EstacaoInmetComDadosMeteorologicos, data=df, storageTarget="parquet")
     
     # Clear memory.
     del df
@@ -411,8 +523,20 @@ def fMgCitiesFoundationYear() -> dict[str, int]:
 # Main Extraction and Download
 # ---------------------------
 def fExtractAndSaveInmetCsvsFromZip(year: int) -> None:
+    """
+    Download the INMET zip of one year and load its MG stations with fReplaceInmetYearFromZip.
+    """
     # Wait for the async download function to complete.
     zipPath = asyncio.run(fDownloadInmetZip(year))
+    fReplaceInmetYearFromZip(zipPath, year)
+
+def fReplaceInmetYearFromZip(zipPath: Path, year: int) -> None:
+    """
+    Load every MG station of one year from an INMET zip and swap them in as that year's
+    partition, so running a year again replaces it instead of appending to it. The stations
+    are parsed one at a time while the partition is written, so only one station is in memory.
+    """
+    from emater_data_science.data.data_interface import DataInterface
     with ZipFile(str(zipPath), "r") as zipFile:
         # Process files inside the zip.
         all_names = zipFile.namelist()
@@ -424,8 +548,9 @@ def fExtractAndSaveInmetCsvsFromZip(year: int) -> None:
 
         # Get the dictionary of MG cities and their foundation years.
         mg_cities = fMgCitiesFoundationYear()  # Expected to return something like: {"CARATINGA": 2007, ...}
-        
+
         # For each city in the dictionary, look for a matching CSV file.
+        station_files: list[str] = []
         for mg_name, foundation_year in mg_cities.items():
             # Find CSV files whose basename contains the mg_name substring.
             matching = [
@@ -447,10 +572,25 @@ def fExtractAndSaveInmetCsvsFromZip(year: int) -> None:
             elif len(matching) > 1:
                 raise Exception(f"Multiple files found for '{mg_name}': {matching}")
             else:
-                csv_file = matching[0]
+                station_files.append(matching[0])
+
+        # The station keys are resolved here, reading only the CSV headers: fStationKey waits on
+        # storage, which the generator below must not do because the writer consumes it.
+        station_keys: dict[str, int] = {}
+        for csv_file in station_files:
+            with zipFile.open(csv_file) as file:
+                header = [file.readline().decode("latin1") for _ in range(9)]
+            station_keys[csv_file] = fStationKey(fParseInmetStation(header))
+
+        def stationFrames() -> Iterator[pl.DataFrame]:
+            for csv_file in station_files:
                 with zipFile.open(csv_file) as file:
                     fileContent = file.read().decode("latin1")
-                    fSaveInmetCsvToDb(fileContent)
+                yield fParseInmetCsv(fileContent, station_keys[csv_file])
+
+        # The generator runs on the storage writer while the zip is open; an error in any
+        # station leaves the stored year as it was.
+        DataInterface().fReplacePartition(EstacaoInmetComDadosMeteorologicos, year, stationFrames()).result()
 
 async def fDownloadInmetZip(year: int) -> Path:
     timeout = aiohttp.ClientTimeout(total=600)
@@ -478,10 +618,10 @@ async def fDownloadInmetZip(year: int) -> Path:
 # ---------------------------
 if __name__ == "__main__":
     
+    from emater_data_science.data.data_interface import DataInterface
     year = 2000
     while year < 2015:
         fExtractAndSaveInmetCsvsFromZip(year)
         year += 1
-    from emater_data_science.data.data_interface import DataInterface
     DataInterface().fShutdown()
     
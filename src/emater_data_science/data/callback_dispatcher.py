@@ -0,0 +1,169 @@
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+import os
+from threading import Condition
+import time
+from typing import Any
+import polars as pl
+
+
+def _timedCall(callback: Callable[[pl.DataFrame], None], df: pl.DataFrame) -> float:
+    # Module level so a ProcessPoolExecutor can pickle it together with the callback.
+    started = time.perf_counter()
+    callback(df)
+    return time.perf_counter() - started
+
+
+class CallbackDispatcher:
+    """
+    Runs fetch callbacks on their own executor, so the storage workers (the database
+    writer and readers, the Parquet read pool) only do storage work and are free for
+    the next queued operation as soon as the data is read.
+
+    The default executor is a small thread pool. fSetExecutor installs another one,
+    e.g. a ProcessPoolExecutor for heavy transforms; the callback and the DataFrame are
+    then pickled to the worker process, so the callback must be a module-level function
+    and its side effects stay in that process.
+
+    The fetch Future still resolves only after its callback has run, with the callback's
+    exception if it raised.
+    """
+    _instance: "CallbackDispatcher | None" = None
+    _initialized: bool
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "CallbackDispatcher":
+        if cls._instance is None:
+            cls._instance = super(CallbackDispatcher, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+        self.maxWorkers = min(4, os.cpu_count() or 1)
+        self._executor: Executor | None = None
+        self._ownsExecutor = False
+        self._condition = Condition()
+        self._running = 0
+        self._stats = {"callbacks": 0, "failed": 0, "busySeconds": 0.0}
+        self._startedAt = time.perf_counter()
+        self._initialized = True
+
+    def fSetExecutor(self, executor: Executor) -> None:
+        """
+        Deliver the callbacks on executor from now on. The default pool it replaces is
+        shut down once its running callbacks finish; an executor passed in here is left
+        to its owner to shut down.
+        """
+        with self._condition:
+            previous, self._executor = self._executor, executor
+            ownedPrevious, self._ownsExecutor = self._ownsExecutor, False
+        if previous is not None and ownedPrevious:
+            previous.shutdown(wait=False)
+
+    def _getExecutor(self) -> Executor:
+        with self._condition:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="fetch-callback")
+                self._ownsExecutor = True
+            return self._executor
+
+    def fDeliver(
+        self,
+        future: "Future[pl.DataFrame]",
+        df: pl.DataFrame,
+        callback: Callable[[pl.DataFrame], None] | None,
+    ) -> None:
+        """
+        Resolve future with df once callback, if any, has run on the callback executor.
+        """
+        if callback is None:
+            future.set_result(df)
+            return
+        with self._condition:
+            self._running += 1
+        try:
+            submitted = self._getExecutor().submit(_timedCall, callback, df)
+        except BaseException:
+            self._finish(None)
+            raise
+
+        def resolve(done: "Future[float]") -> None:
+            error = done.exception()
+            self._finish(None if error is not None else done.result())
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(df)
+
+        submitted.add_done_callback(resolve)
+
+    def fChain(
+        self,
+        source: "Future[pl.DataFrame]",
+        callback: Callable[[pl.DataFrame], None] | None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Future resolving with the result of source after callback ran on it, or with
+        the exception of source or of the callback.
+        """
+        if callback is None:
+            return source
+        chained: "Future[pl.DataFrame]" = Future()
+        chained.set_running_or_notify_cancel()
+
+        def deliver(done: "Future[pl.DataFrame]") -> None:
+            error = done.exception()
+            if error is not None:
+                chained.set_exception(error)
+                return
+            try:
+                self.fDeliver(chained, done.result(), callback)
+            except BaseException as dispatchError:
+                chained.set_exception(dispatchError)
+
+        source.add_done_callback(deliver)
+        return chained
+
+    def _finish(self, elapsed: float | None) -> None:
+        with self._condition:
+            self._running -= 1
+            self._stats["callbacks"] += 1
+            if elapsed is None:
+                self._stats["failed"] += 1
+            else:
+                self._stats["busySeconds"] += elapsed
+            self._condition.notify_all()
+
+    def fIsIdle(self) -> bool:
+        with self._condition:
+            return self._running == 0
+
+    def fWaitIdle(self, timeout: float | None = None) -> bool:
+        """
+        Wait until no callback is running or queued; returns False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._running == 0, timeout=timeout)
+
+    def fGetStats(self) -> dict[str, float]:
+        """
+        Callbacks run and failed, seconds spent in them, and the share of the pool's
+        capacity they used since start (for the default thread pool).
+        """
+        with self._condition:
+            uptime = time.perf_counter() - self._startedAt
+            return {
+                "callbacks": self._stats["callbacks"],
+                "failed": self._stats["failed"],
+                "running": self._running,
+                "busySeconds": self._stats["busySeconds"],
+                "utilization": self._stats["busySeconds"] / (uptime * self.maxWorkers) if uptime else 0.0,
+            }
+
+    def fShutdown(self) -> None:
+        self.fWaitIdle()
+        with self._condition:
+            executor, self._executor = self._executor, None
+            owned, self._ownsExecutor = self._ownsExecutor, False
+        if executor is not None and owned:
+            executor.shutdown(wait=True)
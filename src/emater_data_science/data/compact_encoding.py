@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field
+import polars as pl
+
+
+# Declared encodings, by table name.
+_ENCODINGS: dict[str, "CompactEncoding"] = {}
+
+# Bytes per row of the Date and Time columns a packed hour timestamp replaces.
+_DATE_TIME_BYTES = 4 + 8
+# Bytes per row of a Categorical column's codes.
+_CATEGORY_CODE_BYTES = 4
+
+
+@dataclass(eq=False)
+class CompactEncoding:
+    """
+    Compact in-memory types for a table, used by fFetchTable in compact mode:
+
+    float32Columns are measures whose precision fits in a Float32 (sensor readings with
+    one or two decimals, coordinates); money and large areas are left as Float64.
+    categoricalColumns are repeated strings, loaded dictionary-encoded; a column whose
+    strings are shorter on average than a category code (or mostly null) stays a string.
+    hourTimestamp = (date column, time column, packed column) replaces the two columns
+    with one Int32 of hours since 1970-01-01, when every time is on the hour;
+    fHourTimestampToDatetime turns it back into a datetime.
+
+    The types are applied while the storage layer builds the frame, so the wide
+    Float64 and string columns are never materialized. Parquet datasets created for
+    the table also store the float32Columns as Float32, which halves what is read.
+
+    Declaring an encoding registers it, so declare it at module level next to the model.
+    """
+    tableName: str
+    float32Columns: list[str] = field(default_factory=list)
+    categoricalColumns: list[str] = field(default_factory=list)
+    hourTimestamp: tuple[str, str, str] | None = None
+
+    def __post_init__(self) -> None:
+        if self.tableName in _ENCODINGS:
+            raise ValueError(f"Table '{self.tableName}' already declares a compact encoding.")
+        _ENCODINGS[self.tableName] = self
+
+    def fDtypes(self) -> dict[str, pl.DataType]:
+        """
+        Compact dtype of each declared column, for the storage readers.
+        """
+        dtypes: dict[str, pl.DataType] = {name: pl.Float32() for name in self.float32Columns}
+        dtypes.update({name: pl.Categorical() for name in self.categoricalColumns})
+        return dtypes
+
+    @staticmethod
+    def _categoricalPays(column: pl.Series) -> bool:
+        # A category code takes _CATEGORY_CODE_BYTES per row, nulls included; a string only its bytes.
+        lengths = column.cat.len_bytes() if column.dtype == pl.Categorical else column.str.len_bytes()
+        return int(lengths.sum() or 0) > column.len() * _CATEGORY_CODE_BYTES
+
+    def fEncode(self, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        Apply the encoding to a frame; columns already in their compact type are kept, and
+        categorical columns that would not be smaller are left (or put back) as strings.
+        """
+        casts: dict[str, pl.DataType] = {}
+        for name, dtype in self.fDtypes().items():
+            if name not in df.columns:
+                continue
+            if name in self.categoricalColumns and df.schema[name] in (pl.Categorical, pl.Utf8):
+                if not self._categoricalPays(df.get_column(name)):
+                    dtype = pl.Utf8()
+            if df.schema[name] != dtype:
+                casts[name] = dtype
+        if casts:
+            df = df.cast(casts)  # type: ignore[arg-type]
+        if self.hourTimestamp is None:
+            return df
+        dateColumn, timeColumn, packedColumn = self.hourTimestamp
+        if dateColumn not in df.columns or timeColumn not in df.columns:
+            return df
+        offHour = df.select(
+            (pl.col(timeColumn).dt.minute().fill_null(0) + pl.col(timeColumn).dt.second().fill_null(0)).gt(0).any()
+        ).item()
+        if offHour:
+            return df
+        hours = pl.col(dateColumn).cast(pl.Int32) * 24 + pl.col(timeColumn).dt.hour().cast(pl.Int32)
+        position = df.columns.index(dateColumn)
+        packed = df.with_columns(hours.alias(packedColumn)).drop(dateColumn, timeColumn)
+        return packed.select(
+            [*packed.columns[:position], packedColumn, *(name for name in packed.columns[position:] if name != packedColumn)]
+        )
+
+    def fEncodedColumns(self, columns: list[str], available: list[str]) -> list[str]:
+        """
+        Names of the requested columns in a frame with the available columns, where a
+        packed timestamp stands for its date and time columns.
+        """
+        if self.hourTimestamp is None or self.hourTimestamp[2] not in available:
+            return columns
+        dateColumn, timeColumn, packedColumn = self.hourTimestamp
+        encoded: list[str] = []
+        for name in columns:
+            name = packedColumn if name in (dateColumn, timeColumn) else name
+            if name not in encoded:
+                encoded.append(name)
+        return encoded
+
+    def fRawBytes(self, df: pl.DataFrame) -> int:
+        """
+        Estimated size of an encoded frame with the default types: Float64 measures,
+        plain strings and separate Date and Time columns.
+        """
+        # estimated_size is typed int | float for its unit argument; in bytes it is a whole number.
+        rawBytes = int(df.estimated_size())
+        for name in self.float32Columns:
+            if name in df.columns and df.schema[name] == pl.Float32:
+                rawBytes += df.height * 4
+        for name in self.categoricalColumns:
+            if name in df.columns and df.schema[name] == pl.Categorical:
+                column = df.get_column(name)
+                rawBytes += int(column.cast(pl.Utf8).estimated_size() - column.estimated_size())
+        if self.hourTimestamp is not None and self.hourTimestamp[2] in df.columns:
+            rawBytes += df.height * (_DATE_TIME_BYTES - 4)
+        return rawBytes
+
+
+def fCompactEncodingOf(tableName: str) -> CompactEncoding | None:
+    return _ENCODINGS.get(tableName)
+
+
+def fHourTimestampToDatetime(column: str | pl.Expr) -> pl.Expr:
+    """
+    Datetime of a packed hour timestamp column (hours since 1970-01-01).
+    """
+    expression = pl.col(column) if isinstance(column, str) else column
+    return pl.from_epoch(expression.cast(pl.Int64) * 3600, time_unit="s")
@@ -1,19 +1,40 @@
 # src/emater_data_science/data/data_interface.py
-from collections.abc import Callable
+import asyncio
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, Future, wait
+from contextlib import contextmanager
 from datetime import date
+from threading import Lock
+import time
 from typing import Literal, Any, TypeVar
 import polars as pl
 from sqlalchemy.orm import DeclarativeBase
 
+from emater_data_science.data.analytical_data.analytical_engine import AnalyticalEngine
 from emater_data_science.data.api_data.api_data_interface import ApiDataInterface
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
+from emater_data_science.data.compact_encoding import CompactEncoding, fCompactEncodingOf
 from emater_data_science.data.database_data.database_data_interface import DatabaseDataInterface
+from emater_data_science.data.dimension_join import DimensionJoin, fDimensionsOf
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate, fAggregatesOf
+from emater_data_science.data.parquet_data.parquet_data_interface import ParquetDataInterface
+from emater_data_science.data.result_cache import ResultCache, fResultCacheKey
+from emater_data_science.library.table_aggregation import ColumnAggregation
+from emater_data_science.library.table_filter import TableFilter
+
+# Keyword arguments of fFetchTable accepted per table by fFetchTables.
+_FETCH_OPTIONS = {
+    "tableName", "tableFilter", "dateColumn", "startDate", "endDate", "columns", "useCache", "withDimensions",
+    "compact",
+}
 
 T = TypeVar("T", bound="DeclarativeBase")
 
 class DataInterface:
-    _instance = None
+    _instance: "DataInterface | None" = None
+    _initialized: bool
 
-    def __new__(cls, *args, **kwargs) -> "DataInterface":
+    def __new__(cls, *args: Any, **kwargs: Any) -> "DataInterface":
         if cls._instance is None:
             cls._instance = super(DataInterface, cls).__new__(cls)
             return cls._instance
@@ -25,6 +46,15 @@ class DataInterface:
             return
         # Build the tables mapping once during initialization.
         self.tablesMapping: dict[str, str] = self._buildTablesMapping()
+        # Results of disk and Parquet fetches, dropped when the table is written through this interface.
+        self.resultCache = ResultCache(maxBytes=1024**3)
+        self._fetchTimings = pl.DataFrame(
+            schema={"name": pl.Utf8, "tableName": pl.Utf8, "rows": pl.Int64, "seconds": pl.Float64, "sharedScan": pl.Boolean}
+        )
+        # Default of fFetchTable's compact argument: load tables with a CompactEncoding in their compact types.
+        self.compactTypes = False
+        # Last compact fetch of each table, for fGetCompactionReport.
+        self._compactionStats: dict[str, dict[str, Any]] = {}
         self._initialized = True
 
     @staticmethod
@@ -38,9 +68,15 @@ class DataInterface:
         sources = [
             ("api", ApiDataInterface().fGetTablesList()),         # returns List[str]
             ("disk", DatabaseDataInterface().fGetTablesList()),  # returns List[str]
+            ("parquet", ParquetDataInterface().fGetTablesList()),  # returns List[str]
         ]
         for source_name, table_list in sources:
             for tableName in table_list:
+                if mapping.get(tableName) == "disk" and source_name == "parquet":
+                    # A table an earlier version kept on disk goes on being written there
+                    # (see fReplacePartition), so a Parquet dataset of the same name is left out.
+                    print(f"Warning: table '{tableName}' is on disk and in Parquet; using the disk table.")
+                    continue
                 if tableName in mapping:
                     raise ValueError(
                         f"Duplicate table name '{tableName}' found in sources: {mapping[tableName]} and {source_name}."
@@ -50,36 +86,393 @@ class DataInterface:
 
     def fFetchTable(
         self,        tableName: str,
-        callback: Callable[[pl.DataFrame], None] | None,
-        tableFilter: dict | None = None,
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
         dateColumn: str | None = None,
         startDate: date | None = None,
-        endDate: date | None = None
-    ) -> None:
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+        useCache: bool = True,
+        withDimensions: bool = False,
+        compact: bool | None = None,
+        dtypes: dict[str, pl.DataType] | None = None,
+    ) -> "Future[pl.DataFrame]":
         """
         Fetch the table from the appropriate data source (API or database).
-        The result is returned asynchronously via the callback as a Polars DataFrame.
+        Returns a Future that resolves with the resulting Polars DataFrame, or with the
+        exception raised while fetching it.
+
+        Disk and Parquet results are kept in resultCache, keyed by table, filter, date range
+        and columns, until fStoreTable or fDeleteRowsFromTable touches the table. Repeated
+        fetches share the cached column buffers; writes made around this interface are not
+        seen by the cache.
 
         :param tableName: Name of the table to fetch.
-        :param callback: Function to be called with the resulting DataFrame.
-        :param tableFilter: Optional dictionary to filter the table rows.
+        :param callback: Optional function also called with the resulting DataFrame, on the
+            callback executor (see fSetCallbackExecutor) before the Future resolves.
+        :param columns: Optional list of the columns to read; all columns when None.
+        :param tableFilter: Optional filter of the table rows, applied by the storage layer: a dictionary of
+            column == value (a list means IN, None means IS NULL), or a TableFilter.
+        :param useCache: Whether to serve the fetch from and store it in the result cache.
+        :param withDimensions: Join the attributes of the dimensions the table references (see
+            DimensionJoin) to the rows, e.g. the station of each weather reading. Filters and
+            columns apply to the table's own columns.
+        :param compact: Load the table in the compact types of its CompactEncoding (Float32
+            measures, categorical strings, a packed hour timestamp); compactTypes when None.
+            Tables without an encoding are loaded as usual.
+        :param dtypes: Optional Polars types of disk and Parquet columns, e.g. {"valor": pl.Float32},
+            applied while the storage layer builds the DataFrame.
         """
         if tableName not in self.tablesMapping:
             raise ValueError(f"Table '{tableName}' not found.")
+        if compact is None:
+            compact = self.compactTypes
+
+        if withDimensions:
+            dimensions = fDimensionsOf(tableName)
+            if columns is not None:
+                columns = columns + [
+                    dimension.keyColumn for dimension in dimensions if dimension.keyColumn not in columns
+                ]
+            fact = self.fFetchTable(tableName=tableName, tableFilter=tableFilter, dateColumn=dateColumn,
+                                    startDate=startDate, endDate=endDate, columns=columns, useCache=useCache,
+                                    compact=compact)
+            lookups = [
+                (dimension, self.fFetchTable(dimension.dimensionTable, useCache=useCache, compact=compact))
+                for dimension in dimensions
+            ]
+            return self._joinDimensions(fact, lookups, callback)
 
         source = self.tablesMapping[tableName]
+        encoding = fCompactEncodingOf(tableName) if compact and source in ("disk", "parquet") else None
+        cacheKey = None
+        if useCache and source in ("disk", "parquet"):
+            cacheKey = fResultCacheKey(tableName, tableFilter, dateColumn, startDate, endDate, columns)
+        if cacheKey is not None and dtypes:
+            cacheKey = (*cacheKey, tuple(sorted((name, str(dtype)) for name, dtype in dtypes.items())))
+        if cacheKey is not None:
+            if encoding is not None:
+                cacheKey = (*cacheKey, "compact")
+            cached = self.resultCache.fGet(cacheKey)
+            if cached is None:
+                cached = self.fFetchTable(tableName=tableName, tableFilter=tableFilter, dateColumn=dateColumn,
+                                          startDate=startDate, endDate=endDate, columns=columns, useCache=False,
+                                          compact=encoding is not None, dtypes=dtypes)
+                self.resultCache.fPut(cacheKey, cached)
+            return self.resultCache.fShare(cached, callback)
+
+        if encoding is not None:
+            loaded = self.fFetchTable(tableName=tableName, tableFilter=tableFilter, dateColumn=dateColumn,
+                                      startDate=startDate, endDate=endDate, columns=columns, useCache=False,
+                                      compact=False, dtypes={**encoding.fDtypes(), **(dtypes or {})})
+            return self._encodeResult(tableName, encoding, loaded, callback)
+
         if source == "api":
-            ApiDataInterface().fFetchTable(tableName, callback, tableFilter)
+            return ApiDataInterface().fFetchTable(tableName, callback, tableFilter)
         elif source == "disk":
-            DatabaseDataInterface().fFetchTable(tableName=tableName, callback=callback, tableFilter=tableFilter,
-                                                dateColumn=dateColumn, startDate=startDate, endDate=endDate)
+            return DatabaseDataInterface().fFetchTable(tableName=tableName, callback=callback, tableFilter=tableFilter,
+                                                       dateColumn=dateColumn, startDate=startDate, endDate=endDate,
+                                                       columns=columns, dtypes=dtypes)
+        elif source == "parquet":
+            return ParquetDataInterface().fFetchTable(tableName=tableName, callback=callback, tableFilter=tableFilter,
+                                                      dateColumn=dateColumn, startDate=startDate, endDate=endDate,
+                                                      columns=columns, dtypes=dtypes)
         else:
             raise ValueError(f"Unknown source '{source}' for table '{tableName}'.")
 
+    def _encodeResult(
+        self,
+        tableName: str,
+        encoding: CompactEncoding,
+        loaded: "Future[pl.DataFrame]",
+        callback: Callable[[pl.DataFrame], None] | None,
+    ) -> "Future[pl.DataFrame]":
+        encoded: "Future[pl.DataFrame]" = Future()
+        encoded.set_running_or_notify_cancel()
+
+        def onLoaded(done: "Future[pl.DataFrame]") -> None:
+            try:
+                df = encoding.fEncode(done.result())
+                rawBytes = encoding.fRawBytes(df)
+                self._compactionStats[tableName] = {
+                    "tableName": tableName,
+                    "rows": df.height,
+                    "rawBytes": rawBytes,
+                    "compactBytes": df.estimated_size(),
+                    "savedBytes": rawBytes - df.estimated_size(),
+                }
+                CallbackDispatcher().fDeliver(encoded, df, callback)
+            except BaseException as encodeError:
+                encoded.set_exception(encodeError)
+
+        loaded.add_done_callback(onLoaded)
+        return encoded
+
+    def fGetCompactionReport(self) -> pl.DataFrame:
+        """
+        Bytes saved by compact types, per table, for the last compact fetch of each table:
+        its estimated size with the default types, its size as loaded, and the difference.
+        """
+        schema = {"tableName": pl.Utf8, "rows": pl.Int64, "rawBytes": pl.Int64, "compactBytes": pl.Int64,
+                  "savedBytes": pl.Int64}
+        report = pl.DataFrame(list(self._compactionStats.values()), schema=schema)
+        return report.with_columns(
+            (pl.col("savedBytes") / pl.col("rawBytes")).fill_nan(None).alias("savedShare")
+        ).sort("savedBytes", descending=True)
+
+    @staticmethod
+    def _joinDimensions(
+        fact: "Future[pl.DataFrame]",
+        lookups: list[tuple[DimensionJoin, "Future[pl.DataFrame]"]],
+        callback: Callable[[pl.DataFrame], None] | None,
+    ) -> "Future[pl.DataFrame]":
+        joined: "Future[pl.DataFrame]" = Future()
+        joined.set_running_or_notify_cancel()
+        futures = [fact, *(lookup for _, lookup in lookups)]
+        remaining = [len(futures)]
+        lock = Lock()
+
+        def onDone(_: "Future[pl.DataFrame]") -> None:
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                df = fact.result()
+                for dimension, lookup in lookups:
+                    df = dimension.fJoin(df, lookup.result())
+                CallbackDispatcher().fDeliver(joined, df, callback)
+            except BaseException as joinError:
+                joined.set_exception(joinError)
+
+        for future in futures:
+            future.add_done_callback(onDone)
+        return joined
+
+    async def fFetchTableAsync(
+        self,
+        tableName: str,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+    ) -> pl.DataFrame:
+        """
+        Awaitable version of fFetchTable for use inside an asyncio event loop.
+
+        :param tableName: Name of the table to fetch.
+        :param tableFilter: Optional filter of the table rows, applied by the storage layer: a dictionary of
+            column == value (a list means IN, None means IS NULL), or a TableFilter.
+        """
+        future = self.fFetchTable(tableName=tableName, tableFilter=tableFilter,
+                                  dateColumn=dateColumn, startDate=startDate, endDate=endDate, columns=columns)
+        return await asyncio.wrap_future(future)
+
+    def fFetchTables(
+        self,
+        tables: list[str] | dict[str, dict[str, Any] | None],
+        timeout: float | None = None,
+    ) -> dict[str, pl.DataFrame]:
+        """
+        Fetch several tables at once and wait until all of them are loaded.
+        The reads are submitted together, so disk tables load in parallel on the reader
+        pool and Parquet tables on the Parquet read pool. Requests that read the same rows
+        of one table (same filter and date range) share a single scan of the union of
+        their columns, except those withDimensions. The first fetch error is raised once every fetch has finished.
+        Per-table load times are kept for fGetFetchTimings.
+
+        :param tables: Table names, or a dictionary of result name -> options. Options are
+            the fFetchTable arguments tableFilter, dateColumn, startDate, endDate, columns,
+            useCache, withDimensions and compact, plus tableName to read a table under another result name; None reads
+            the whole table.
+        :param timeout: Optional maximum number of seconds to wait for all tables.
+        """
+        requests = dict.fromkeys(tables) if isinstance(tables, list) else tables
+        if not requests:
+            return {}
+        scans: dict[object, dict[str, Any]] = {}
+        scanOf: dict[str, object] = {}
+        for name, options in requests.items():
+            options = dict(options or {})
+            unknown = set(options) - _FETCH_OPTIONS
+            if unknown:
+                raise ValueError(f"Invalid fetch options for '{name}': {sorted(unknown)}.")
+            tableName = options.pop("tableName", name)
+            columns = options.pop("columns", None)
+            rowsKey = fResultCacheKey(tableName, options.get("tableFilter"), options.get("dateColumn"),
+                                      options.get("startDate"), options.get("endDate"), None)
+            # A result with joined dimension attributes is not cut down to the requested
+            # columns, so it gets a scan of its own.
+            scanKey: object = (
+                (rowsKey, options.get("useCache", True), options.get("compact", self.compactTypes))
+                if rowsKey is not None and not options.get("withDimensions", False) else name
+            )
+            scan = scans.setdefault(scanKey, {"tableName": tableName, "options": options, "columns": [], "readers": []})
+            if columns is None or scan["columns"] is None:
+                scan["columns"] = None
+            else:
+                scan["columns"].extend(column for column in columns if column not in scan["columns"])
+            scan["readers"].append((name, columns))
+            scanOf[name] = scanKey
+
+        started = time.perf_counter()
+        finishedAt: dict[object, float] = {}
+        futures: dict[object, "Future[pl.DataFrame]"] = {}
+
+        def recordEnd(scanKey: object) -> Callable[["Future[pl.DataFrame]"], None]:
+            def onDone(_: "Future[pl.DataFrame]") -> None:
+                finishedAt.setdefault(scanKey, time.perf_counter())
+            return onDone
+
+        for scanKey, scan in scans.items():
+            futures[scanKey] = self.fFetchTable(scan["tableName"], columns=scan["columns"], **scan["options"])
+            futures[scanKey].add_done_callback(recordEnd(scanKey))
+        _, notDone = wait(futures.values(), timeout=timeout)
+        if notDone:
+            pending = [name for name, scanKey in scanOf.items() if futures[scanKey] in notDone]
+            raise TimeoutError(f"Tables not loaded within {timeout} seconds: {pending}.")
+
+        results: dict[str, pl.DataFrame] = {}
+        timings = []
+        for scanKey, scan in scans.items():
+            df = futures[scanKey].result()
+            encoding = fCompactEncodingOf(scan["tableName"])
+            for name, columns in scan["readers"]:
+                if columns is not None and encoding is not None:
+                    # A packed timestamp replaces its date and time columns in a compact result.
+                    columns = encoding.fEncodedColumns(columns, df.columns)
+                results[name] = df if columns is None or len(scan["readers"]) == 1 else df.select(columns)
+                timings.append({
+                    "name": name,
+                    "tableName": scan["tableName"],
+                    "rows": results[name].height,
+                    # A done callback may still be running when wait returns.
+                    "seconds": finishedAt.get(scanKey, time.perf_counter()) - started,
+                    "sharedScan": len(scan["readers"]) > 1,
+                })
+        self._fetchTimings = pl.DataFrame(timings).sort("seconds", descending=True)
+        slowest = self._fetchTimings.row(0, named=True)
+        print(f"fetched {len(results)} tables in {time.perf_counter() - started:.2f}s, "
+              f"slowest {slowest['name']} ({slowest['seconds']:.2f}s, {slowest['rows']} rows)")
+        return {name: results[name] for name in requests}
+
+    def fGetFetchTimings(self) -> pl.DataFrame:
+        """
+        Load time of each table of the last fFetchTables call, slowest first: seconds from
+        submitting the reads until that table was loaded, rows, and whether its scan was
+        shared with another request.
+        """
+        return self._fetchTimings
+
+    def fAggregateTable(
+        self,
+        tableName: str,
+        groupBy: list[str],
+        aggregations: list[ColumnAggregation],
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        callback: Callable[[pl.DataFrame], None] | None = None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Group the table rows and aggregate them inside the storage engine (a SQLite GROUP BY
+        or the lazy Parquet scan), so only one row per group is transferred.
+        Returns a Future that resolves with the groupBy columns and one column per aggregation,
+        in no particular order.
+
+        :param tableName: Name of the table to aggregate.
+        :param groupBy: Columns whose values define the groups.
+        :param aggregations: ColumnAggregation list, e.g. ColumnAggregation("precipitacao", "sum").
+        :param tableFilter: Optional filter of the rows to aggregate, as in fFetchTable.
+        :param callback: Optional function also called with the resulting DataFrame.
+        """
+        if tableName not in self.tablesMapping:
+            raise ValueError(f"Table '{tableName}' not found.")
+
+        source = self.tablesMapping[tableName]
+        if source == "disk":
+            return DatabaseDataInterface().fAggregateTable(tableName=tableName, groupBy=groupBy,
+                                                           aggregations=aggregations, callback=callback,
+                                                           tableFilter=tableFilter, dateColumn=dateColumn,
+                                                           startDate=startDate, endDate=endDate)
+        elif source == "parquet":
+            return ParquetDataInterface().fAggregateTable(tableName=tableName, groupBy=groupBy,
+                                                          aggregations=aggregations, callback=callback,
+                                                          tableFilter=tableFilter, dateColumn=dateColumn,
+                                                          startDate=startDate, endDate=endDate)
+        raise ValueError(f"Aggregation is not supported for source '{source}' of table '{tableName}'.")
+
+    def fAnalyticalQuery(self, query: "str | pl.LazyFrame", parameters: list[Any] | None = None) -> Any:
+        """
+        Run an analytical query on the optional DuckDB engine and return a pyarrow Table.
+        Disk and Parquet tables are views under their own names, so a query can join them.
+        Needs the "analytics" extra (duckdb and pyarrow).
+
+        :param query: DuckDB SQL, or a Polars lazy plan built from fAnalyticalScan.
+        :param parameters: Optional values for the "?" placeholders of a SQL query.
+        """
+        engine = AnalyticalEngine()
+        engine.fRegisterTables(self.tablesMapping)
+        return engine.fQuery(query, parameters)
+
+    def fAnalyticalScan(self, tableName: str) -> pl.LazyFrame:
+        """
+        Lazy Polars scan of a disk or Parquet table through the analytical engine, to build
+        plans for fAnalyticalQuery. The columns and filters of the plan are pushed into the
+        DuckDB query that reads the table.
+
+        :param tableName: Name of the table to scan.
+        """
+        if tableName not in self.tablesMapping:
+            raise ValueError(f"Table '{tableName}' not found.")
+        engine = AnalyticalEngine()
+        engine.fRegisterTables(self.tablesMapping)
+        return engine.fScan(tableName)
+
+    def fFetchTableBatches(
+        self,
+        tableName: str,
+        batchSize: int = 100_000,
+        partitionBy: str | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Iterate over a table in bounded pieces instead of loading it whole.
+
+        :param tableName: Name of the table to fetch.
+        :param batchSize: Maximum number of rows per yielded DataFrame.
+        :param partitionBy: Optional column; when given, one DataFrame is yielded per value of it.
+        :param columns: Optional list of the columns to read; all columns when None.
+        :param tableFilter: Optional filter of the table rows, applied by the storage layer: a dictionary of
+            column == value (a list means IN, None means IS NULL), or a TableFilter.
+        """
+        if tableName not in self.tablesMapping:
+            raise ValueError(f"Table '{tableName}' not found.")
+
+        source = self.tablesMapping[tableName]
+        if source == "disk":
+            return DatabaseDataInterface().fFetchTableBatches(
+                tableName=tableName, batchSize=batchSize, partitionBy=partitionBy, tableFilter=tableFilter,
+                dateColumn=dateColumn, startDate=startDate, endDate=endDate, columns=columns
+            )
+        if source == "parquet":
+            return ParquetDataInterface().fFetchTableBatches(
+                tableName=tableName, batchSize=batchSize, partitionBy=partitionBy, tableFilter=tableFilter,
+                dateColumn=dateColumn, startDate=startDate, endDate=endDate, columns=columns
+            )
+        raise ValueError(f"Batched fetch is not supported for source '{source}' of table '{tableName}'.")
+
     def fStoreTable(
         self,
         model: type[T], data:  pl.DataFrame,
-        storageTarget: Literal["disk", "api"] = "disk",
+        storageTarget: Literal["disk", "api", "parquet"] = "disk",
+        onConflict: Literal["update", "ignore", "append"] | None = None,
     ) -> None:
         """
         Store the table data into the appropriate data source.
@@ -88,12 +481,18 @@ class DataInterface:
         - If the table already exists in the mapping, store it using its mapped source.
 
         :param model: ORM class that extends DeclarativeBase representing one SQLAlchemy table.
-        :param storageTarget: The target storage ("disk" or "server") for new tables.
+        :param storageTarget: The target storage ("disk", "server" or "parquet") for new tables.
+            "parquet" writes a partitioned Parquet dataset, see ParquetStorage for the model attributes
+            that choose the partitions.
+        :param onConflict: For disk tables whose model declares a natural key, "update" (the default)
+            upserts on it and "ignore" keeps the stored rows; "append" inserts without checking.
+            Parquet datasets are append-only and ignore it.
         """
    
 
         # Derive the table name from the first element.
         tableName = model.__table__.name  # type: ignore[attr-defined]
+        self.resultCache.fInvalidate(tableName)
 
         if tableName not in self.tablesMapping:
             # New table: store using the provided storageTarget.
@@ -101,11 +500,14 @@ class DataInterface:
                 ApiDataInterface().fStoreTable(model=model,data=data)
                 self.tablesMapping[tableName] = "api"
             elif storageTarget == "disk":
-                DatabaseDataInterface().fStoreTable(model=model,data=data)
+                DatabaseDataInterface().fStoreTable(model=model,data=data,onConflict=onConflict)
                 self.tablesMapping[tableName] = "disk"
+            elif storageTarget == "parquet":
+                ParquetDataInterface().fStoreTable(model=model,data=data)
+                self.tablesMapping[tableName] = "parquet"
             else:
                 raise ValueError(
-                    f"Invalid storage target '{storageTarget}'. Must be 'disk' or 'server'."
+                    f"Invalid storage target '{storageTarget}'. Must be 'disk', 'server' or 'parquet'."
                 )
         else:
             # Table exists: store using its mapped source.
@@ -113,44 +515,306 @@ class DataInterface:
             if existingSource == "api":
                 ApiDataInterface().fStoreTable(model=model,data=data)
             elif existingSource == "disk":
-                DatabaseDataInterface().fStoreTable(model=model,data=data)
+                DatabaseDataInterface().fStoreTable(model=model,data=data,onConflict=onConflict)
+            elif existingSource == "parquet":
+                ParquetDataInterface().fStoreTable(model=model,data=data)
             else:
                 raise ValueError(
                     f"Unknown source '{existingSource}' for table '{tableName}'."
                 )
 
+        if self.tablesMapping[tableName] == "disk":
+            self._refreshAggregates(tableName, data)
+
     def fQueueIsEmpty(self) -> bool:
         """
-        Check if the queue is empty in the database.
+        Check if the queue is empty in the database and the Parquet storage.
         """
-        return DatabaseDataInterface().fQueueIsEmpty()
+        return DatabaseDataInterface().fQueueIsEmpty() and ParquetDataInterface().fQueueIsEmpty()
 
-    def fDeleteRowsFromTable(self, tableName: str, tableFilter: dict) -> None:
+    def fDeleteRowsFromTable(self, tableName: str, tableFilter: dict[str, Any] | TableFilter) -> None:
         """
         Delete rows from the table based on the provided filter, using the appropriate data source.
         The source is determined from the existing tables mapping.
 
         :param tableName: Name of the table from which rows will be deleted.
-        :param tableFilter: Dictionary specifying the filter for row deletion.
+        :param tableFilter: Dictionary or TableFilter specifying the filter for row deletion.
         """
         if tableName not in self.tablesMapping:
             raise ValueError(f"Table '{tableName}' not found in tables mapping.")
+        self.resultCache.fInvalidate(tableName)
 
         source = self.tablesMapping[tableName]
         if source == "api":
             ApiDataInterface().fDeleteRows(tableName, tableFilter)
         elif source == "disk":
             DatabaseDataInterface().fDeleteRows(tableName, tableFilter)
+            self._refreshAggregates(tableName, None)
+        elif source == "parquet":
+            ParquetDataInterface().fDeleteRows(tableName, tableFilter)
         else:
             raise ValueError(f"Unknown source '{source}' for table '{tableName}'.")
 
+    def fReplacePartition(self, model: type[T], year: int, data: pl.DataFrame | Iterable[pl.DataFrame]) -> "Future[Any]":
+        """
+        Replace every row of one year of a Parquet table partitioned by year (a model with
+        __parquet_date_column__) with data, swapping the year's directory in one step.
+        A new table is created as a Parquet dataset. A table an earlier version left on disk
+        stays there: the year's rows are deleted and data inserted in one transaction.
+        Returns the write Future.
+
+        :param model: ORM class of the table.
+        :param year: Year to replace; every row of data must fall in it.
+        :param data: All rows of that year; an empty DataFrame removes the year. An iterable of
+            DataFrames (e.g. a generator yielding one station at a time) is written piece by piece
+            on the writer, so the year is never held in memory whole. Do any storage lookups the
+            pieces need (e.g. dimension keys) before the call: the iterable must not wait on a
+            storage Future, which would queue behind the replace.
+        """
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+        source = self.tablesMapping.setdefault(tableName, "parquet")
+        if source == "disk":
+            dateColumn = getattr(model, "__parquet_date_column__", None)
+            if not dateColumn:
+                raise ValueError(f"Model of table '{tableName}' declares no __parquet_date_column__ to split years on.")
+            self.resultCache.fInvalidate(tableName)
+            future = DatabaseDataInterface().fReplaceYear(model=model, dateColumn=dateColumn, year=year, data=data)
+            self._refreshAggregates(tableName, None)
+            return future
+        if source != "parquet":
+            raise ValueError(f"Table '{tableName}' is stored on '{source}'; only disk and Parquet tables are partitioned by year.")
+        self.resultCache.fInvalidate(tableName)
+        return ParquetDataInterface().fReplacePartition(model=model, year=year, data=data)
+
+    def fCompactTable(self, tableName: str, years: list[int] | None = None) -> "Future[int]":
+        """
+        Merge the small files appends left in each partition of a Parquet table into one
+        file per partition. Returns a Future with the number of files removed.
+
+        :param tableName: Name of the Parquet table.
+        :param years: Optional years to compact, e.g. the closed ones; all years when None.
+        """
+        if self.tablesMapping.get(tableName) != "parquet":
+            raise ValueError(f"Table '{tableName}' is not a Parquet table.")
+        return ParquetDataInterface().fCompactTable(tableName=tableName, years=years)
+
+    def fCreateIndexes(self, model: type[T], rebuild: bool = False) -> None:
+        """
+        Create the indexes declared in the model's __table_args__ that are missing in storage.
+        Call it after bulk loads; with rebuild=True existing indexes are also rebuilt.
+
+        :param model: ORM class whose table indexes should be created.
+        :param rebuild: Whether to REINDEX the indexes that already exist.
+        """
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+        source = self.tablesMapping.get(tableName, "disk")
+        if source == "disk":
+            DatabaseDataInterface().fEnsureIndexes(model=model, rebuild=rebuild)
+        elif source not in ("api", "parquet"):
+            # Parquet datasets are pruned by their partitions and have no indexes.
+            raise ValueError(f"Unknown source '{source}' for table '{tableName}'.")
+
+    def fRecreateTable(self, model: type[T]) -> "Future[None]":
+        """
+        Drop a disk table and create it again from its model, for a table created by an
+        older version of the model (fStoreTable then fails with a message naming this
+        function). Its rows are lost: load the data again afterwards. The materialized
+        aggregates over the table are rebuilt, empty. Returns the writer Future.
+
+        :param model: ORM class of the table, with its current columns.
+        """
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+        source = self.tablesMapping.get(tableName, "disk")
+        if source != "disk":
+            raise ValueError(f"Table '{tableName}' is stored on '{source}'; only disk tables are recreated.")
+        self.resultCache.fInvalidate(tableName)
+        future = DatabaseDataInterface().fRecreateTable(model=model)
+        self.tablesMapping[tableName] = "disk"
+        self._refreshAggregates(tableName, None)
+        return future
+
+    def _refreshAggregates(self, tableName: str, changed: pl.DataFrame | None) -> None:
+        if self.tablesMapping.get(tableName) != "disk":
+            return
+        for aggregate in fAggregatesOf(tableName):
+            self._refreshAggregate(aggregate, changed)
+
+    def _refreshAggregate(self, aggregate: MaterializedAggregate, changed: pl.DataFrame | None) -> "Future[None]":
+        # The aggregate is only mapped once its table is stored, so a failed first build
+        # leaves it unmapped and the next fetch builds it again.
+        self.resultCache.fInvalidate(aggregate.name)
+        refreshed: "Future[None]" = DatabaseDataInterface().fRefreshAggregate(aggregate=aggregate, changed=changed)
+
+        def onRefreshed(done: "Future[None]") -> None:
+            if done.exception() is None:
+                self.tablesMapping[aggregate.name] = "disk"
+
+        refreshed.add_done_callback(onRefreshed)
+        return refreshed
+
+    def fFetchAggregate(
+        self,
+        aggregate: MaterializedAggregate,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Fetch a materialized aggregate, building it first if it was never stored.
+        Returns a Future like fFetchTable, with the group key and aggregated columns, in no particular order,
+        or with the error of the build.
+
+        :param aggregate: The MaterializedAggregate declared over a disk table; for tables in
+            other storages use fAggregateTable.
+        :param tableFilter: Optional filter of the aggregate rows, e.g. {"ano": [2022, 2023]}.
+        """
+        source = self.tablesMapping.get(aggregate.sourceTable)
+        if source is None:
+            raise ValueError(f"Source table '{aggregate.sourceTable}' of aggregate '{aggregate.name}' not found.")
+        if source != "disk":
+            raise ValueError(
+                f"Aggregate '{aggregate.name}' is declared over '{aggregate.sourceTable}', which is stored on "
+                f"'{source}'; materialized aggregates are only kept for disk tables, use fAggregateTable instead."
+            )
+        if aggregate.name in self.tablesMapping:
+            return self.fFetchTable(aggregate.name, tableFilter=tableFilter, columns=aggregate.outputColumns)
+
+        fetched: "Future[pl.DataFrame]" = Future()
+        fetched.set_running_or_notify_cancel()
+
+        def onLoaded(done: "Future[pl.DataFrame]") -> None:
+            error = done.exception()
+            if error is not None:
+                fetched.set_exception(error)
+            else:
+                fetched.set_result(done.result())
+
+        def onBuilt(done: "Future[None]") -> None:
+            try:
+                done.result()
+                loaded = self.fFetchTable(aggregate.name, tableFilter=tableFilter, columns=aggregate.outputColumns)
+            except BaseException as buildError:
+                fetched.set_exception(buildError)
+                return
+            loaded.add_done_callback(onLoaded)
+
+        self._refreshAggregate(aggregate, None).add_done_callback(onBuilt)
+        return fetched
+
+    @contextmanager
+    def fBulkLoad(self, models: list[type[T]]) -> Iterator[None]:
+        """
+        Context manager for backfills: the disk tables of the models are loaded with
+        relaxed durability and without secondary indexes, which are rebuilt and analyzed
+        when the block ends. Wrap the whole loading loop, not each write:
+
+            with DataInterface().fBulkLoad([TaxaSelic]):
+                for year in range(2000, 2025):
+                    ...
+
+        :param models: ORM classes of the tables being loaded. Tables stored in Parquet or the API are skipped.
+        """
+        diskModels = [
+            model for model in models
+            if self.tablesMapping.get(model.__table__.name, "disk") == "disk"  # type: ignore[attr-defined]
+        ]
+        if not diskModels:
+            yield
+            return
+        with DatabaseDataInterface().fBulkLoad(models=diskModels):
+            yield
+
+    @contextmanager
+    def fSnapshotSession(self, tables: list[str] | None = None) -> Iterator[list[str]]:
+        """
+        Context manager for read-heavy analysis: at the start the disk database, or only the
+        given tables, is copied into an in-memory SQLite database in one consistent read, and
+        inside the block the reader pool serves those tables from memory. Writes still go to disk, and a
+        table written inside the block is read from disk again from then on. Yields the
+        tables in the snapshot:
+
+            with DataInterface().fSnapshotSession(["dados_safra_emater", "credito_rural"]):
+                ...
+
+        :param tables: Optional disk tables to copy; the whole database when None. Parquet and API
+            tables are read from their own sources as usual.
+        """
+        diskTables = None if tables is None else [name for name in tables if self.tablesMapping.get(name) == "disk"]
+        if diskTables == []:
+            yield []
+            return
+        copied = DatabaseDataInterface().fOpenSnapshot(tables=diskTables).result()
+        try:
+            yield copied
+        finally:
+            DatabaseDataInterface().fCloseSnapshot()
+
+    def fDropDuplicateKeys(self, model: type[T]) -> None:
+        """
+        Remove rows repeating the model's natural key, keeping the latest insert of each,
+        and create the natural key index. Run once on disk tables loaded before the model
+        declared its natural key; upserts into them fail until then.
+
+        :param model: ORM class whose table declares a natural key.
+        """
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+        source = self.tablesMapping.get(tableName, "disk")
+        if source != "disk":
+            raise ValueError(f"Natural keys are only enforced on disk tables, '{tableName}' is in '{source}'.")
+        self.resultCache.fInvalidate(tableName)
+        DatabaseDataInterface().fDropDuplicateKeys(model=model)
+        self._refreshAggregates(tableName, None)
+
+    def fGetIndexUsageReport(self) -> pl.DataFrame:
+        """
+        Report of the recent database reads and the index, if any, each one used. Plans are
+        only recorded for a sample of the reads, none by default: set
+        CentralDatabaseConnection().indexUsageSampleRate (e.g. 0.05, or 1 while tuning indexes).
+        """
+        return DatabaseDataInterface().fGetIndexUsageReport()
+
+    def fGetQueueWaitStats(self) -> pl.DataFrame:
+        """
+        Time database operations spent queued, per queue and priority class
+        (interactive reads, bulk writes, background logging).
+        """
+        return DatabaseDataInterface().fGetQueueWaitStats()
+
+    def fGetWorkerUtilization(self) -> pl.DataFrame:
+        """
+        How busy the storage workers are: the database writer, the database reader pool
+        and the callback executor, with operations run, seconds spent and utilization.
+        """
+        callbacks = CallbackDispatcher().fGetStats()
+        return pl.concat([
+            DatabaseDataInterface().fGetWorkerUtilization(),
+            pl.DataFrame([{
+                "worker": "callback",
+                "threads": CallbackDispatcher().maxWorkers,
+                "operations": int(callbacks["callbacks"]),
+                "busySeconds": callbacks["busySeconds"],
+                "utilization": callbacks["utilization"],
+            }]),
+        ], how="vertical_relaxed")
+
+    def fSetCallbackExecutor(self, executor: Executor) -> None:
+        """
+        Run fetch callbacks on executor instead of the default thread pool, e.g. a
+        ProcessPoolExecutor for heavy transforms (the callback must then be picklable).
+
+        :param executor: concurrent.futures executor the callbacks are submitted to.
+        """
+        CallbackDispatcher().fSetExecutor(executor)
+
     def fShutdown(self) -> None:
         """
         Shutdown all data interfaces.
         """
         # Uncomment the following line if API shutdown is implemented:
         # ApiDataInterface().fShutdown()
+        ParquetDataInterface().fShutdown()
         DatabaseDataInterface().fShutdown()
+        CallbackDispatcher().fShutdown()
+        if AnalyticalEngine._instance is not None:
+            AnalyticalEngine().fClose()
 
     def fAddLog(self, logTable: Any) -> None:
         
@@ -173,9 +837,6 @@ if __name__ == "__main__":
 
     print("\nFetching 'Mock_Agricultural_Data':")
     try:
-        def print_df(df: pl.DataFrame) -> None:
-            print(df)
-
-        di.fFetchTable("Mock_Agricultural_Data", callback=print_df)
+        print(di.fFetchTable("Mock_Agricultural_Data").result())
     except Exception as e:
         print(f"Error fetching table: {e}")
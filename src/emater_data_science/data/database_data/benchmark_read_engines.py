@@ -0,0 +1,80 @@
+from collections.abc import Callable
+import gc
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import polars as pl
+import psutil  # type: ignore[import-untyped]
+from sqlalchemy import select
+
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+from emater_data_science.data.database_data.columnar_io import fReadColumnar
+
+
+def _fMeasure(readFunction: Callable[[], pl.DataFrame]) -> tuple[int, float, float]:
+    """
+    Run readFunction while sampling the process RSS.
+    Returns (rows, seconds, peak RSS growth in MB).
+    """
+    process = psutil.Process(os.getpid())
+    gc.collect()
+    baseline = process.memory_info().rss
+    peak = baseline
+    done = threading.Event()
+
+    def sampleRss() -> None:
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, process.memory_info().rss)
+            time.sleep(0.01)
+
+    sampler = threading.Thread(target=sampleRss, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    df = readFunction()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    rows = df.height
+    del df
+    gc.collect()
+    return rows, elapsed, (peak - baseline) / 1024**2
+
+
+def _fRunEngine(tableName: str, engineName: str, chunkSize: int) -> tuple[int, float, float]:
+    connection = CentralDatabaseConnection()
+    engine = connection._engine
+    if engine is None or connection.schemaCatalog is None:
+        raise ValueError("Database engine not initialized.")
+    query = select(connection.schemaCatalog.fGetTable(tableName))
+    schema = connection.schemaCatalog.fGetPolarsSchema(tableName)
+
+    def readTable() -> pl.DataFrame:
+        with engine.connect() as conn:
+            if engineName == "rows":
+                return CentralDatabaseConnection._readRows(conn, query)
+            return fReadColumnar(conn, query, schema, chunkSize=chunkSize)
+
+    return _fMeasure(readTable)
+
+
+def fBenchmarkReadEngines(tableName: str, chunkSize: int = 50_000) -> None:
+    """
+    Compare the row and columnar read paths on one table.
+    Each engine runs in a fresh process so the peak RSS of one does not hide the other.
+    """
+    print(f"Benchmark of fRead engines on '{tableName}'")
+    context = multiprocessing.get_context("spawn")
+    for engineName in ["rows", "columnar"]:
+        with context.Pool(processes=1) as pool:
+            rows, elapsed, peakMb = pool.apply(_fRunEngine, (tableName, engineName, chunkSize))
+        print(
+            f"{engineName:9} {rows:>12,} rows  {elapsed:8.2f} s  "
+            f"{rows / elapsed if elapsed else 0:>12,.0f} rows/s  peak RSS +{peakMb:,.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    fBenchmarkReadEngines(sys.argv[1] if len(sys.argv) > 1 else "estacao_inmet_com_dados_meteorologicos")
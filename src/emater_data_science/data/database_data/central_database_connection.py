@@ -1,72 +1,339 @@
-from collections.abc import Callable
-from datetime import date
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime
+import math
 import os
-from threading import Thread, Lock, Event
-from queue import Queue, Empty
-from typing import TypeVar, cast
+import random
+from pathlib import Path
+import re
+import sqlite3
+import tempfile
+import time
+import uuid
+from threading import Thread, Lock, Event, Condition, current_thread
+from queue import Queue, Empty, Full
+from typing import Any, Literal, TypeVar, cast
 import polars as pl
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
 from sqlalchemy import (
+    Column,
+    Connection,
     Engine,
+    Select,
     Table,
     create_engine,
-    MetaData,
+    event,
     select,
-    insert,
     delete,
-    inspect,
 )
 
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
+from emater_data_science.data.database_data.columnar_io import (
+    fEmptyFrame,
+    fInsertColumnar,
+    fIterColumnar,
+    fPolarsSchemaFromColumns,
+    fReadColumnar,
+    fSplitPartitions,
+)
+from emater_data_science.data.database_data.database_operation import DatabaseOperation
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate
+from emater_data_science.data.database_data.operation_queue import OperationPriority, PriorityOperationQueue
+from emater_data_science.data.database_data.schema_catalog import SchemaCatalog, fNaturalKey, fNaturalKeyIndex
+from emater_data_science.library.table_aggregation import ColumnAggregation
+from emater_data_science.library.table_filter import TableFilter, asDataFilters
+
 T = TypeVar("T", bound=DeclarativeBase)
 
+_INDEX_IN_PLAN = re.compile(r"USING (?:COVERING )?INDEX (\S+)|USING (INTEGER PRIMARY KEY)")
+
+# Connection settings outside and inside fBulkLoad. journal_mode=WAL is set once per connection in _onConnect.
+_DURABLE_PRAGMAS: dict[str, str] = {"synchronous": "FULL", "cache_size": "-2000", "temp_store": "DEFAULT", "wal_autocheckpoint": "1000"}
+_BULK_PRAGMAS: dict[str, str] = {"synchronous": "OFF", "cache_size": "-262144", "temp_store": "MEMORY", "wal_autocheckpoint": "10000"}
+
+# File of the local database inside CentralDatabaseConnection.databaseDirectory.
+DATABASE_FILE_NAME = "Local_Database.db"
+
 
 
 class CentralDatabaseConnection:
-    _instance = None
+    _instance: "CentralDatabaseConnection | None" = None
+    _initialized: bool
+    # Folder of the database file; change it before the first use to work on another database.
+    databaseDirectory = "C:\\emater_data_science"
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, *args: Any, **kwargs: Any) -> "CentralDatabaseConnection":
         if cls._instance is None:
             cls._instance = super(CentralDatabaseConnection, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self) -> None:
         if hasattr(self, "_initialized") and self._initialized:
             return
-        self._operation_queue: Queue = Queue()
+        # Both queues serve interactive work first, then bulk writes, then log flushes.
+        self._operation_queue = PriorityOperationQueue()
+        self._read_queue = PriorityOperationQueue()
         self._worker_thread: Thread | None = None
+        self._reader_threads: list[Thread] = []
+        # Number of reader threads serving fRead in parallel with the single writer.
+        # With 0 readers every read goes through the writer queue, as before.
+        self.readerPoolSize = 4
         self._stop_event: Event = Event()
         self._lock = Lock()
+        # Sequence numbers of writes not yet finished, per table. Reads only wait on these.
+        self._writeCondition = Condition()
+        self._pendingWrites: dict[str, list[int]] = {}
+        self._operationSequence = 0
         self._engine: Engine | None = None
-        self.metadata = MetaData()
+        self._databasePath: str | None = None
+        self.schemaCatalog: SchemaCatalog | None = None
+        # In-memory copy of the database opened by fOpenSnapshot, and the tables reads take from it.
+        # A table leaves the snapshot when a write to it is queued, so its reads go back to disk.
+        self._snapshotEngine: Engine | None = None
+        self._snapshotKeeper: sqlite3.Connection | None = None
+        self._snapshotTables: set[str] = set()
+        self._snapshotReaders = 0
+        # "columnar" builds typed columns from fetchmany chunks; "rows" is the original dict-per-row path.
+        self.readEngine: Literal["columnar", "rows"] = "columnar"
+        self.readChunkSize = 50_000
+        # Batches fReadBatches may hold ahead of its consumer.
+        self.batchQueueDepth = 2
+        # Consecutive queued inserts into one table are merged into a single transaction,
+        # up to this many rows, waiting at most this many seconds for the next insert.
+        self.writeCoalesceMaxRows = 500_000
+        self.writeCoalesceLatency = 0.05
+        # Bytes of queued insert frames (DataFrame.estimated_size) allowed in memory.
+        # Past it, fWrite either blocks the producer or spills the frame to an Arrow IPC file.
+        self.writeQueueByteBudget = 512 * 1024**2
+        self.writeOverflowPolicy: Literal["block", "spill"] = "spill"
+        self.spillDirectory = tempfile.gettempdir()
+        self._budgetCondition = Condition()
+        self._queuedWriteBytes = 0
+        # Tables whose natural key unique index is known to exist in the database.
+        self._naturalKeysReady: set[str] = set()
+        # Tables whose stored columns were checked against their model, see _checkStoredSchema.
+        self._schemasChecked: set[str] = set()
+        # Open fBulkLoad blocks; the bulk pragmas apply while the writer sees it above zero.
+        self._bulkLoadDepth = 0
+        # Open fBulkLoad blocks per table name, as the writer sees them, see _createTable.
+        self._bulkTables: dict[str, int] = {}
+        self._pragmas = _DURABLE_PRAGMAS
+        # Share of the reads whose query plan is recorded for fGetIndexUsageReport: 0 records none,
+        # 1 every read. Each recorded read costs an extra EXPLAIN QUERY PLAN round trip.
+        self.indexUsageSampleRate = 0.0
+        # Query plans of the most recent sampled reads, see fGetIndexUsageReport.
+        self._indexUsage: deque[dict[str, Any]] = deque(maxlen=1000)
+        self._indexUsageLock = Lock()
+        # Operations run and seconds spent running them, per worker role, see fGetWorkerUtilization.
+        self._workerStats: dict[str, dict[str, float]] = {
+            "writer": {"operations": 0, "busySeconds": 0.0},
+            "reader": {"operations": 0, "busySeconds": 0.0},
+        }
+        self._workerStatsLock = Lock()
+        self._startedAt = time.perf_counter()
         self._is_shutting_down = False  # Flag to prevent enqueuing new tasks after shutdown begins.
         self._initialized = True
         self._ensureWorker()
 
-    def _initializeDatabaseEngine(self, db_name: str = "Local_Database.db") -> None:
-        dbPath = os.path.join("C:\\emater_data_science", db_name)
+    def _initializeDatabaseEngine(self, db_name: str = DATABASE_FILE_NAME) -> None:
+        dbPath = os.path.join(self.databaseDirectory, db_name)
+        self._databasePath = dbPath
         dbUrl = f"sqlite:///{dbPath}"
         self._engine = create_engine(url=dbUrl, echo=False)
+        event.listen(self._engine, "connect", self._onConnect)
+        event.listen(self._engine, "checkout", self._onCheckout)
+        self.schemaCatalog = SchemaCatalog(self._engine)
+
+    @staticmethod
+    def _onConnect(dbapiConnection: Any, connectionRecord: Any) -> None:
+        # WAL lets the reader connections run while the writer holds its transaction.
+        cursor = dbapiConnection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        try:
+            cursor.execute("SELECT sin(0)")
+        except sqlite3.OperationalError:
+            # SQLite built without its math functions; ColumnAggregation's circular_mean needs these.
+            for name, argumentCount, function in [
+                ("sin", 1, math.sin), ("cos", 1, math.cos), ("atan2", 2, math.atan2),
+                ("radians", 1, math.radians), ("degrees", 1, math.degrees),
+            ]:
+                dbapiConnection.create_function(
+                    name, argumentCount,
+                    lambda *values, function=function: None if None in values else function(*values),
+                    deterministic=True,
+                )
+        cursor.close()
 
-    def _enqueue_operation(self, operation: Callable[[], None]) -> None:
+    def _onCheckout(self, dbapiConnection: Any, connectionRecord: Any, connectionProxy: Any) -> None:
+        # Pooled connections pick up a switch between the durable and bulk settings on their next use.
+        pragmas = self._pragmas
+        if connectionRecord.info.get("pragmas") is pragmas:
+            return
+        cursor = dbapiConnection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+        connectionRecord.info["pragmas"] = pragmas
+
+    def _nextSequence(self) -> int:
+        # Caller must hold self._writeCondition.
+        self._operationSequence += 1
+        return self._operationSequence
+
+    def _enqueue_operation(
+        self,
+        operation: Callable[[], None] | DatabaseOperation,
+        tableName: str | None = None,
+        priority: OperationPriority = "bulk",
+        onRejected: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """
+        Queue an operation on the writer. After shutdown began the operation is dropped;
+        onRejected is then called with the error, so whoever waits on it is released.
+        """
         if self._is_shutting_down:
-            # Log a warning if needed; here we simply print a warning.
-            print("Warning: Attempt to enqueue an operation after shutdown has begun.")
+            self._rejectOperation(onRejected)
             return
+        if not isinstance(operation, DatabaseOperation):
+            operation = DatabaseOperation(function=operation, tableName=tableName, isWrite=True, priority=priority)
+        with self._writeCondition:
+            operation.sequence = self._nextSequence()
+            if operation.isWrite and operation.tableName is not None:
+                self._pendingWrites.setdefault(operation.tableName, []).append(operation.sequence)
+                self._snapshotTables.discard(operation.tableName)
         self._operation_queue.put(operation)
 
+    def _enqueueRead(
+        self,
+        operation: Callable[[], None],
+        tableName: str,
+        priority: OperationPriority = "interactive",
+        onRejected: Callable[[Exception], None] | None = None,
+    ) -> None:
+        readOperation = DatabaseOperation(function=operation, tableName=tableName, isWrite=False, priority=priority)
+        if self.readerPoolSize <= 0:
+            # No reader pool: the writer queue keeps the read behind earlier writes on its table.
+            self._enqueue_operation(readOperation, onRejected=onRejected)
+            return
+        if self._is_shutting_down:
+            self._rejectOperation(onRejected)
+            return
+        with self._writeCondition:
+            readOperation.sequence = self._nextSequence()
+        self._read_queue.put(readOperation)
+
+    @staticmethod
+    def _rejectOperation(onRejected: Callable[[Exception], None] | None) -> None:
+        print("Warning: Attempt to enqueue an operation after shutdown has begun.")
+        if onRejected is not None:
+            onRejected(RuntimeError("CentralDatabaseConnection is shutting down."))
+
+    def _writesSettled(self, tableName: str | None, sequence: int) -> bool:
+        # Caller must hold self._writeCondition.
+        pending = self._pendingWrites.get(tableName) if tableName else None
+        return not pending or pending[0] > sequence
+
+    def _markWriteDone(self, operation: DatabaseOperation) -> None:
+        if not operation.isWrite or operation.tableName is None:
+            return
+        with self._writeCondition:
+            pending = self._pendingWrites.get(operation.tableName)
+            if pending:
+                pending.remove(operation.sequence)
+                if not pending:
+                    del self._pendingWrites[operation.tableName]
+            self._writeCondition.notify_all()
+
+    def _runOperation(self, operation: DatabaseOperation) -> None:
+        try:
+            operation.function()
+        except Exception as op_err:
+            # Log the error and continue processing remaining operations.
+            print(f"Error during operation: {op_err}")
+
     def _worker(self) -> None:
+        carried: DatabaseOperation | None = None
+        while not self._stop_event.is_set() or carried is not None:
+            if carried is not None:
+                operation, carried = carried, None
+            else:
+                try:
+                    operation = self._operation_queue.get(timeout=1)
+                except Empty:
+                    continue
+            batch = [operation]
+            try:
+                if operation.isInsert:
+                    carried = self._collectInserts(batch)
+                started = time.perf_counter()
+                self._runBatch(batch)
+                self._recordBusy("writer", len(batch), time.perf_counter() - started)
+            finally:
+                for done in batch:
+                    self._releaseWriteData(done)
+                    self._markWriteDone(done)
+                    self._operation_queue.task_done()
+
+    def _collectInserts(self, batch: list[DatabaseOperation]) -> DatabaseOperation | None:
+        """
+        Append to batch the inserts queued right after batch[0] that target the same table,
+        up to writeCoalesceMaxRows rows or writeCoalesceLatency seconds of waiting.
+        Returns the first operation that could not join, to be run next.
+        """
+        first = batch[0]
+        rowCount = first.rowCount
+        deadline = time.perf_counter() + self.writeCoalesceLatency
+        while rowCount < self.writeCoalesceMaxRows:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    nextOperation = self._operation_queue.get(timeout=remaining)
+                else:
+                    nextOperation = self._operation_queue.get_nowait()
+            except Empty:
+                return None
+            if not first.fCanCoalesceWith(nextOperation):
+                return nextOperation
+            batch.append(nextOperation)
+            rowCount += nextOperation.rowCount
+        return None
+
+    def _runBatch(self, batch: list[DatabaseOperation]) -> None:
+        if len(batch) == 1:
+            self._runOperation(batch[0])
+            return
+        first = batch[0]
+        try:
+            self._insertFrames(
+                first.model, first.table, [op.fGetData() for op in batch], first.onConflict  # type: ignore[arg-type]
+            )
+        except Exception as batchError:
+            # Run the writes one by one so a single bad frame does not discard the others.
+            print(f"Error during coalesced insert of {len(batch)} writes: {batchError}. Retrying them separately.")
+            for operation in batch:
+                self._runOperation(operation)
+
+    def _readerWorker(self) -> None:
         while not self._stop_event.is_set():
             try:
-                operation = self._operation_queue.get(timeout=1)
+                operation = self._read_queue.get(timeout=1)
             except Empty:
                 continue
             try:
-                operation()
-            except Exception as op_err:
-                # Log the error and continue processing remaining operations.
-                print(f"Error during operation: {op_err}")
+                # Only wait for the writes on this table that were queued before the read.
+                with self._writeCondition:
+                    self._writeCondition.wait_for(
+                        lambda: self._writesSettled(operation.tableName, operation.sequence)
+                    )
+                started = time.perf_counter()
+                self._runOperation(operation)
+                self._recordBusy("reader", 1, time.perf_counter() - started)
             finally:
-                self._operation_queue.task_done()
+                self._read_queue.task_done()
 
     def _ensureWorker(self) -> None:
         with self._lock:
@@ -76,86 +343,613 @@ class CentralDatabaseConnection:
                 self._stop_event.clear()
                 self._worker_thread = Thread(target=self._worker, daemon=True)
                 self._worker_thread.start()
+            self._reader_threads = [thread for thread in self._reader_threads if thread.is_alive()]
+            while len(self._reader_threads) < self.readerPoolSize:
+                reader = Thread(target=self._readerWorker, daemon=True)
+                reader.start()
+                self._reader_threads.append(reader)
+
+    def fSetReaderPoolSize(self, readerCount: int) -> None:
+        """
+        Set how many reader threads serve fRead concurrently with the writer.
+        Use 0 to route every read through the single writer queue.
+        """
+        if readerCount < 0:
+            raise ValueError("readerCount must be zero or positive.")
+        self.readerPoolSize = readerCount
+        if readerCount > 0:
+            self._ensureWorker()
 
     def fRead(
         self,
         tableName: str,
-        callback: Callable[[pl.DataFrame], None] | None,
-        tableFilter: dict | None = None,
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
         dateColumn: str | None = None,
         startDate: date | None = None,
-        endDate: date | None = None
-    ) -> None:
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+        priority: OperationPriority = "interactive",
+        dtypes: dict[str, pl.DataType] | None = None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Queue a read of the table and return a Future that resolves with the DataFrame,
+        or with the exception raised while reading. The optional callback is called with
+        the DataFrame on the CallbackDispatcher executor before the Future resolves.
+        With columns, only those columns are selected and materialized.
+        dtypes overrides the Polars type of the selected columns it names, e.g. Float32
+        or Categorical; the rows are decoded straight into those types.
+        Reads are interactive by default; pass priority="bulk" for long analysis scans.
+        """
+        return self._submitQuery(
+            "fRead", tableName,
+            lambda table: self._buildReadQuery(table, tableFilter, dateColumn, startDate, endDate, columns),
+            callback, priority, dtypes,
+        )
+
+    def fAggregate(
+        self,
+        tableName: str,
+        groupBy: list[str],
+        aggregations: list[ColumnAggregation],
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        priority: OperationPriority = "interactive",
+    ) -> "Future[pl.DataFrame]":
+        """
+        Queue a grouped read: the GROUP BY runs inside SQLite and only one row per group
+        is fetched. Returns a Future like fRead, with the groupBy columns followed by
+        the aggregations' outputs.
+        """
+        def buildQuery(table: Table) -> Select[Any]:
+            missing = [name for name in groupBy if name not in table.c]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in table '{table.name}'")
+            keys = [table.c[name] for name in groupBy]
+            return (
+                self._buildReadQuery(table, tableFilter, dateColumn, startDate, endDate, columns=[])
+                .with_only_columns(*keys, *(aggregation.toSqlExpression(table) for aggregation in aggregations))
+                .group_by(*keys)
+            )
+
+        return self._submitQuery("fAggregate", tableName, buildQuery, callback, priority)
+
+    def _submitQuery(
+        self,
+        caller: str,
+        tableName: str,
+        buildQuery: Callable[[Table], Select[Any]],
+        callback: Callable[[pl.DataFrame], None] | None,
+        priority: OperationPriority,
+        dtypes: dict[str, pl.DataType] | None = None,
+    ) -> "Future[pl.DataFrame]":
         from emater_data_science.logging.log_in_disk import LogInDisk
 
         LogInDisk().log(
             level="executionState",
-            message="CentralDatabaseConnection::fRead - Called.",
+            message=f"CentralDatabaseConnection::{caller} - Called.",
             variablesJson=f"tableName={tableName}",
         )
 
+        future: Future[pl.DataFrame] = Future()
+
         def operation() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
             LogInDisk().log(
                 level="executionState",
-                message="CentralDatabaseConnection::fRead - Operation started execution.",
+                message=f"CentralDatabaseConnection::{caller} - Operation started execution.",
                 variablesJson=f"tableName={tableName}",
             )
-            if self._engine is None:
-                raise ValueError("Database engine not initialized.")
+            try:
+                if self._engine is None or self.schemaCatalog is None:
+                    raise ValueError("Database engine not initialized.")
+
+                table = self.schemaCatalog.fGetTable(tableName)
+                query = buildQuery(table)
+
+                with self._readConnection(tableName) as conn:
+                    self._recordIndexUsage(conn, tableName, query)
+                    df = self._executeRead(conn, query, dtypes)
+            except Exception as readError:
+                future.set_exception(readError)
+                raise
+            # The callback runs on the callback executor; this thread moves on to the next operation.
+            CallbackDispatcher().fDeliver(future, df, callback)
 
-            self.metadata.reflect(bind=self._engine, only=[tableName])
-            if tableName not in self.metadata.tables:
-                raise ValueError(f"Table '{tableName}' not found.")
+        self._enqueueRead(operation, tableName, priority, onRejected=future.set_exception)
+        return future
 
-            table = self.metadata.tables[tableName]
+    @staticmethod
+    def _buildReadQuery(
+        table: Table,
+        tableFilter: dict[str, Any] | TableFilter | None,
+        dateColumn: str | None,
+        startDate: date | None,
+        endDate: date | None,
+        columns: list[str] | None = None,
+    ) -> Select[Any]:
+        if columns is None:
             query = select(table)
+        else:
+            missing = [name for name in columns if name not in table.c]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in table '{table.name}'")
+            query = select(*(table.c[name] for name in columns))
 
-            # Date filtering
-            if dateColumn and (startDate or endDate):
-                if dateColumn not in table.c:
-                    raise ValueError(f"Date column '{dateColumn}' not found in table '{tableName}'")
-                if startDate:
-                    query = query.where(table.c[dateColumn] >= startDate)
-                if endDate:
-                    query = query.where(table.c[dateColumn] <= endDate)
-
-            # General column = value filters
-            if tableFilter:
-                for col, val in tableFilter.items():
-                    if col in table.c:
-                        query = query.where(table.c[col] == val)
+        # Date filtering
+        if dateColumn and (startDate or endDate):
+            if dateColumn not in table.c:
+                raise ValueError(f"Date column '{dateColumn}' not found in table '{table.name}'")
+            if startDate:
+                query = query.where(table.c[dateColumn] >= startDate)
+            if endDate:
+                query = query.where(table.c[dateColumn] <= endDate)
 
-            with self._engine.connect() as conn:
-                results = conn.execute(statement=query).fetchall()
+        # Column filters compiled into the WHERE clause
+        for filterObject in asDataFilters(tableFilter, table.c.keys()):
+            query = query.where(filterObject.toSqlExpression(table))
+        return query
+
+    def fReadBatches(
+        self,
+        tableName: str,
+        batchSize: int = 100_000,
+        partitionBy: str | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Yield the table as DataFrames of at most batchSize rows, or one DataFrame per
+        value of partitionBy. A reader thread streams the query into a small bounded
+        queue, so memory stays proportional to a couple of batches (or the largest
+        partition) instead of the whole result. The reader is held until the
+        generator is exhausted or closed.
+        """
+        from emater_data_science.logging.log_in_disk import LogInDisk
+
+        LogInDisk().log(
+            level="executionState",
+            message="CentralDatabaseConnection::fReadBatches - Called.",
+            variablesJson=f"tableName={tableName}, batchSize={batchSize}, partitionBy={partitionBy}",
+        )
+        batchQueue: Queue[Any] = Queue(maxsize=self.batchQueueDepth)
+        cancelled = Event()
+        finished = object()
 
-            results_dicts = [dict(row._mapping) for row in results]
+        def putBatch(item: Any) -> bool:
+            while not cancelled.is_set():
+                try:
+                    batchQueue.put(item, timeout=0.5)
+                    return True
+                except Full:
+                    continue
+            return False
 
+        def operation() -> None:
             try:
-                df = pl.DataFrame(results_dicts, infer_schema_length=None)
+                if self._engine is None or self.schemaCatalog is None:
+                    raise ValueError("Database engine not initialized.")
+                table = self.schemaCatalog.fGetTable(tableName)
+                selected = columns
+                if selected is not None and partitionBy is not None and partitionBy not in selected:
+                    # The partition column is needed to split the batches.
+                    selected = [*selected, partitionBy]
+                query = self._buildReadQuery(table, tableFilter, dateColumn, startDate, endDate, selected)
+                if partitionBy is not None:
+                    if partitionBy not in table.c:
+                        raise ValueError(f"Partition column '{partitionBy}' not found in table '{tableName}'")
+                    query = query.order_by(table.c[partitionBy])
+                schema = fPolarsSchemaFromColumns(cast("Iterable[Column[Any]]", query.selected_columns))
+                with self._readConnection(tableName) as conn:
+                    self._recordIndexUsage(conn, tableName, query)
+                    batches = fIterColumnar(conn, query, schema, chunkSize=batchSize)
+                    if partitionBy is not None:
+                        batches = fSplitPartitions(batches, partitionBy)
+                    for batch in batches:
+                        if not putBatch(batch):
+                            return
             except Exception as err:
-                from pprint import pprint
-                print("\n--- Failed to create DataFrame ---")
-                print(f"Error: {err}")
-                print(f"Sample rows ({min(5, len(results_dicts))}):")
-                pprint(results_dicts[:5])
+                putBatch(err)
+                raise
+            finally:
+                putBatch(finished)
+
+        # The queue is still empty, so the error is handed to the consumer without blocking.
+        self._enqueueRead(operation, tableName, priority="bulk", onRejected=batchQueue.put)
+
+        try:
+            while True:
+                item = batchQueue.get()
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+
+    @contextmanager
+    def _readConnection(self, tableName: str) -> Iterator[Connection]:
+        # Caller checked that the disk engine is initialized.
+        with self._writeCondition:
+            useSnapshot = self._snapshotEngine is not None and tableName in self._snapshotTables
+            engine = cast(Engine, self._snapshotEngine if useSnapshot else self._engine)
+            if useSnapshot:
+                self._snapshotReaders += 1
+        try:
+            with engine.connect() as conn:
+                yield conn
+        finally:
+            if useSnapshot:
+                with self._writeCondition:
+                    self._snapshotReaders -= 1
+                    self._writeCondition.notify_all()
+
+    def fOpenSnapshot(self, tables: list[str] | None = None) -> "Future[list[str]]":
+        """
+        Copy the database, or only the given tables, into an in-memory SQLite database and
+        serve the reads of those tables from it until fCloseSnapshot. The copy is queued on
+        the writer as a barrier, so it runs after every write queued before it, whatever
+        their priority, and the reader pool then reads from memory. Writes still go to the disk database; a table written while the
+        snapshot is open is read from disk again from then on, so reads never go stale.
+        Returns a Future resolving with the tables in the snapshot.
+        """
+        if self._engine is None or self._databasePath is None:
+            raise ValueError("Database engine not initialized.")
+        databasePath = self._databasePath
+        future: Future[list[str]] = Future()
+
+        def operation() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                self.fCloseSnapshot()
+                start = time.perf_counter()
+                # A named memdb database is shared by every connection of this process that opens
+                # it, and lives while one of them is open; the keeper holds it for the session.
+                memoryUri = f"file:/emater_snapshot_{uuid.uuid4().hex}?vfs=memdb"
+                keeper = sqlite3.connect(memoryUri, uri=True, check_same_thread=False)
+                try:
+                    copied = self._copySnapshot(databasePath, memoryUri, keeper, tables)
+                    pageCount = keeper.execute("PRAGMA page_count").fetchone()[0]
+                    pageSize = keeper.execute("PRAGMA page_size").fetchone()[0]
+                except BaseException:
+                    keeper.close()
+                    raise
+                snapshotEngine = create_engine(
+                    "sqlite://",
+                    creator=lambda: sqlite3.connect(memoryUri, uri=True, check_same_thread=False),
+                    poolclass=QueuePool,
+                    pool_size=max(self.readerPoolSize, 1),
+                    echo=False,
+                )
+                event.listen(snapshotEngine, "connect", self._onSnapshotConnect)
+                with self._writeCondition:
+                    self._snapshotKeeper = keeper
+                    self._snapshotEngine = snapshotEngine
+                    # Writes queued after the barrier have not run yet; their tables stay on disk.
+                    self._snapshotTables = set(copied) - set(self._pendingWrites)
+                print(
+                    f"snapshot of {len(copied)} tables ({pageCount * pageSize / 1024**2:.1f} MB) "
+                    f"loaded into memory in {time.perf_counter() - start:.2f}s"
+                )
+            except Exception as snapshotError:
+                future.set_exception(snapshotError)
                 raise
+            future.set_result(self.fSnapshotTables())
+
+        self._enqueue_operation(
+            DatabaseOperation(function=operation, priority="interactive", isBarrier=True),
+            onRejected=future.set_exception,
+        )
+        return future
+
+    @staticmethod
+    def _copySnapshot(
+        databasePath: str,
+        memoryUri: str,
+        memoryConnection: sqlite3.Connection,
+        tables: list[str] | None,
+    ) -> list[str]:
+        listTables = "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        # The copy is read through its own connection: a single read transaction, so it is consistent.
+        # sqlite3's backup() leaves a WAL database's header on the copy, which memdb cannot open;
+        # VACUUM INTO writes the same online copy as a plain database.
+        source = sqlite3.connect(Path(databasePath).resolve().as_uri(), uri=True)
+        try:
+            if tables is None:
+                source.execute("VACUUM INTO ?", (memoryUri,))
+                return [row[0] for row in memoryConnection.execute(listTables)]
+            existing = {row[0] for row in source.execute(listTables)}
+            copied = [name for name in tables if name in existing]
+            source.execute("ATTACH DATABASE ? AS snapshot", (memoryUri,))
+            for name in copied:
+                quoted = '"' + name.replace('"', '""') + '"'
+                definitions = source.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL ORDER BY type = 'index'",
+                    (name,),
+                ).fetchall()
+                # The definitions name no schema, so they run on the memory connection's main database.
+                memoryConnection.execute(definitions[0][0])
+                source.execute(f"INSERT INTO snapshot.{quoted} SELECT * FROM main.{quoted}")
+                source.commit()
+                for (indexDefinition,) in definitions[1:]:
+                    memoryConnection.execute(indexDefinition)
+            memoryConnection.execute("ANALYZE")
+            memoryConnection.commit()
+            return copied
+        finally:
+            source.close()
+
+    @classmethod
+    def _onSnapshotConnect(cls, dbapiConnection: Any, connectionRecord: Any) -> None:
+        cls._onConnect(dbapiConnection, connectionRecord)
+        # Writes belong to the disk database; refuse any that reach the copy.
+        cursor = dbapiConnection.cursor()
+        cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    def fCloseSnapshot(self) -> None:
+        """
+        Serve every read from the disk database again and free the in-memory copy once
+        the reads already running on it finish.
+        """
+        with self._writeCondition:
+            snapshotEngine, self._snapshotEngine = self._snapshotEngine, None
+            keeper, self._snapshotKeeper = self._snapshotKeeper, None
+            self._snapshotTables = set()
+            # The copy lives while a connection is open on it; a connection opened after the
+            # keeper closes would find an empty database.
+            self._writeCondition.wait_for(lambda: self._snapshotReaders == 0)
+        if snapshotEngine is not None:
+            snapshotEngine.dispose()
+        if keeper is not None:
+            keeper.close()
+
+    def fSnapshotTables(self) -> list[str]:
+        """
+        Tables whose reads are currently served from the in-memory snapshot.
+        """
+        with self._writeCondition:
+            return sorted(self._snapshotTables)
 
-            if callback:
-                callback(df)
+    def _executeRead(
+        self, conn: Connection, query: Select[Any], dtypes: dict[str, pl.DataType] | None = None
+    ) -> pl.DataFrame:
+        overrides = {
+            name: dtype for name, dtype in (dtypes or {}).items() if name in query.selected_columns.keys()
+        }
+        schema = fPolarsSchemaFromColumns(cast("Iterable[Column[Any]]", query.selected_columns))
+        schema.update(overrides)
+        if self.readEngine == "columnar":
+            return fReadColumnar(conn, query, schema, chunkSize=self.readChunkSize)
+        df = self._readRows(conn, query)
+        if df.is_empty():
+            return fEmptyFrame(schema)
+        # Values alone leave all-null columns untyped; the columns give the same types as the columnar path.
+        return df.cast({name: dtype for name, dtype in schema.items() if dtype is not None})
 
-        self._enqueue_operation(operation)
+    @staticmethod
+    def _readRows(conn: Connection, query: Select[Any]) -> pl.DataFrame:
+        # Original row-by-row path, kept for comparison in benchmark_read_engines.
+        results = conn.execute(statement=query).fetchall()
+
+        results_dicts = [dict(row._mapping) for row in results]
+
+        try:
+            df = pl.DataFrame(results_dicts, infer_schema_length=None)
+        except Exception as err:
+            from pprint import pprint
+            print("\n--- Failed to create DataFrame ---")
+            print(f"Error: {err}")
+            print(f"Sample rows ({min(5, len(results_dicts))}):")
+            pprint(results_dicts[:5])
+            raise
+        return df
+
+    def _recordIndexUsage(self, conn: Connection, tableName: str, query: Select[Any]) -> None:
+        if self.indexUsageSampleRate <= 0 or random.random() >= self.indexUsageSampleRate:
+            return
+        # EXPLAIN QUERY PLAN only prepares the statement, so the bound values are irrelevant.
+        # IN lists are expanded at execution time; render them so the text is valid SQL.
+        compiled = query.compile(dialect=conn.dialect, compile_kwargs={"render_postcompile": True})
+        parameters = tuple(None for _ in (compiled.positiontup or ()))
+        planRows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters).fetchall()
+        details = [str(row[-1]) for row in planRows]
+        indexes = [match.group(1) or match.group(2) for detail in details for match in _INDEX_IN_PLAN.finditer(detail)]
+        with self._indexUsageLock:
+            self._indexUsage.append(
+                {
+                    "time": datetime.now(),
+                    "tableName": tableName,
+                    "usedIndex": bool(indexes),
+                    "indexes": ", ".join(indexes),
+                    "plan": " | ".join(details),
+                }
+            )
+
+    def fGetIndexUsageReport(self) -> pl.DataFrame:
+        """
+        One row per recent sampled read, telling whether SQLite planned it with an index.
+        Set indexUsageSampleRate above 0 first; no read is sampled by default.
+        """
+        with self._indexUsageLock:
+            entries = list(self._indexUsage)
+        return pl.DataFrame(
+            entries,
+            schema={"time": pl.Datetime("us"), "tableName": pl.Utf8, "usedIndex": pl.Boolean, "indexes": pl.Utf8, "plan": pl.Utf8},
+        )
+
+    def fEnsureIndexes(self, model: type[T], rebuild: bool = False) -> None:
+        """
+        Create the indexes declared on the model's table that do not exist yet.
+        With rebuild, also REINDEX them, which is useful after large bulk loads.
+        ANALYZE runs afterwards so the planner has fresh statistics.
+        """
+        from emater_data_science.logging.log_in_disk import LogInDisk
+
+        table_obj: Table = cast(Table, model.__table__)
+        if self._engine is None or self.schemaCatalog is None:
+            raise ValueError("Database engine not initialized.")
+        engine = self._engine
+        schemaCatalog = self.schemaCatalog
+
+        def operation() -> None:
+            if not schemaCatalog.fHasTable(table_obj.name):
+                return
+            LogInDisk().log(
+                level="executionState",
+                message="CentralDatabaseConnection::fEnsureIndexes - Operation started execution.",
+                variablesJson=f"table={table_obj.name}, rebuild={rebuild}",
+            )
+            preparer = engine.dialect.identifier_preparer
+            with engine.begin() as conn:
+                for index in table_obj.indexes:
+                    index.create(bind=conn, checkfirst=True)
+                    if rebuild:
+                        conn.exec_driver_sql(f"REINDEX {preparer.quote(cast(str, index.name))}")
+                conn.exec_driver_sql(f"ANALYZE {preparer.format_table(table_obj)}")
+            schemaCatalog.fInvalidate(table_obj.name)
+
+        self._enqueue_operation(operation, table_obj.name)
+
+    @contextmanager
+    def fBulkLoad(self, models: list[type[T]]) -> Iterator[None]:
+        """
+        Context manager for large backfills into the models' tables.
+        Inside it the writer runs with synchronous=OFF, a 256 MB page cache, in-memory temp
+        storage and rarer WAL checkpoints, and the tables' secondary indexes are dropped so
+        inserts do not maintain them; a table first created inside the block loses them
+        right after creation. Natural key indexes stay, upserts need them.
+        On exit the indexes are recreated, ANALYZE runs, the WAL is checkpointed and the
+        durable settings come back. The switches are queued like writes, so every write
+        queued inside the block runs in bulk mode. A power loss during the block can lose
+        its last transactions, never earlier data.
+        """
+        if self._engine is None:
+            raise ValueError("Database engine not initialized.")
+        engine = self._engine
+        tables: list[Table] = [cast(Table, model.__table__) for model in models]
+
+        def enterBulkMode() -> None:
+            self._bulkLoadDepth += 1
+            self._pragmas = _BULK_PRAGMAS
+            with engine.begin() as conn:
+                for table_obj in tables:
+                    self._bulkTables[table_obj.name] = self._bulkTables.get(table_obj.name, 0) + 1
+                    self._dropSecondaryIndexes(conn, table_obj)
+            print(f"bulk load started for {[table_obj.name for table_obj in tables]}")
+
+        def leaveBulkMode() -> None:
+            for table_obj in tables:
+                self._bulkTables[table_obj.name] -= 1
+                if not self._bulkTables[table_obj.name]:
+                    del self._bulkTables[table_obj.name]
+            self._bulkLoadDepth -= 1
+            if self._bulkLoadDepth > 0:
+                return
+            self._pragmas = _DURABLE_PRAGMAS
+            with engine.connect() as conn:
+                conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            print(f"bulk load finished for {[table_obj.name for table_obj in tables]}")
+
+        self._enqueue_operation(enterBulkMode, priority="bulk")
+        try:
+            yield
+        finally:
+            # fEnsureIndexes is queued behind the loaded data, so it builds each index once over all of it.
+            for model in models:
+                self.fEnsureIndexes(model)
+            self._enqueue_operation(leaveBulkMode, priority="bulk")
+
+    @staticmethod
+    def _dropSecondaryIndexes(conn: Connection, table_obj: Table) -> None:
+        preparer = conn.dialect.identifier_preparer
+        for index in table_obj.indexes:
+            if not index.unique:
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {preparer.quote(cast(str, index.name))}")
+
+    def _createTable(self, conn: Connection, table_obj: Table) -> None:
+        """
+        Create table_obj if it does not exist. Inside an fBulkLoad block on it the secondary
+        indexes are dropped again right away, like those of tables that existed before the
+        block, and fEnsureIndexes builds them once the data is in. Runs on the writer.
+        """
+        table_obj.create(bind=conn, checkfirst=True)
+        if table_obj.name in self._bulkTables:
+            self._dropSecondaryIndexes(conn, table_obj)
 
     def fQueueIsEmpty(self) -> bool:
-        return self._operation_queue.empty()
+        return self._operation_queue.empty() and self._read_queue.empty()
+
+    def fGetQueueWaitStats(self) -> pl.DataFrame:
+        """
+        Time operations spent queued, per queue ("write" or "read") and priority class.
+        """
+        return pl.concat([
+            self._operation_queue.fGetWaitStats().with_columns(pl.lit("write").alias("queue")),
+            self._read_queue.fGetWaitStats().with_columns(pl.lit("read").alias("queue")),
+        ]).select("queue", pl.exclude("queue"))
     
 
-    def fWrite(self, model: type[T], data: pl.DataFrame) -> None:
-       
+    def _recordBusy(self, role: str, operations: int, seconds: float) -> None:
+        with self._workerStatsLock:
+            self._workerStats[role]["operations"] += operations
+            self._workerStats[role]["busySeconds"] += seconds
+
+    def fGetWorkerUtilization(self) -> pl.DataFrame:
+        """
+        Operations run by the writer and by the reader pool, seconds spent running them,
+        and utilization: the share of the threads' time since start spent on operations.
+        """
+        uptime = time.perf_counter() - self._startedAt
+        threadCounts = {"writer": 1, "reader": max(len(self._reader_threads), 1)}
+        with self._workerStatsLock:
+            rows = [
+                {
+                    "worker": role,
+                    "threads": threadCounts[role],
+                    "operations": int(stats["operations"]),
+                    "busySeconds": stats["busySeconds"],
+                    "utilization": stats["busySeconds"] / (uptime * threadCounts[role]) if uptime else 0.0,
+                }
+                for role, stats in self._workerStats.items()
+            ]
+        return pl.DataFrame(rows)
+
+    def fWrite(
+        self,
+        model: type[T],
+        data: pl.DataFrame,
+        priority: OperationPriority | None = None,
+        onConflict: Literal["update", "ignore", "append"] | None = None,
+    ) -> None:
+        """
+        Queue an insert of data into the model's table, creating the table first if needed.
+        When the model declares a natural key (a unique Index with info={"naturalKey": True})
+        the insert is an upsert on it: "update" (the default) overwrites rows whose values
+        changed, "ignore" keeps the stored rows. "append" inserts without a conflict clause,
+        which is the default for models without a natural key.
+        """
         table_obj: Table = cast(Table, model.__table__)
+        if onConflict is None:
+            onConflict = "update" if fNaturalKey(table_obj) else "append"
+        elif onConflict != "append" and not fNaturalKey(table_obj):
+            raise ValueError(f"Table '{table_obj.name}' declares no natural key to upsert on.")
         sample = data.head(2).to_dicts()
         from emater_data_science.logging.logging_table_model import LoggingTable
         from emater_data_science.logging.log_in_disk import LogInDisk
 
+        if priority is None:
+            priority = "logging" if issubclass(model, LoggingTable) else "bulk"
+
         # Log only if this operation was enqueued before shutdown began.
         if not self._stop_event.is_set() and not issubclass(model, LoggingTable):
             LogInDisk().log(
@@ -164,12 +958,15 @@ class CentralDatabaseConnection:
                 variablesJson=f"data (truncated)={sample}",
             )
 
-        if self._engine is None:
+        if self._engine is None or self.schemaCatalog is None:
             raise ValueError("Database engine not initialized.")
         engine = self._engine
-        if not inspect(engine).has_table(table_obj.name):
+        schemaCatalog = self.schemaCatalog
+        if schemaCatalog.fHasTable(table_obj.name):
+            self._checkStoredSchema(model)
+        else:
             def createTable() -> None:
-                if inspect(engine).has_table(table_obj.name):
+                if schemaCatalog.fHasTable(table_obj.name):
                     return
                 print(f'creating table {table_obj.name}')
                 LogInDisk().log(
@@ -178,46 +975,216 @@ class CentralDatabaseConnection:
                     variablesJson="",
                 )
                 try:
-                    table_obj.create(bind=engine)
-                    self.metadata.reflect(bind=engine, only=[table_obj.name])
+                    with engine.begin() as conn:
+                        self._createTable(conn, table_obj)
+                    schemaCatalog.fRegisterTable(table_obj.name)
                 except Exception:
                     print(
                         f"\n*** CRITICAL ERROR: Exception while creating table '{table_obj.name}'. Data: {sample} ***\n"
                     )
                     raise
 
-            self._enqueue_operation(createTable)
+            self._enqueue_operation(createTable, table_obj.name, priority)
+
+        conflictMode = None if onConflict == "append" else onConflict
 
         def insertData() -> None:
-            print(f"inserting data {table_obj.name}")
-            nonlocal data
-            if not self._stop_event.is_set() and not issubclass(model, LoggingTable):
+            self._insertFrames(model, table_obj, [insertOperation.fGetData()], conflictMode)
+
+        insertOperation = DatabaseOperation(
+            function=insertData, tableName=table_obj.name, model=model, table=table_obj, priority=priority,
+            rowCount=data.height, onConflict=conflictMode,
+        )
+        self._admitWriteData(insertOperation, data)
+        self._enqueue_operation(insertOperation)
+
+    def _checkStoredSchema(self, model: type[T]) -> None:
+        """
+        Fail before queueing a write into a table created by an older version of its model:
+        a required column of the model that the table lacks, or a required column of the
+        table the model no longer has, would make every insert fail on the writer.
+        """
+        table_obj: Table = cast(Table, model.__table__)
+        if table_obj.name in self._schemasChecked or self.schemaCatalog is None:
+            return
+        stored = self.schemaCatalog.fGetTable(table_obj.name)
+        naturalKey = fNaturalKey(table_obj) or []
+        missing = [
+            column.name for column in table_obj.columns
+            if column.name not in stored.c and not column.primary_key
+            and (not column.nullable or column.name in naturalKey)
+        ]
+        dropped = [
+            column.name for column in stored.columns
+            if column.name not in table_obj.c and not column.nullable
+            and not column.primary_key and column.server_default is None
+        ]
+        if missing or dropped:
+            raise ValueError(
+                f"Table '{table_obj.name}' was created by an older version of its model "
+                f"(columns missing: {missing}, columns no longer in the model: {dropped}). "
+                f"Drop and create it again with DataInterface().fRecreateTable({model.__name__}), "
+                f"then load its data again."
+            )
+        self._schemasChecked.add(table_obj.name)
+
+    def fRecreateTable(self, model: type[T]) -> "Future[None]":
+        """
+        Drop the model's table and create it again from the model, e.g. after the model's
+        columns changed; the stored rows are lost and have to be loaded again. Runs on the
+        writer after every write queued before it on the table, and drops the cached schema.
+        """
+        from emater_data_science.logging.log_in_disk import LogInDisk
+
+        table_obj: Table = cast(Table, model.__table__)
+        if self._engine is None or self.schemaCatalog is None:
+            raise ValueError("Database engine not initialized.")
+        engine = self._engine
+        schemaCatalog = self.schemaCatalog
+        future: Future[None] = Future()
+
+        def operation() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                with engine.begin() as conn:
+                    table_obj.drop(bind=conn, checkfirst=True)
+                    self._createTable(conn, table_obj)
+                schemaCatalog.fInvalidate(table_obj.name)
+                schemaCatalog.fRegisterTable(table_obj.name)
+                self._naturalKeysReady.discard(table_obj.name)
+                self._schemasChecked.discard(table_obj.name)
+                print(f"recreated table {table_obj.name}")
                 LogInDisk().log(
                     level="executionState",
-                    message="CentralDatabaseConnection::fWrite - Operation started execution.",
-                    variablesJson=f"data (truncated)={sample}",
+                    message="CentralDatabaseConnection::fRecreateTable - Table recreated.",
+                    variablesJson=f"table={table_obj.name}",
                 )
-            dataAsDict = data.to_dicts()
-            del data
-            import gc
-            gc.collect()
+            except Exception as recreateError:
+                future.set_exception(recreateError)
+                raise
+            future.set_result(None)
 
+        self._enqueue_operation(operation, table_obj.name, onRejected=future.set_exception)
+        return future
+
+    def _admitWriteData(self, operation: DatabaseOperation, data: pl.DataFrame) -> None:
+        """
+        Attach data to the insert within the write queue byte budget: keep it in memory
+        if it fits, otherwise block until it fits or spill it to disk.
+        """
+        size = int(data.estimated_size())
+        with self._budgetCondition:
+            def fits() -> bool:
+                # A frame always fits in an empty queue, however large, so a write is never stuck.
+                return self._queuedWriteBytes == 0 or self._queuedWriteBytes + size <= self.writeQueueByteBudget
+
+            if not fits() and self.writeOverflowPolicy == "block" and current_thread() is not self._worker_thread:
+                # The writer itself must not block on its own queue (log flushes run there).
+                self._budgetCondition.wait_for(fits)
+            if fits() or self.writeOverflowPolicy == "block":
+                self._queuedWriteBytes += size
+                operation.data = data
+                operation.queuedBytes = size
+                return
+
+        spillPath = os.path.join(self.spillDirectory, f"emater_write_{uuid.uuid4().hex}.arrow")
+        data.write_ipc(spillPath)
+        operation.spillPath = spillPath
+        print(f"write queue over budget: spilled {operation.rowCount} rows for {operation.tableName} to {spillPath}")
+
+    def _releaseWriteData(self, operation: DatabaseOperation) -> None:
+        if operation.queuedBytes:
+            with self._budgetCondition:
+                self._queuedWriteBytes -= operation.queuedBytes
+                operation.queuedBytes = 0
+                self._budgetCondition.notify_all()
+        operation.fReleaseData()
+
+    def _ensureNaturalKey(self, conn: Connection, table_obj: Table) -> list[str]:
+        """
+        Create the natural key unique index on a table made before the model declared it.
+        ON CONFLICT needs that index; a table already holding duplicate keys cannot get it.
+        """
+        index = fNaturalKeyIndex(table_obj)
+        if index is None:
+            raise ValueError(f"Table '{table_obj.name}' declares no natural key to upsert on.")
+        if table_obj.name not in self._naturalKeysReady:
             try:
-                with engine.connect() as conn:
-                    stmt = insert(table_obj)
-                    conn.execute(stmt, dataAsDict)
-                    conn.commit()
-            except Exception:
-                print(
-                    f"\n*** CRITICAL ERROR: Exception during bulk insert into '{table_obj.name}'. Data: {sample} ***\n"
+                index.create(bind=conn, checkfirst=True)
+            except IntegrityError as duplicateError:
+                raise ValueError(
+                    f"Table '{table_obj.name}' has rows with duplicate natural keys "
+                    f"{[column.name for column in index.columns]}; remove them with fDropDuplicateKeys first."
+                ) from duplicateError
+            self._naturalKeysReady.add(table_obj.name)
+        return [column.name for column in index.columns]
+
+    def _insertFrames(
+        self,
+        model: type[T],
+        table_obj: Table,
+        frames: list[pl.DataFrame],
+        onConflict: Literal["update", "ignore"] | None = None,
+    ) -> None:
+        """
+        Insert the frames into table_obj in one transaction; rows are streamed in
+        variable-limit sized chunks. With onConflict the rows are upserted on the
+        table's natural key.
+        """
+        from emater_data_science.logging.logging_table_model import LoggingTable
+        from emater_data_science.logging.log_in_disk import LogInDisk
+
+        if self._engine is None:
+            raise ValueError("Database engine not initialized.")
+        print(f"inserting data {table_obj.name}")
+        isLog = issubclass(model, LoggingTable)
+        if not self._stop_event.is_set() and not isLog:
+            LogInDisk().log(
+                level="executionState",
+                message="CentralDatabaseConnection::fWrite - Operation started execution.",
+                variablesJson=f"table={table_obj.name}, writes={len(frames)}",
+            )
+        try:
+            start = time.perf_counter()
+            with self._engine.begin() as conn:
+                keyColumns = self._ensureNaturalKey(conn, table_obj) if onConflict else None
+                rowCount = sum(
+                    fInsertColumnar(conn, table_obj, frame, onConflict, keyColumns)
+                    for frame in frames
                 )
-                raise
+            elapsed = time.perf_counter() - start
+        except Exception:
+            sample = frames[0].head(2).to_dicts() if frames else []
+            print(
+                f"\n*** CRITICAL ERROR: Exception during bulk insert into '{table_obj.name}'. Data: {sample} ***\n"
+            )
+            raise
 
-        self._enqueue_operation(insertData)
+        rowsPerSecond = rowCount / elapsed if elapsed > 0 else float(rowCount)
+        if not isLog:
+            coalesced = f", {len(frames)} writes in one transaction" if len(frames) > 1 else ""
+            # An upsert only counts the rows it added or changed.
+            verb = "upserted (new or changed)" if onConflict else "inserted"
+            print(
+                f"{verb} {rowCount} rows into {table_obj.name} in {elapsed:.2f}s "
+                f"({rowsPerSecond:,.0f} rows/s{coalesced})"
+            )
+            if not self._stop_event.is_set():
+                LogInDisk().log(
+                    level="executionState",
+                    message="CentralDatabaseConnection::fWrite - Insert finished.",
+                    variablesJson=f"table={table_obj.name}, rows={rowCount}, writes={len(frames)}, onConflict={onConflict}, seconds={elapsed:.3f}, rowsPerSecond={rowsPerSecond:.0f}",
+                )
 
-    def fDeleteRows(self, table: Table, tableFilter: dict) -> None:
+    def fDeleteRows(self, table: Table | str, tableFilter: dict[str, Any] | TableFilter) -> None:
         from emater_data_science.logging.log_in_disk import LogInDisk
 
+        if isinstance(table, str):
+            if self.schemaCatalog is None:
+                raise ValueError("Database engine not initialized.")
+            table = self.schemaCatalog.fGetTable(table)
+
         LogInDisk().log(
             level="executionState",
             message="CentralDatabaseConnection::fDelete - Called.",
@@ -236,27 +1203,196 @@ class CentralDatabaseConnection:
                 raise ValueError("Database engine not initialized.")
             with self._engine.connect() as conn:
                 stmt = delete(table=table)
-                for col, val in tableFilter.items():
-                    if col in table.c:
-                        stmt = stmt.where(table.c[col] == val)
+                for filterObject in asDataFilters(tableFilter, table.c.keys()):
+                    stmt = stmt.where(filterObject.toSqlExpression(table))
                 conn.execute(statement=stmt)
                 conn.commit()
 
-        self._enqueue_operation(operation)
+        self._enqueue_operation(operation, table.name)
+
+    def fReplaceYear(
+        self, model: type[T], dateColumn: str, year: int, data: pl.DataFrame | Iterable[pl.DataFrame]
+    ) -> "Future[int]":
+        """
+        Replace every row of the model's table whose dateColumn falls in year with data:
+        the delete and the insert run on the writer in one transaction, so reads see either
+        the old or the new year. This is what fReplacePartition does for a table kept in
+        SQLite, e.g. one loaded before its model moved to Parquet. data may be an iterable
+        of DataFrames, consumed on the writer: it must not wait on a storage Future, whose
+        operation would queue behind this one. Resolves with the number of rows deleted.
+        """
+        table_obj: Table = cast(Table, model.__table__)
+        if dateColumn not in table_obj.c:
+            raise ValueError(f"Date column '{dateColumn}' not found in table '{table_obj.name}'")
+        if self._engine is None or self.schemaCatalog is None:
+            raise ValueError("Database engine not initialized.")
+        engine = self._engine
+        schemaCatalog = self.schemaCatalog
+        if schemaCatalog.fHasTable(table_obj.name):
+            self._checkStoredSchema(model)
+        conflictMode = "update" if fNaturalKey(table_obj) else None
+        future: Future[int] = Future()
+
+        def operation() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                start = time.perf_counter()
+                column = table_obj.c[dateColumn]
+                with engine.begin() as conn:
+                    self._createTable(conn, table_obj)
+                    result = conn.execute(
+                        delete(table_obj).where(column >= date(year, 1, 1), column < date(year + 1, 1, 1))
+                    )
+                    keyColumns = self._ensureNaturalKey(conn, table_obj) if conflictMode else None
+                    rowCount = 0
+                    for frame in [data] if isinstance(data, pl.DataFrame) else data:
+                        outside = frame.filter(pl.col(dateColumn).dt.year().ne_missing(year)).height
+                        if outside:
+                            raise ValueError(f"{outside} rows of the data for '{table_obj.name}' are not in year {year}.")
+                        rowCount += fInsertColumnar(conn, table_obj, frame, conflictMode, keyColumns)  # type: ignore[arg-type]
+                schemaCatalog.fRegisterTable(table_obj.name)
+                print(
+                    f"replaced year {year} of {table_obj.name}: {result.rowcount} rows deleted, "
+                    f"{rowCount} inserted in {time.perf_counter() - start:.2f}s"
+                )
+            except Exception as replaceError:
+                future.set_exception(replaceError)
+                raise
+            future.set_result(result.rowcount)
+
+        self._enqueue_operation(operation, table_obj.name, onRejected=future.set_exception)
+        return future
+
+    def fDropDuplicateKeys(self, model: type[T]) -> None:
+        """
+        Keep only the most recently inserted row of each natural key in the model's table,
+        then create the natural key unique index. Needed once on tables loaded
+        append-only before the model declared its natural key.
+        """
+        from emater_data_science.logging.log_in_disk import LogInDisk
+
+        table_obj: Table = cast(Table, model.__table__)
+        index = fNaturalKeyIndex(table_obj)
+        if index is None:
+            raise ValueError(f"Table '{table_obj.name}' declares no natural key.")
+        if self._engine is None or self.schemaCatalog is None:
+            raise ValueError("Database engine not initialized.")
+        engine = self._engine
+        schemaCatalog = self.schemaCatalog
+
+        def operation() -> None:
+            if not schemaCatalog.fHasTable(table_obj.name):
+                return
+            preparer = engine.dialect.identifier_preparer
+            tableName = preparer.format_table(table_obj)
+            keyList = ", ".join(preparer.quote(column.name) for column in index.columns)
+            with engine.begin() as conn:
+                result = conn.exec_driver_sql(
+                    f"DELETE FROM {tableName} WHERE rowid NOT IN "
+                    f"(SELECT MAX(rowid) FROM {tableName} GROUP BY {keyList})"
+                )
+                index.create(bind=conn, checkfirst=True)
+            self._naturalKeysReady.add(table_obj.name)
+            print(f"removed {result.rowcount} rows with duplicate natural keys from {table_obj.name}")
+            LogInDisk().log(
+                level="executionState",
+                message="CentralDatabaseConnection::fDropDuplicateKeys - Duplicates removed.",
+                variablesJson=f"table={table_obj.name}, rows={result.rowcount}",
+            )
+
+        self._enqueue_operation(operation, table_obj.name)
+
+    def fRefreshAggregate(self, aggregate: MaterializedAggregate, changed: pl.DataFrame | None = None) -> "Future[None]":
+        """
+        Queue a refresh of a materialized aggregate. With changed (the rows just written to
+        the source) only the groups they touch are recomputed and upserted; without it, or
+        before the aggregate table exists, the aggregate is rebuilt whole.
+        The refresh runs on the writer behind the source writes queued before it, reading
+        the source and writing the aggregate in one transaction. Returns a Future that
+        resolves once the aggregate table is stored, or with the error of the refresh.
+        """
+        if self._engine is None or self.schemaCatalog is None:
+            raise ValueError("Database engine not initialized.")
+        engine = self._engine
+        schemaCatalog = self.schemaCatalog
+        future: Future[None] = Future()
+        partial = changed is not None and all(
+            name in changed.columns for name in [aggregate.dateColumn, *aggregate.groupBy]
+        )
+        # None when no written row has a date, so no group was touched.
+        scope = aggregate.fChangedScope(changed) if partial and changed is not None else None
+
+        def operation() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            if not schemaCatalog.fHasTable(aggregate.sourceTable):
+                future.set_exception(
+                    ValueError(f"Source table '{aggregate.sourceTable}' of aggregate '{aggregate.name}' not found.")
+                )
+                return
+            rebuild = not partial or not schemaCatalog.fHasTable(aggregate.name)
+            if not rebuild and scope is None:
+                future.set_result(None)
+                return
+            try:
+                start = time.perf_counter()
+                sourceTable = schemaCatalog.fGetTable(aggregate.sourceTable)
+                if rebuild or scope is None:
+                    query = self._buildReadQuery(sourceTable, None, None, None, None, aggregate.sourceColumns)
+                else:
+                    startDate, endDate, tableFilter = scope
+                    query = self._buildReadQuery(
+                        sourceTable, tableFilter, aggregate.dateColumn, startDate, endDate, aggregate.sourceColumns
+                    )
+                with engine.begin() as conn:
+                    result = aggregate.fAggregate(self._executeRead(conn, query))
+                    model = aggregate.fModel(dict(result.schema))
+                    table_obj: Table = cast(Table, model.__table__)  # type: ignore[attr-defined]
+                    table_obj.create(bind=conn, checkfirst=True)
+                    if rebuild:
+                        conn.execute(delete(table_obj))
+                    rowCount = fInsertColumnar(conn, table_obj, result, "update", aggregate.keyColumns)
+                schemaCatalog.fRegisterTable(aggregate.name)
+                self._naturalKeysReady.add(aggregate.name)
+                print(
+                    f"{'rebuilt' if rebuild else 'refreshed'} aggregate {aggregate.name}: "
+                    f"{result.height} groups, {rowCount} changed, in {time.perf_counter() - start:.2f}s"
+                )
+            except Exception as refreshError:
+                future.set_exception(refreshError)
+                raise
+            future.set_result(None)
+
+        self._enqueue_operation(operation, aggregate.name, onRejected=future.set_exception)
+        return future
 
     def fListTables(self) -> list[str]:
-        if self._engine is None:
+        if self.schemaCatalog is None:
             raise ValueError("Database engine not initialized.")
-        self.metadata.reflect(bind=self._engine)
-        tables = list(self.metadata.tables.keys())
-        return tables
+        return self.schemaCatalog.fListTables()
+
+    def fInvalidateSchema(self, tableName: str | None = None) -> None:
+        """
+        Drop the cached schema of a table (or of all tables) after a migration changed it.
+        """
+        if self.schemaCatalog is not None:
+            self.schemaCatalog.fInvalidate(tableName)
+        if tableName is None:
+            self._schemasChecked.clear()
+        else:
+            self._schemasChecked.discard(tableName)
 
     def fShutdown(self) -> None:
         # Mark shutdown so that no new operations will be enqueued.
         self._is_shutting_down = True
+        self._read_queue.join()
         self._operation_queue.join()
         self._stop_event.set()
         if self._worker_thread:
             self._worker_thread.join()
+        for reader in self._reader_threads:
+            reader.join()
+        self.fCloseSnapshot()
         if self._engine:
             self._engine.dispose()
@@ -0,0 +1,233 @@
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time
+from decimal import Decimal
+import sqlite3
+from typing import Any, Literal
+import polars as pl
+from sqlalchemy import Column, Connection, Select, Table
+
+# Python types reported by SQLAlchemy column types, mapped to Polars dtypes.
+_PYTHON_TYPE_TO_POLARS: dict[type, pl.DataType] = {
+    int: pl.Int64(),
+    float: pl.Float64(),
+    Decimal: pl.Float64(),
+    str: pl.Utf8(),
+    bool: pl.Boolean(),
+    bytes: pl.Binary(),
+    date: pl.Date(),
+    datetime: pl.Datetime("us"),
+    time: pl.Time(),
+}
+
+
+def fPolarsDtypeFromColumn(column: Column[Any]) -> pl.DataType | None:
+    """
+    Polars dtype matching a SQLAlchemy column, or None when the type is unknown
+    and has to be inferred from the values.
+    """
+    try:
+        pythonType = column.type.python_type
+    except NotImplementedError:
+        return None
+    return _PYTHON_TYPE_TO_POLARS.get(pythonType)
+
+
+def fPolarsSchemaFromColumns(columns: Iterable[Column[Any]]) -> dict[str, pl.DataType | None]:
+    return {column.name: fPolarsDtypeFromColumn(column) for column in columns}
+
+
+def fIterColumnar(
+    conn: Connection,
+    query: Select[Any],
+    schema: dict[str, pl.DataType | None],
+    chunkSize: int = 50_000,
+) -> Iterator[pl.DataFrame]:
+    """
+    Execute the query and yield one typed DataFrame per fetchmany chunk.
+    Rows go straight from the cursor tuples into typed columns, so no per-row
+    dict is created and only one chunk of Python objects is alive at a time.
+    """
+    result = conn.execute(query)
+    while True:
+        rows = result.fetchmany(chunkSize)
+        if not rows:
+            break
+        chunk = pl.DataFrame(rows, schema=schema, orient="row")
+        del rows
+        yield chunk
+
+
+def fReadColumnar(
+    conn: Connection,
+    query: Select[Any],
+    schema: dict[str, pl.DataType | None],
+    chunkSize: int = 50_000,
+) -> pl.DataFrame:
+    """
+    Execute the query and build the whole result chunk by chunk with fIterColumnar.
+    """
+    chunks = list(fIterColumnar(conn, query, schema, chunkSize))
+    if not chunks:
+        return fEmptyFrame(schema)
+    if len(chunks) == 1:
+        return chunks[0]
+    # Relaxed concat lets a chunk with only nulls in an untyped column join the others.
+    return pl.concat(chunks, how="vertical_relaxed", rechunk=True)
+
+
+def fEmptyFrame(schema: dict[str, pl.DataType | None]) -> pl.DataFrame:
+    return pl.DataFrame(schema={name: dtype or pl.Null() for name, dtype in schema.items()})
+
+
+def fSplitPartitions(batches: Iterable[pl.DataFrame], partitionBy: str) -> Iterator[pl.DataFrame]:
+    """
+    Regroup batches that are sorted by partitionBy into one DataFrame per key value.
+    The rows of the last key of a batch are held back until the key changes.
+    """
+    pending: pl.DataFrame | None = None
+    for batch in batches:
+        frame = batch if pending is None else pl.concat([pending, batch], how="vertical_relaxed")
+        lastKey = frame[partitionBy][-1]
+        isLastKey = pl.col(partitionBy).eq_missing(pl.lit(lastKey, dtype=frame.schema[partitionBy]))
+        complete = frame.filter(~isLastKey)
+        pending = frame.filter(isLastKey)
+        if complete.height:
+            yield from complete.partition_by(partitionBy, maintain_order=True)
+    if pending is not None and pending.height:
+        yield pending
+
+
+# Text formats SQLAlchemy's SQLite dialect uses to store temporal values.
+_SQLITE_TEMPORAL_FORMATS: dict[type, str] = {
+    datetime: "%Y-%m-%d %H:%M:%S%.6f",
+    date: "%Y-%m-%d",
+    time: "%H:%M:%S%.6f",
+}
+_SQLITE_DEFAULT_VARIABLE_LIMIT = 999
+# Below this many rows per multi-row VALUES statement, executemany of single rows is faster.
+_MIN_ROWS_PER_STATEMENT = 50
+_EXECUTEMANY_CHUNK_ROWS = 10_000
+
+
+def fSqliteVariableLimit(conn: Connection) -> int:
+    """
+    Maximum number of bound parameters in one statement for this SQLite connection.
+    """
+    dbapiConnection = conn.connection.dbapi_connection
+    try:
+        return int(dbapiConnection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER))  # type: ignore[union-attr]
+    except AttributeError:
+        return _SQLITE_DEFAULT_VARIABLE_LIMIT
+
+
+def fPrepareInsertFrame(table: Table, data: pl.DataFrame) -> pl.DataFrame:
+    """
+    Shape a DataFrame for a raw insert into table:
+    keep only the table's columns, fill Python-side column defaults the ORM would
+    have applied, and render temporal values in SQLAlchemy's SQLite storage format.
+    """
+    frame = data.select([name for name in data.columns if name in table.c])
+    defaults = []
+    for column in table.columns:
+        if column.name in frame.columns or column.default is None or column.primary_key:
+            continue
+        if column.default.is_scalar:
+            defaults.append(pl.lit(column.default.arg).alias(column.name))  # type: ignore[attr-defined]
+        elif column.default.is_callable:
+            # SQLAlchemy wraps column default callables to accept an execution context.
+            defaults.append(pl.lit(column.default.arg(None)).alias(column.name))  # type: ignore[attr-defined]
+    if defaults:
+        frame = frame.with_columns(defaults)
+
+    conversions = []
+    for name, dtype in frame.schema.items():
+        if dtype.is_temporal():
+            try:
+                pythonType = table.c[name].type.python_type
+            except NotImplementedError:
+                pythonType = None
+            storageFormat = _SQLITE_TEMPORAL_FORMATS.get(pythonType) if pythonType else None
+            if storageFormat is not None:
+                conversions.append(pl.col(name).dt.strftime(storageFormat))
+        elif dtype == pl.Categorical or dtype == pl.Enum:
+            conversions.append(pl.col(name).cast(pl.Utf8))
+    if conversions:
+        frame = frame.with_columns(conversions)
+    return frame
+
+
+def fConflictClause(
+    conn: Connection,
+    table: Table,
+    columns: list[str],
+    keyColumns: list[str],
+    onConflict: Literal["update", "ignore"],
+) -> str:
+    """
+    SQLite upsert clause for a multi-row INSERT on the natural key keyColumns.
+    "update" rewrites the non-key columns, but only on rows where a value changed;
+    "ignore" keeps the stored row.
+    """
+    preparer = conn.dialect.identifier_preparer
+    target = ", ".join(preparer.quote(name) for name in keyColumns)
+    updated = [name for name in columns if name not in keyColumns]
+    if onConflict == "ignore" or not updated:
+        return f" ON CONFLICT ({target}) DO NOTHING"
+    tableName = preparer.format_table(table)
+    assignments = ", ".join(f"{preparer.quote(name)} = excluded.{preparer.quote(name)}" for name in updated)
+    changed = " OR ".join(
+        f"{tableName}.{preparer.quote(name)} IS NOT excluded.{preparer.quote(name)}" for name in updated
+    )
+    return f" ON CONFLICT ({target}) DO UPDATE SET {assignments} WHERE {changed}"
+
+
+def fInsertColumnar(
+    conn: Connection,
+    table: Table,
+    data: pl.DataFrame,
+    onConflict: Literal["update", "ignore"] | None = None,
+    keyColumns: list[str] | None = None,
+) -> int:
+    """
+    Insert the DataFrame into table on an open connection, feeding row tuples from
+    the Polars column buffers chunk by chunk. Chunks are sized so that one
+    multi-row INSERT stays within SQLite's bound variable limit.
+    With onConflict and keyColumns the INSERT becomes an upsert on that key.
+    Returns the number of rows written; with an upsert, unchanged and ignored rows
+    are not counted. Committing is left to the caller.
+    """
+    frame = fPrepareInsertFrame(table, data)
+    if frame.height == 0 or frame.width == 0:
+        return 0
+
+    preparer = conn.dialect.identifier_preparer
+    columnList = ", ".join(preparer.quote(name) for name in frame.columns)
+    rowPlaceholder = "(" + ", ".join("?" for _ in frame.columns) + ")"
+    insertPrefix = f"INSERT INTO {preparer.format_table(table)} ({columnList}) VALUES "
+    conflictClause = ""
+    if onConflict is not None:
+        if not keyColumns:
+            raise ValueError(f"Upsert into '{table.name}' needs the natural key columns.")
+        missing = [name for name in keyColumns if name not in frame.columns]
+        if missing:
+            raise ValueError(f"Upsert into '{table.name}' is missing key columns {missing}.")
+        conflictClause = fConflictClause(conn, table, frame.columns, keyColumns, onConflict)
+
+    written = 0
+    rowsPerStatement = fSqliteVariableLimit(conn) // frame.width
+    if rowsPerStatement < _MIN_ROWS_PER_STATEMENT:
+        # Old SQLite builds allow few variables; reuse one prepared single-row statement instead.
+        rowStatement = insertPrefix + rowPlaceholder + conflictClause
+        for chunk in frame.iter_slices(n_rows=_EXECUTEMANY_CHUNK_ROWS):
+            written += conn.exec_driver_sql(rowStatement, chunk.rows()).rowcount
+        return written
+
+    statements: dict[int, str] = {}
+    for chunk in frame.iter_slices(n_rows=rowsPerStatement):
+        statement = statements.get(chunk.height)
+        if statement is None:
+            statement = insertPrefix + ", ".join(rowPlaceholder for _ in range(chunk.height)) + conflictClause
+            statements[chunk.height] = statement
+        parameters = tuple(value for row in chunk.iter_rows() for value in row)
+        written += conn.exec_driver_sql(statement, parameters).rowcount
+    return written
@@ -1,20 +1,37 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future
+from contextlib import AbstractContextManager
+from datetime import date
+from typing import Any, Literal, TypeVar
+import polars as pl
+from sqlalchemy import Table
+from sqlalchemy.orm import DeclarativeBase
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
 from emater_data_science.data.database_data.central_database_connection import (
     CentralDatabaseConnection,
 )
 from emater_data_science.data.database_data.database_logger_manager import (
     DatabaseLoggerManager,
 )
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate
+from emater_data_science.data.database_data.operation_queue import OperationPriority
+from emater_data_science.library.table_aggregation import ColumnAggregation
+from emater_data_science.library.table_filter import TableFilter
+from emater_data_science.logging.logging_table_model import LoggingTable
 import time
 
+T = TypeVar("T", bound=DeclarativeBase)
+
 class DatabaseDataInterface:
-    _instance = None
+    _instance: "DatabaseDataInterface | None" = None
+    _initialized: bool
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, *args: Any, **kwargs: Any) -> "DatabaseDataInterface":
         if cls._instance is None:
             cls._instance = super(DatabaseDataInterface, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self) -> None:
         if hasattr(self, "_initialized") and self._initialized:
             return
 
@@ -23,32 +40,98 @@ class DatabaseDataInterface:
     def fGetTablesList(self) -> list[str]:
         return CentralDatabaseConnection().fListTables()
 
-    def fStoreTable(self, model, data) -> None:
-        CentralDatabaseConnection().fWrite(model=model, data=data)
+    def fStoreTable(
+        self, model: type[T], data: pl.DataFrame, onConflict: Literal["update", "ignore", "append"] | None = None
+    ) -> None:
+        CentralDatabaseConnection().fWrite(model=model, data=data, onConflict=onConflict)
 
     def fQueueIsEmpty(self) -> bool:
         return CentralDatabaseConnection().fQueueIsEmpty()
 
     def fFetchTable(self,        tableName: str,
-        callback,
-        tableFilter: dict | None = None,
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
         dateColumn: str | None = None,
-        startDate= None,
-        endDate = None) -> None:
-        CentralDatabaseConnection().fRead(
-            tableName=tableName, callback=callback, tableFilter=tableFilter, dateColumn=dateColumn, startDate=startDate, endDate=endDate
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+        dtypes: dict[str, pl.DataType] | None = None) -> "Future[pl.DataFrame]":
+        return CentralDatabaseConnection().fRead(
+            tableName=tableName, callback=callback, tableFilter=tableFilter, dateColumn=dateColumn, startDate=startDate, endDate=endDate,
+            columns=columns, dtypes=dtypes
         )
 
-    def fDeleteRows(self, table, tableFilter) -> None:
+    def fFetchTableBatches(self, tableName: str, batchSize: int, partitionBy: str | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None) -> Iterator[pl.DataFrame]:
+        return CentralDatabaseConnection().fReadBatches(
+            tableName=tableName, batchSize=batchSize, partitionBy=partitionBy, tableFilter=tableFilter,
+            dateColumn=dateColumn, startDate=startDate, endDate=endDate, columns=columns
+        )
+
+    def fAggregateTable(self, tableName: str, groupBy: list[str], aggregations: list[ColumnAggregation],
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        priority: OperationPriority = "interactive") -> "Future[pl.DataFrame]":
+        return CentralDatabaseConnection().fAggregate(
+            tableName=tableName, groupBy=groupBy, aggregations=aggregations, callback=callback,
+            tableFilter=tableFilter, dateColumn=dateColumn, startDate=startDate, endDate=endDate, priority=priority
+        )
+
+    def fDeleteRows(self, table: Table | str, tableFilter: dict[str, Any] | TableFilter) -> None:
         CentralDatabaseConnection().fDeleteRows(table=table, tableFilter=tableFilter)
 
+    def fReplaceYear(
+        self, model: type[T], dateColumn: str, year: int, data: pl.DataFrame | Iterable[pl.DataFrame]
+    ) -> "Future[int]":
+        return CentralDatabaseConnection().fReplaceYear(model=model, dateColumn=dateColumn, year=year, data=data)
+
+    def fRecreateTable(self, model: type[T]) -> "Future[None]":
+        return CentralDatabaseConnection().fRecreateTable(model=model)
+
+    def fEnsureIndexes(self, model: type[T], rebuild: bool = False) -> None:
+        CentralDatabaseConnection().fEnsureIndexes(model=model, rebuild=rebuild)
+
+    def fBulkLoad(self, models: list[type[T]]) -> AbstractContextManager[None]:
+        return CentralDatabaseConnection().fBulkLoad(models=models)
+
+    def fOpenSnapshot(self, tables: list[str] | None = None) -> "Future[list[str]]":
+        return CentralDatabaseConnection().fOpenSnapshot(tables=tables)
+
+    def fCloseSnapshot(self) -> None:
+        CentralDatabaseConnection().fCloseSnapshot()
+
+    def fRefreshAggregate(
+        self, aggregate: MaterializedAggregate, changed: pl.DataFrame | None = None
+    ) -> "Future[None]":
+        return CentralDatabaseConnection().fRefreshAggregate(aggregate=aggregate, changed=changed)
+
+    def fDropDuplicateKeys(self, model: type[T]) -> None:
+        CentralDatabaseConnection().fDropDuplicateKeys(model=model)
+
+    def fGetIndexUsageReport(self) -> pl.DataFrame:
+        return CentralDatabaseConnection().fGetIndexUsageReport()
+
+    def fGetQueueWaitStats(self) -> pl.DataFrame:
+        return CentralDatabaseConnection().fGetQueueWaitStats()
+
+    def fGetWorkerUtilization(self) -> pl.DataFrame:
+        return CentralDatabaseConnection().fGetWorkerUtilization()
+
     def fShutdown(self) -> None:
-        while not CentralDatabaseConnection().fQueueIsEmpty():
+        # Callbacks of finished reads may still queue writes.
+        while not CentralDatabaseConnection().fQueueIsEmpty() or not CallbackDispatcher().fIsIdle():
             time.sleep(1)
         DatabaseLoggerManager().fShutdown()
         CentralDatabaseConnection().fShutdown()
 
-    def fAddLog(self, logTable) -> None:
+    def fAddLog(self, logTable: LoggingTable) -> None:
         DatabaseLoggerManager().fStoreLog(log=logTable)
 
 
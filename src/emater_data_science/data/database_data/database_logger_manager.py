@@ -1,25 +1,27 @@
 import threading
+from typing import Any
 import polars as pl
 from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
 from emater_data_science.logging.logging_table_model import LoggingTable  # SQLAlchemy table for logs
 
 class DatabaseLoggerManager:
-    _instance = None
+    _instance: "DatabaseLoggerManager | None" = None
+    _initialized: bool
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, *args: Any, **kwargs: Any) -> "DatabaseLoggerManager":
         if cls._instance is None:
             cls._instance = super(DatabaseLoggerManager, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self) -> None:
         if hasattr(self, "_initialized") and self._initialized:
             return
         self.buffer_size = 30
         self.flush_interval = 1.0
-        self.buffer = []
+        self.buffer: list[LoggingTable] = []
         self.lock = threading.Lock()
         self.stop_event = threading.Event()
-        self.flush_thread = None
+        self.flush_thread: threading.Thread | None = None
         self._is_shutting_down = False  # Flag to prevent further logs once shutdown starts.
         self._initialized = True
         self._initialize()
@@ -30,7 +32,7 @@ class DatabaseLoggerManager:
             self.flush_thread = threading.Thread(target=self._flush_periodically, daemon=True)
             self.flush_thread.start()
 
-    def fStoreLog(self, log) -> None:
+    def fStoreLog(self, log: LoggingTable) -> None:
         """
         Store a log entry if shutdown has not been initiated.
         Logs generated by operations already enqueued will be stored.
@@ -44,8 +46,10 @@ class DatabaseLoggerManager:
             return
         with self.lock:
             self.buffer.append(log)
-            if len(self.buffer) >= self.buffer_size:
-                self._flush()
+            bufferFull = len(self.buffer) >= self.buffer_size
+        # _flush takes the lock itself, so it must run after it is released.
+        if bufferFull:
+            self._flush()
 
     def _flush(self) -> None:
         """
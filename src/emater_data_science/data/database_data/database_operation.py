@@ -0,0 +1,67 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+import os
+import polars as pl
+from sqlalchemy import Table
+
+
+@dataclass
+class DatabaseOperation:
+    """
+    A unit of work queued on the CentralDatabaseConnection workers.
+
+    Writes carry the table they touch so reads on the same table can wait for them;
+    the sequence number orders every operation, reads and writes alike.
+    Inserts also carry their model, table, frame and conflict mode so the writer can
+    merge consecutive inserts into the same table into one transaction. A frame over the
+    write queue's byte budget is spilled to an Arrow IPC file and only memory-mapped
+    back when the insert runs.
+    """
+    function: Callable[[], None]
+    tableName: str | None = None
+    isWrite: bool = True
+    sequence: int = 0
+    model: type | None = None
+    table: Table | None = None
+    data: pl.DataFrame | None = None
+    spillPath: str | None = None
+    rowCount: int = 0
+    # "update" or "ignore" upserts on the model's natural key; None appends.
+    onConflict: str | None = None
+    # Bytes of data held in memory and counted against the write queue budget.
+    queuedBytes: int = 0
+    # Priority class in the PriorityOperationQueue, and when the operation entered it.
+    priority: str = "bulk"
+    enqueuedAt: float = 0.0
+    # A barrier is served only after every operation queued before it, whatever its class.
+    isBarrier: bool = False
+
+    @property
+    def isInsert(self) -> bool:
+        return self.data is not None or self.spillPath is not None
+
+    def fCanCoalesceWith(self, other: "DatabaseOperation") -> bool:
+        return (
+            self.isInsert
+            and other.isInsert
+            and other.table is self.table
+            and other.priority == self.priority
+            and other.onConflict == self.onConflict
+        )
+
+    def fGetData(self) -> pl.DataFrame:
+        if self.data is not None:
+            return self.data
+        if self.spillPath is None:
+            raise ValueError("Operation has no data.")
+        # Uncompressed IPC is memory-mapped, so the frame is paged in as the insert reads it.
+        return pl.read_ipc(self.spillPath)
+
+    def fReleaseData(self) -> None:
+        self.data = None
+        if self.spillPath is not None:
+            try:
+                os.remove(self.spillPath)
+            except OSError as removeError:
+                print(f"Warning: could not remove spilled write {self.spillPath}: {removeError}")
+            self.spillPath = None
@@ -0,0 +1,135 @@
+from calendar import monthrange
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Literal
+import polars as pl
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, Index, Integer, String
+from sqlalchemy.types import TypeEngine
+from sqlalchemy.orm import DeclarativeBase
+
+
+class AggregateBase(DeclarativeBase):
+    pass
+
+
+# Declared aggregates, by source table name.
+_AGGREGATES: dict[str, list["MaterializedAggregate"]] = {}
+
+
+def _sqlType(dtype: pl.DataType) -> type[TypeEngine[Any]]:
+    if dtype.is_integer():
+        return Integer
+    if dtype.is_float():
+        return Float
+    if dtype == pl.Boolean:
+        return Boolean
+    if dtype == pl.Date:
+        return Date
+    if dtype == pl.Datetime:
+        return DateTime
+    return String
+
+
+@dataclass(eq=False)
+class MaterializedAggregate:
+    """
+    Rollup of a disk table persisted in its own table and kept current by fStoreTable.
+
+    Rows are grouped by the period of dateColumn ("month" gives the columns ano and mes,
+    "year" only ano) and by the source columns in groupBy, then reduced with aggregations.
+    When the source is written, only the groups touched by the written rows are read
+    back and recomputed, and upserted on the group key; deletes rebuild it whole.
+    Because groups are always recomputed from their source rows, any aggregation works,
+    means included.
+
+    Declaring an aggregate registers it, so declare it at module level next to the
+    source model: every process writing the source then keeps it current.
+    """
+    name: str
+    sourceTable: str
+    dateColumn: str
+    aggregations: list[pl.Expr]
+    period: Literal["month", "year"] = "month"
+    groupBy: list[str] = field(default_factory=list)
+    _model: type | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.period not in ("month", "year"):
+            raise ValueError(f"Invalid aggregate period: {self.period}")
+        registered = _AGGREGATES.setdefault(self.sourceTable, [])
+        if any(aggregate.name == self.name for aggregate in registered):
+            raise ValueError(f"Aggregate '{self.name}' is already declared.")
+        registered.append(self)
+
+    @property
+    def keyColumns(self) -> list[str]:
+        return (["ano", "mes"] if self.period == "month" else ["ano"]) + self.groupBy
+
+    @property
+    def outputColumns(self) -> list[str]:
+        return self.keyColumns + [expression.meta.output_name() for expression in self.aggregations]
+
+    @property
+    def sourceColumns(self) -> list[str]:
+        names = [self.dateColumn, *self.groupBy]
+        for expression in self.aggregations:
+            names.extend(name for name in expression.meta.root_names() if name not in names)
+        return names
+
+    def fAggregate(self, source: pl.DataFrame) -> pl.DataFrame:
+        """
+        Compute the aggregate from source rows, sorted by the group key.
+        """
+        periods = [pl.col(self.dateColumn).dt.year().alias("ano")]
+        if self.period == "month":
+            periods.append(pl.col(self.dateColumn).dt.month().alias("mes"))
+        return (
+            source.with_columns(periods)
+            .group_by(self.keyColumns)
+            .agg(self.aggregations)
+            .sort(self.keyColumns)
+        )
+
+    def fChangedScope(self, changed: pl.DataFrame) -> tuple[date, date, dict[str, list[Any]]] | None:
+        """
+        Date range and groupBy filter covering every group touched by the changed rows,
+        or None when no row has a date. Groups are whole periods, so the range runs
+        from the first day of the earliest period to the last day of the latest.
+        """
+        bounds = changed.select(
+            pl.col(self.dateColumn).min().alias("first"), pl.col(self.dateColumn).max().alias("last")
+        ).row(0)
+        if bounds[0] is None:
+            return None
+        first, last = bounds
+        if self.period == "month":
+            startDate = date(first.year, first.month, 1)
+            endDate = date(last.year, last.month, monthrange(last.year, last.month)[1])
+        else:
+            startDate = date(first.year, 1, 1)
+            endDate = date(last.year, 12, 31)
+        tableFilter = {name: changed.get_column(name).unique().to_list() for name in self.groupBy}
+        return startDate, endDate, tableFilter
+
+    def fModel(self, schema: dict[str, pl.DataType]) -> type:
+        """
+        ORM class of the aggregate table, built from the schema of the aggregated frame
+        the first time it is needed. The group key is its natural key.
+        """
+        if self._model is None:
+            attributes: dict[str, Any] = {
+                "__tablename__": self.name,
+                "__table_args__": (
+                    Index(f"ux_{self.name}_natural_key", *self.keyColumns, unique=True, info={"naturalKey": True}),
+                ),
+                "id": Column(Integer, primary_key=True, autoincrement=True),
+            }
+            for name, dtype in schema.items():
+                attributes[name] = Column(_sqlType(dtype), nullable=name not in self.keyColumns)
+            className = "".join(part.capitalize() for part in self.name.split("_"))
+            self._model = type(className, (AggregateBase,), attributes)
+        return self._model
+
+
+def fAggregatesOf(sourceTable: str) -> list[MaterializedAggregate]:
+    return list(_AGGREGATES.get(sourceTable, []))
@@ -0,0 +1,158 @@
+from collections import deque
+from queue import Empty
+from threading import Condition, Lock
+import time
+from typing import Literal
+import polars as pl
+
+from emater_data_science.data.database_data.database_operation import DatabaseOperation
+
+OperationPriority = Literal["interactive", "bulk", "logging"]
+# Served in this order, unless an older class head has waited past its starvation bound.
+PRIORITY_ORDER: tuple[OperationPriority, ...] = ("interactive", "bulk", "logging")
+
+
+class PriorityOperationQueue:
+    """
+    Drop-in replacement for queue.Queue holding DatabaseOperation objects in
+    priority classes. Each class is FIFO. An operation is never served before an
+    earlier operation on the same table, whatever their classes, so the order of
+    writes to a table is kept; a barrier operation is never served before any
+    earlier operation.
+
+    maxWait gives, per class, how many seconds its oldest operation may wait before
+    it is served ahead of the higher classes; this keeps bulk loads and log flushes
+    progressing while interactive work keeps arriving.
+    """
+
+    def __init__(self, maxWait: dict[str, float] | None = None) -> None:
+        self.maxWait: dict[str, float] = {"interactive": 0.0, "bulk": 5.0, "logging": 10.0}
+        if maxWait:
+            self.maxWait.update(maxWait)
+        self._classes: dict[str, deque[DatabaseOperation]] = {priority: deque() for priority in PRIORITY_ORDER}
+        # Sequences of the queued operations, per table, to keep per-table order across classes.
+        self._tableSequences: dict[str, list[int]] = {}
+        # Both conditions share one lock, as in queue.Queue.
+        self._mutex = Lock()
+        self._condition = Condition(self._mutex)
+        self._allTasksDone = Condition(self._mutex)
+        self._unfinishedTasks = 0
+        self._waitStats: dict[str, dict[str, float]] = {
+            priority: {"operations": 0, "totalWait": 0.0, "maxWait": 0.0} for priority in PRIORITY_ORDER
+        }
+
+    def put(self, operation: DatabaseOperation) -> None:
+        if operation.priority not in self._classes:
+            raise ValueError(f"Invalid operation priority: {operation.priority}")
+        with self._condition:
+            operation.enqueuedAt = time.perf_counter()
+            self._classes[operation.priority].append(operation)
+            if operation.tableName is not None:
+                self._tableSequences.setdefault(operation.tableName, []).append(operation.sequence)
+            self._unfinishedTasks += 1
+            self._condition.notify()
+
+    def _isBlocked(self, operation: DatabaseOperation) -> bool:
+        if operation.isBarrier:
+            # Each class is FIFO, so its head holds its earliest sequence.
+            return any(
+                operations[0].sequence < operation.sequence for operations in self._classes.values() if operations
+            )
+        if operation.tableName is None:
+            return False
+        return min(self._tableSequences[operation.tableName]) < operation.sequence
+
+    def _selectClass(self) -> deque[DatabaseOperation] | None:
+        # Caller must hold self._condition.
+        now = time.perf_counter()
+        heads = [
+            (priority, self._classes[priority][0])
+            for priority in PRIORITY_ORDER
+            if self._classes[priority] and not self._isBlocked(self._classes[priority][0])
+        ]
+        if not heads:
+            return None
+        starving = [
+            (operation.enqueuedAt, priority) for priority, operation in heads
+            if now - operation.enqueuedAt > self.maxWait[priority] > 0
+        ]
+        if starving:
+            return self._classes[min(starving)[1]]
+        return self._classes[heads[0][0]]
+
+    def _take(self) -> DatabaseOperation | None:
+        # Caller must hold self._condition.
+        selected = self._selectClass()
+        if selected is None:
+            return None
+        operation = selected.popleft()
+        if operation.tableName is not None:
+            sequences = self._tableSequences[operation.tableName]
+            sequences.remove(operation.sequence)
+            if not sequences:
+                del self._tableSequences[operation.tableName]
+        waited = time.perf_counter() - operation.enqueuedAt
+        stats = self._waitStats[operation.priority]
+        stats["operations"] += 1
+        stats["totalWait"] += waited
+        stats["maxWait"] = max(stats["maxWait"], waited)
+        return operation
+
+    def get(self, block: bool = True, timeout: float | None = None) -> DatabaseOperation:
+        with self._condition:
+            if not block:
+                operation = self._take()
+                if operation is None:
+                    raise Empty
+                return operation
+            deadline = None if timeout is None else time.perf_counter() + timeout
+            while True:
+                operation = self._take()
+                if operation is not None:
+                    return operation
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    raise Empty
+                self._condition.wait(remaining)
+
+    def get_nowait(self) -> DatabaseOperation:
+        return self.get(block=False)
+
+    def task_done(self) -> None:
+        with self._condition:
+            if self._unfinishedTasks <= 0:
+                raise ValueError("task_done() called too many times")
+            self._unfinishedTasks -= 1
+            if self._unfinishedTasks == 0:
+                self._allTasksDone.notify_all()
+
+    def join(self) -> None:
+        with self._allTasksDone:
+            while self._unfinishedTasks:
+                self._allTasksDone.wait()
+
+    def empty(self) -> bool:
+        with self._condition:
+            return not any(self._classes.values())
+
+    def qsize(self) -> int:
+        with self._condition:
+            return sum(len(operations) for operations in self._classes.values())
+
+    def fGetWaitStats(self) -> pl.DataFrame:
+        """
+        Queue wait per priority class: operations served, mean and max seconds waited,
+        and operations still queued.
+        """
+        with self._condition:
+            rows = [
+                {
+                    "priority": priority,
+                    "operations": int(stats["operations"]),
+                    "meanWait": stats["totalWait"] / stats["operations"] if stats["operations"] else 0.0,
+                    "maxWait": stats["maxWait"],
+                    "queued": len(self._classes[priority]),
+                }
+                for priority, stats in self._waitStats.items()
+            ]
+        return pl.DataFrame(rows)
@@ -0,0 +1,99 @@
+from threading import Lock
+import polars as pl
+from sqlalchemy import Engine, Index, MetaData, Table, inspect
+
+from emater_data_science.data.database_data.columnar_io import fPolarsSchemaFromColumns
+
+
+def fNaturalKeyIndex(table: Table) -> Index | None:
+    """
+    The unique index a model marks as its natural key with info={"naturalKey": True}.
+    """
+    for index in table.indexes:
+        if index.unique and index.info.get("naturalKey"):
+            return index
+    return None
+
+
+def fNaturalKey(table: Table) -> list[str] | None:
+    index = fNaturalKeyIndex(table)
+    if index is None:
+        return None
+    return [column.name for column in index.columns]
+
+
+class SchemaCatalog:
+    """
+    Reflects each table of the database once and keeps the Table objects and their
+    Polars column types until the schema is known to have changed.
+    The list of table names is read from sqlite_master a single time, without
+    reflecting every table.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self._engine = engine
+        self.metadata = MetaData()
+        self._lock = Lock()
+        self._tableNames: set[str] | None = None
+        self._polarsSchemas: dict[str, dict[str, pl.DataType | None]] = {}
+
+    def _loadTableNames(self) -> set[str]:
+        # Caller must hold self._lock.
+        if self._tableNames is None:
+            self._tableNames = set(inspect(self._engine).get_table_names())
+        return self._tableNames
+
+    def fListTables(self) -> list[str]:
+        with self._lock:
+            return sorted(self._loadTableNames())
+
+    def fHasTable(self, tableName: str) -> bool:
+        with self._lock:
+            return tableName in self._loadTableNames()
+
+    def fGetTable(self, tableName: str) -> Table:
+        with self._lock:
+            table = self.metadata.tables.get(tableName)
+            if table is not None:
+                return table
+            if tableName not in self._loadTableNames():
+                # The table may have been created by another process since the names were read.
+                self._tableNames = None
+                if tableName not in self._loadTableNames():
+                    raise ValueError(f"Table '{tableName}' not found.")
+            self.metadata.reflect(bind=self._engine, only=[tableName])
+            return self.metadata.tables[tableName]
+
+    def fGetPolarsSchema(self, tableName: str) -> dict[str, pl.DataType | None]:
+        schema = self._polarsSchemas.get(tableName)
+        if schema is None:
+            schema = fPolarsSchemaFromColumns(self.fGetTable(tableName).columns)
+            self._polarsSchemas[tableName] = schema
+        return schema
+
+    def fRegisterTable(self, tableName: str) -> None:
+        """
+        Record a table created through this connection; it is reflected on first use.
+        """
+        self.fInvalidate(tableName)
+        with self._lock:
+            if self._tableNames is not None:
+                self._tableNames.add(tableName)
+
+    def fInvalidate(self, tableName: str | None = None) -> None:
+        """
+        Forget cached schema for one table, or for every table when tableName is None.
+        Call after anything that changes the schema outside fWrite's table creation.
+        """
+        with self._lock:
+            if tableName is None:
+                self.metadata.clear()
+                self._polarsSchemas.clear()
+                self._tableNames = None
+                return
+            table = self.metadata.tables.get(tableName)
+            if table is not None:
+                self.metadata.remove(table)
+            self._polarsSchemas.pop(tableName, None)
+            if self._tableNames is not None and not inspect(self._engine).has_table(tableName):
+                self._tableNames.discard(tableName)
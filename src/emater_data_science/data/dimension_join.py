@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+import polars as pl
+
+
+# Declared dimensions, by fact table name.
+_DIMENSIONS: dict[str, list["DimensionJoin"]] = {}
+
+
+@dataclass(eq=False)
+class DimensionJoin:
+    """
+    Declares that the rows of factTable reference a row of dimensionTable through
+    keyColumn, an integer key instead of the repeated attributes themselves.
+    fFetchTable(..., withDimensions=True) joins the dimension attributes back.
+
+    Declaring a join registers it, so declare it at module level next to the fact model.
+    """
+    factTable: str
+    keyColumn: str
+    dimensionTable: str
+    dimensionKey: str = "id"
+
+    def __post_init__(self) -> None:
+        registered = _DIMENSIONS.setdefault(self.factTable, [])
+        if any(dimension.keyColumn == self.keyColumn for dimension in registered):
+            raise ValueError(f"Column '{self.keyColumn}' of '{self.factTable}' already references a dimension.")
+        registered.append(self)
+
+    def fJoin(self, fact: pl.DataFrame, dimension: pl.DataFrame) -> pl.DataFrame:
+        """
+        Fact rows with the dimension attributes appended; keys without a dimension row
+        get nulls. The key column is kept.
+        """
+        attributes = dimension.rename({self.dimensionKey: self.keyColumn})
+        attributes = attributes.select(
+            self.keyColumn, *(name for name in attributes.columns if name not in fact.columns)
+        ).with_columns(pl.col(self.keyColumn).cast(fact.schema[self.keyColumn]))
+        return fact.join(attributes, on=self.keyColumn, how="left", maintain_order="left")
+
+
+def fDimensionsOf(factTable: str) -> list[DimensionJoin]:
+    return list(_DIMENSIONS.get(factTable, []))
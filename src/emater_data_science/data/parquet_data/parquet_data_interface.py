@@ -0,0 +1,85 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future
+from datetime import date
+from typing import Any, TypeVar
+import polars as pl
+from sqlalchemy.orm import DeclarativeBase
+from emater_data_science.library.table_aggregation import ColumnAggregation
+from emater_data_science.library.table_filter import TableFilter
+from emater_data_science.data.parquet_data.parquet_storage import ParquetStorage
+
+T = TypeVar("T", bound=DeclarativeBase)
+
+
+class ParquetDataInterface:
+    _instance: "ParquetDataInterface | None" = None
+    _initialized: bool
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "ParquetDataInterface":
+        if cls._instance is None:
+            cls._instance = super(ParquetDataInterface, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+
+        self._initialized = True
+
+    def fGetTablesList(self) -> list[str]:
+        return ParquetStorage().fListTables()
+
+    def fStoreTable(self, model: type[T], data: pl.DataFrame) -> None:
+        ParquetStorage().fWrite(model=model, data=data)
+
+    def fQueueIsEmpty(self) -> bool:
+        return ParquetStorage().fQueueIsEmpty()
+
+    def fFetchTable(self, tableName: str,
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+        dtypes: dict[str, pl.DataType] | None = None) -> "Future[pl.DataFrame]":
+        return ParquetStorage().fRead(
+            tableName=tableName, callback=callback, tableFilter=tableFilter, dateColumn=dateColumn, startDate=startDate, endDate=endDate,
+            columns=columns, dtypes=dtypes
+        )
+
+    def fFetchTableBatches(self, tableName: str, batchSize: int, partitionBy: str | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None) -> Iterator[pl.DataFrame]:
+        return ParquetStorage().fReadBatches(
+            tableName=tableName, batchSize=batchSize, partitionBy=partitionBy, tableFilter=tableFilter,
+            dateColumn=dateColumn, startDate=startDate, endDate=endDate, columns=columns
+        )
+
+    def fAggregateTable(self, tableName: str, groupBy: list[str], aggregations: list[ColumnAggregation],
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None) -> "Future[pl.DataFrame]":
+        return ParquetStorage().fAggregate(
+            tableName=tableName, groupBy=groupBy, aggregations=aggregations, callback=callback,
+            tableFilter=tableFilter, dateColumn=dateColumn, startDate=startDate, endDate=endDate
+        )
+
+    def fDeleteRows(self, tableName: str, tableFilter: dict[str, Any] | TableFilter) -> None:
+        ParquetStorage().fDeleteRows(tableName=tableName, tableFilter=tableFilter)
+
+    def fReplacePartition(
+        self, model: type[T], year: int, data: pl.DataFrame | Iterable[pl.DataFrame]
+    ) -> "Future[None]":
+        return ParquetStorage().fReplacePartition(model=model, year=year, data=data)
+
+    def fCompactTable(self, tableName: str, years: list[int] | None = None) -> "Future[int]":
+        return ParquetStorage().fCompact(tableName=tableName, years=years)
+
+    def fShutdown(self) -> None:
+        ParquetStorage().fShutdown()
@@ -0,0 +1,645 @@
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+import itertools
+import json
+import os
+import shutil
+from threading import Condition, Lock
+from typing import Any, TypeVar, cast
+from urllib.parse import quote
+import uuid
+import polars as pl
+from sqlalchemy import Table
+from sqlalchemy.orm import DeclarativeBase
+
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
+from emater_data_science.data.compact_encoding import fCompactEncodingOf
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+from emater_data_science.data.database_data.columnar_io import fPolarsSchemaFromColumns
+from emater_data_science.library.table_aggregation import ColumnAggregation
+from emater_data_science.library.table_filter import TableFilter, asDataFilters
+
+T = TypeVar("T", bound="DeclarativeBase")
+R = TypeVar("R")
+
+# Hive key of the partition derived from a model's __parquet_date_column__.
+YEAR_PARTITION = "ano"
+# Value Hive writers use for a null partition key; Polars reads it back as null.
+_HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+_SCHEMA_FILE = "_schema.parquet"
+_LAYOUT_FILE = "_table.json"
+_DATA_DIR = "data"
+
+
+class ParquetStorage:
+    """
+    Stores tables as Hive-partitioned Parquet datasets, one directory per table:
+
+        <root>/<table>/_table.json       partition layout
+        <root>/<table>/_schema.parquet   empty frame holding the column types
+        <root>/<table>/data/ano=2020/codigo=A001/<uuid>.parquet
+
+    A model chooses its layout with two optional class attributes:
+    __parquet_date_column__ partitions by the year of that column, and
+    __parquet_partition_by__ adds partitions on the listed columns.
+    Reads go through pl.scan_parquet so filters on the date and partition columns
+    only open the matching files. A year can be replaced as a whole with
+    fReplacePartition and its files merged with fCompact.
+
+    Files only appear in the dataset by a rename from outside the data directory.
+    Writes that remove or rename files (fReplacePartition, fCompact, fDeleteRows) wait
+    for the reads of the table that are scanning it and hold new ones back while they
+    swap the files, so a read never opens a file that is being removed.
+    """
+    _instance: "ParquetStorage | None" = None
+    _initialized: bool
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> "ParquetStorage":
+        if cls._instance is None:
+            cls._instance = super(ParquetStorage, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+        # One writer keeps the files of a table consistent; reads run in parallel.
+        self._writeExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parquet-writer")
+        self._readExecutor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="parquet-reader")
+        self._lock = Lock()
+        self._pendingWrites: dict[str, list[Future[Any]]] = {}
+        self._layouts: dict[str, dict[str, Any]] = {}
+        # Reads scanning each table, and the tables whose files a write is swapping, see _readAccess.
+        self._accessCondition = Condition()
+        self._tableReaders: dict[str, int] = {}
+        self._swappingTables: set[str] = set()
+        self._is_shutting_down = False
+        self._initialized = True
+
+    @property
+    def rootPath(self) -> str:
+        # The datasets live next to the database file, so both follow databaseDirectory.
+        return os.path.join(CentralDatabaseConnection.databaseDirectory, "parquet")
+
+    def _tablePath(self, tableName: str) -> str:
+        return os.path.join(self.rootPath, tableName)
+
+    def _loadLayout(self, tableName: str) -> dict[str, Any]:
+        layout = self._layouts.get(tableName)
+        if layout is None:
+            layoutPath = os.path.join(self._tablePath(tableName), _LAYOUT_FILE)
+            if not os.path.exists(layoutPath):
+                raise ValueError(f"Table '{tableName}' not found.")
+            with open(layoutPath, encoding="utf8") as layoutFile:
+                layout = cast(dict[str, Any], json.load(layoutFile))
+            layout["schema"] = pl.read_parquet_schema(os.path.join(self._tablePath(tableName), _SCHEMA_FILE))
+            self._layouts[tableName] = layout
+        return layout
+
+    def _submitWrite(self, tableName: str, function: Callable[[], R]) -> "Future[R]":
+        if self._is_shutting_down:
+            print("Warning: Attempt to enqueue an operation after shutdown has begun.")
+            future: Future[R] = Future()
+            future.set_exception(RuntimeError("ParquetStorage is shutting down."))
+            return future
+        with self._lock:
+            future = self._writeExecutor.submit(function)
+            self._pendingWrites.setdefault(tableName, []).append(future)
+        future.add_done_callback(lambda done: self._forgetWrite(tableName, done))
+        return future
+
+    def _forgetWrite(self, tableName: str, future: "Future[Any]") -> None:
+        with self._lock:
+            pending = self._pendingWrites.get(tableName)
+            if pending and future in pending:
+                pending.remove(future)
+                if not pending:
+                    del self._pendingWrites[tableName]
+        if future.exception() is not None:
+            print(f"Error during operation: {future.exception()}")
+
+    def _waitForWrites(self, writes: list["Future[Any]"]) -> None:
+        for write in writes:
+            try:
+                write.result()
+            except Exception:
+                # The failure was already reported by _forgetWrite; the read sees whatever was written.
+                pass
+
+    @contextmanager
+    def _readAccess(self, tableName: str) -> Iterator[None]:
+        # Held while a read lists and scans the table's files.
+        with self._accessCondition:
+            self._accessCondition.wait_for(lambda: tableName not in self._swappingTables)
+            self._tableReaders[tableName] = self._tableReaders.get(tableName, 0) + 1
+        try:
+            yield
+        finally:
+            with self._accessCondition:
+                self._tableReaders[tableName] -= 1
+                if not self._tableReaders[tableName]:
+                    del self._tableReaders[tableName]
+                self._accessCondition.notify_all()
+
+    @contextmanager
+    def _swapAccess(self, tableName: str) -> Iterator[None]:
+        # Held by the writer while it renames or removes files of the table. New reads wait
+        # from the moment it is requested, so a stream of reads cannot hold the swap off.
+        with self._accessCondition:
+            self._swappingTables.add(tableName)
+            self._accessCondition.wait_for(lambda: not self._tableReaders.get(tableName))
+        try:
+            yield
+        finally:
+            with self._accessCondition:
+                self._swappingTables.discard(tableName)
+                self._accessCondition.notify_all()
+
+    def fListTables(self) -> list[str]:
+        if not os.path.isdir(self.rootPath):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.rootPath)
+            if os.path.exists(os.path.join(self.rootPath, entry, _LAYOUT_FILE))
+        )
+
+    def fQueueIsEmpty(self) -> bool:
+        with self._lock:
+            return not self._pendingWrites
+
+    @staticmethod
+    def _layoutFromModel(model: type[T]) -> tuple[str | None, list[str]]:
+        dateColumn = getattr(model, "__parquet_date_column__", None)
+        partitionBy = list(getattr(model, "__parquet_partition_by__", ()))
+        return dateColumn, partitionBy
+
+    def _createTable(self, model: type[T], data: pl.DataFrame) -> dict[str, Any]:
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+        dateColumn, partitionBy = self._layoutFromModel(model)
+        table: Table = cast(Table, model.__table__)
+        if YEAR_PARTITION in table.columns and dateColumn:
+            raise ValueError(f"Table '{tableName}' already has a column named '{YEAR_PARTITION}'.")
+
+        # The column types come from the model, so a first frame with an all-null or missing
+        # column does not fix a wrong type for the whole dataset. A generated row id is only
+        # kept when the data carries it.
+        rowId = table.autoincrement_column
+        columns = [
+            column for column in table.columns
+            if column is not rowId or column.name in data.columns
+        ]
+        schema: dict[str, pl.DataType] = {}
+        for name, dtype in fPolarsSchemaFromColumns(columns).items():
+            if dtype is None:
+                dtype = data.schema[name] if name in data.columns else pl.Utf8()
+            schema[name] = dtype
+        encoding = fCompactEncodingOf(tableName)
+        if encoding is not None:
+            # Measures declared Float32 are stored as Float32, halving what every scan reads.
+            schema.update({name: pl.Float32() for name in encoding.float32Columns if name in schema})
+        if dateColumn:
+            schema[YEAR_PARTITION] = pl.Int32()
+        schemaFrame = pl.DataFrame(schema=schema)
+
+        tablePath = self._tablePath(tableName)
+        os.makedirs(os.path.join(tablePath, _DATA_DIR), exist_ok=True)
+        schemaFrame.write_parquet(os.path.join(tablePath, _SCHEMA_FILE))
+        layout: dict[str, Any] = {"dateColumn": dateColumn, "partitionBy": partitionBy}
+        with open(os.path.join(tablePath, _LAYOUT_FILE), "w", encoding="utf8") as layoutFile:
+            json.dump(layout, layoutFile)
+        layout["schema"] = schemaFrame.schema
+        self._layouts[tableName] = layout
+        return layout
+
+    @staticmethod
+    def _partitionKeys(layout: dict[str, Any]) -> list[str]:
+        partitionBy: list[str] = layout["partitionBy"]
+        return ([YEAR_PARTITION] if layout["dateColumn"] else []) + partitionBy
+
+    @staticmethod
+    def _partitionPath(keys: list[str], values: tuple[Any, ...]) -> str:
+        parts = []
+        for key, value in zip(keys, values):
+            text = _HIVE_NULL if value is None else quote(str(value), safe="")
+            parts.append(f"{key}={text}")
+        return os.path.join(*parts) if parts else ""
+
+    def _writeFrame(self, basePath: str, keys: list[str], frame: pl.DataFrame, tableName: str | None = None) -> None:
+        # With tableName each file is published into the dataset, see _writeFile.
+        if not keys:
+            self._writeFile(basePath, frame, tableName)
+            return
+        for values, partition in frame.partition_by(keys, as_dict=True, include_key=False).items():
+            self._writeFile(os.path.join(basePath, self._partitionPath(keys, values)), partition, tableName)
+
+    def _writeFile(self, directory: str, frame: pl.DataFrame, tableName: str | None = None) -> str:
+        # A file of a live dataset is written next to its data directory and renamed into
+        # place, so a scan never lists it half written.
+        os.makedirs(directory, exist_ok=True)
+        filePath = os.path.join(directory, f"{uuid.uuid4().hex}.parquet")
+        if tableName is None:
+            frame.write_parquet(filePath)
+            return filePath
+        incomingPath = os.path.join(self._tablePath(tableName), f"_incoming_{uuid.uuid4().hex}.parquet")
+        try:
+            frame.write_parquet(incomingPath)
+            os.replace(incomingPath, filePath)
+        finally:
+            if os.path.exists(incomingPath):
+                os.remove(incomingPath)
+        return filePath
+
+    def _loadOrCreateLayout(self, model: type[T], data: pl.DataFrame) -> dict[str, Any]:
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+        try:
+            return self._loadLayout(tableName)
+        except ValueError:
+            print(f"creating parquet dataset {tableName}")
+            return self._createTable(model, data)
+
+    @staticmethod
+    def _prepareFrame(layout: dict[str, Any], data: pl.DataFrame) -> pl.DataFrame:
+        # Every file holds every column in the dataset's type, so the scans can read them together.
+        columns = []
+        for name, dtype in layout["schema"].items():
+            if name == YEAR_PARTITION and layout["dateColumn"]:
+                continue
+            if name not in data.columns:
+                columns.append(pl.lit(None, dtype=dtype).alias(name))
+            elif dtype == pl.Null or data.schema[name] == dtype:
+                # Datasets created before the schema came from the model may hold Null columns.
+                columns.append(pl.col(name))
+            else:
+                columns.append(pl.col(name).cast(dtype))
+        frame = data.select(columns)
+        if layout["dateColumn"]:
+            frame = frame.with_columns(
+                pl.col(layout["dateColumn"]).dt.year().cast(pl.Int32).alias(YEAR_PARTITION)
+            )
+        return frame
+
+    def fWrite(self, model: type[T], data: pl.DataFrame) -> "Future[None]":
+        """
+        Append the DataFrame to the table's dataset as new files, one per partition.
+        """
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+
+        def operation() -> None:
+            layout = self._loadOrCreateLayout(model, data)
+            frame = self._prepareFrame(layout, data)
+            if frame.height:
+                dataPath = os.path.join(self._tablePath(tableName), _DATA_DIR)
+                self._writeFrame(dataPath, self._partitionKeys(layout), frame, tableName)
+            print(f"inserted {frame.height} rows into parquet dataset {tableName}")
+
+        return self._submitWrite(tableName, operation)
+
+    def fReplacePartition(
+        self, model: type[T], year: int, data: pl.DataFrame | Iterable[pl.DataFrame]
+    ) -> "Future[None]":
+        """
+        Replace all rows of one year of a year-partitioned table with data, e.g. to
+        re-ingest that year. The new files are written to a staging directory outside the
+        dataset; the year's directory is then moved out and the staging one renamed in its
+        place while no read of the table is scanning, so every read sees either the old or
+        the new year, never a mix or a missing year. Other years are not touched.
+        data may also be an iterable of DataFrames, e.g. one per station, each written to
+        the staging directory as it is produced so the year is never held in memory whole;
+        it is consumed on the writer thread.
+        """
+        tableName = model.__table__.name  # type: ignore[attr-defined]
+
+        def operation() -> None:
+            frames = iter([data] if isinstance(data, pl.DataFrame) else data)
+            first = next(frames, None)
+            layout = self._loadOrCreateLayout(model, first if first is not None else pl.DataFrame())
+            if not layout["dateColumn"]:
+                raise ValueError(f"Table '{tableName}' is not partitioned by year.")
+
+            tablePath = self._tablePath(tableName)
+            yearPath = os.path.join(tablePath, _DATA_DIR, self._partitionPath([YEAR_PARTITION], (year,)))
+            stagingPath = os.path.join(tablePath, f"_staging_{uuid.uuid4().hex}")
+            retiredPath = os.path.join(tablePath, f"_retired_{uuid.uuid4().hex}")
+            rowCount = 0
+            try:
+                for frame in itertools.chain([first] if first is not None else [], frames):
+                    frame = self._prepareFrame(layout, frame)
+                    outside = frame.filter(pl.col(YEAR_PARTITION).ne_missing(year)).height
+                    if outside:
+                        raise ValueError(f"{outside} rows of the data for '{tableName}' are not in year {year}.")
+                    if frame.height:
+                        self._writeFrame(stagingPath, layout["partitionBy"], frame.drop(YEAR_PARTITION))
+                        rowCount += frame.height
+                with self._swapAccess(tableName):
+                    if os.path.exists(yearPath):
+                        os.replace(yearPath, retiredPath)
+                    if os.path.exists(stagingPath):
+                        os.replace(stagingPath, yearPath)
+            finally:
+                shutil.rmtree(stagingPath, ignore_errors=True)
+                shutil.rmtree(retiredPath, ignore_errors=True)
+            print(f"replaced year {year} of parquet dataset {tableName} with {rowCount} rows")
+
+        return self._submitWrite(tableName, operation)
+
+    def fCompact(self, tableName: str, years: list[int] | None = None) -> "Future[int]":
+        """
+        Merge the files of each partition directory into a single file sorted by the
+        date column, for the given years or all of them. Appends leave one small file
+        per write and partition; compacting a closed year keeps its scans to one file
+        per partition without rewriting the other years.
+        Resolves with the number of files removed.
+        """
+        def operation() -> int:
+            layout = self._loadLayout(tableName)
+            dataPath = os.path.join(self._tablePath(tableName), _DATA_DIR)
+            removed = 0
+            for directory, _, files in os.walk(dataPath):
+                paths = [os.path.join(directory, name) for name in files if name.endswith(".parquet")]
+                if len(paths) < 2:
+                    continue
+                if years is not None:
+                    yearPart = os.path.relpath(directory, dataPath).split(os.sep)[0]
+                    yearText = yearPart.removeprefix(f"{YEAR_PARTITION}=")
+                    if yearPart == yearText or not yearText.isdigit() or int(yearText) not in years:
+                        continue
+                frame = pl.concat([pl.read_parquet(path) for path in paths], how="vertical_relaxed")
+                if layout["dateColumn"] in frame.columns:
+                    frame = frame.sort(layout["dateColumn"], maintain_order=True)
+                # The merged file replaces the small ones in one step for the reads.
+                mergedPath = os.path.join(self._tablePath(tableName), f"_incoming_{uuid.uuid4().hex}.parquet")
+                frame.write_parquet(mergedPath)
+                with self._swapAccess(tableName):
+                    os.replace(mergedPath, os.path.join(directory, f"{uuid.uuid4().hex}.parquet"))
+                    for path in paths:
+                        os.remove(path)
+                removed += len(paths) - 1
+            print(f"compacted parquet dataset {tableName}: {removed} files fewer")
+            return removed
+
+        return self._submitWrite(tableName, operation)
+
+    def _scan(self, tableName: str, layout: dict[str, Any]) -> pl.LazyFrame | None:
+        dataPath = os.path.join(self._tablePath(tableName), _DATA_DIR)
+        if not any(files for _, _, files in os.walk(dataPath)):
+            return None
+        keys = self._partitionKeys(layout)
+        schema = layout["schema"]
+        return pl.scan_parquet(
+            dataPath,
+            hive_partitioning=bool(keys),
+            hive_schema={key: schema[key] for key in keys} if keys else None,
+            schema={name: dtype for name, dtype in schema.items() if name not in keys},
+            # Files written before a column was added to the model read it as null.
+            missing_columns="insert",
+        )
+
+    @staticmethod
+    def _buildPredicates(
+        layout: dict[str, Any],
+        tableFilter: dict[str, Any] | TableFilter | None,
+        dateColumn: str | None,
+        startDate: date | None,
+        endDate: date | None,
+    ) -> list[pl.Expr]:
+        schema = layout["schema"]
+        predicates: list[pl.Expr] = []
+        if dateColumn and (startDate or endDate):
+            if dateColumn not in schema:
+                raise ValueError(f"Date column '{dateColumn}' not found in table.")
+            # The year partition bounds let the scan skip whole directories.
+            byYear = dateColumn == layout["dateColumn"]
+            if startDate:
+                predicates.append(pl.col(dateColumn) >= startDate)
+                if byYear:
+                    predicates.append(pl.col(YEAR_PARTITION) >= startDate.year)
+            if endDate:
+                predicates.append(pl.col(dateColumn) <= endDate)
+                if byYear:
+                    predicates.append(pl.col(YEAR_PARTITION) <= endDate.year)
+        for filterObject in asDataFilters(tableFilter, schema.keys()):
+            predicates.append(filterObject.toPolarsExpression())
+        return predicates
+
+    def fRead(
+        self,
+        tableName: str,
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+        dtypes: dict[str, pl.DataType] | None = None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Scan the table with the filters and the column selection pushed down to the
+        Parquet reader. Returns a Future like CentralDatabaseConnection.fRead; dtypes
+        overrides the type of the selected columns it names.
+        """
+        with self._lock:
+            writes = list(self._pendingWrites.get(tableName, []))
+
+        def operation() -> pl.DataFrame:
+            self._waitForWrites(writes)
+            layout = self._loadLayout(tableName)
+            tableColumns = self._tableColumns(layout)
+            if columns is None:
+                selected = tableColumns
+            else:
+                missing = [name for name in columns if name not in tableColumns]
+                if missing:
+                    raise ValueError(f"Columns {missing} not found in table '{tableName}'")
+                selected = columns
+            overrides = {name: dtype for name, dtype in (dtypes or {}).items() if name in selected}
+
+            with self._readAccess(tableName):
+                scan = self._filteredScan(tableName, layout, tableFilter, dateColumn, startDate, endDate)
+                if scan is None:
+                    df = pl.DataFrame(schema={name: overrides.get(name, layout["schema"][name]) for name in selected})
+                else:
+                    df = scan.select(selected).cast(overrides).collect()  # type: ignore[arg-type]
+            return df
+
+        return CallbackDispatcher().fChain(self._readExecutor.submit(operation), callback)
+
+    def fReadBatches(
+        self,
+        tableName: str,
+        batchSize: int = 100_000,
+        partitionBy: str | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+        columns: list[str] | None = None,
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Yield the table like CentralDatabaseConnection.fReadBatches: DataFrames of at most
+        batchSize rows, or one DataFrame per value of partitionBy. Only one year, or one
+        partitionBy value, is collected at a time, and a partitionBy that is a partition
+        key of the dataset only opens that value's directories.
+        """
+        with self._lock:
+            writes = list(self._pendingWrites.get(tableName, []))
+        self._waitForWrites(writes)
+        layout = self._loadLayout(tableName)
+        tableColumns = self._tableColumns(layout)
+        selected = tableColumns if columns is None else list(columns)
+        if partitionBy is not None and partitionBy not in selected:
+            # The partition column is needed to split the batches.
+            selected.append(partitionBy)
+        missing = [name for name in selected if name not in tableColumns]
+        if missing:
+            raise ValueError(f"Columns {missing} not found in table '{tableName}'")
+
+        def collect(piece: Callable[[pl.LazyFrame], pl.LazyFrame]) -> pl.DataFrame | None:
+            # Each piece is scanned under the read access, which is not held between the
+            # yields: a slow consumer does not hold off the writer's swaps.
+            with self._readAccess(tableName):
+                scan = self._filteredScan(tableName, layout, tableFilter, dateColumn, startDate, endDate)
+                return None if scan is None else piece(scan).collect()
+
+        if partitionBy is not None:
+            values = collect(lambda scan: scan.select(pl.col(partitionBy).unique().sort(nulls_last=True)))
+            if values is None:
+                return
+            dtype = layout["schema"][partitionBy]
+            for value in values.to_series():
+                partition = collect(
+                    lambda scan: scan.filter(pl.col(partitionBy).eq_missing(pl.lit(value, dtype=dtype))).select(selected)
+                )
+                if partition is not None and partition.height:
+                    yield partition
+            return
+        def yearPiece(year: int | None) -> Callable[[pl.LazyFrame], pl.LazyFrame]:
+            return lambda scan: scan.filter(pl.col(YEAR_PARTITION).eq_missing(year)).select(selected)
+
+        pieces: list[Callable[[pl.LazyFrame], pl.LazyFrame]] = [lambda scan: scan.select(selected)]
+        if layout["dateColumn"]:
+            pieces = [yearPiece(year) for year in self._listYears(tableName)]
+        for piece in pieces:
+            frame = collect(piece)
+            if frame is not None:
+                yield from frame.iter_slices(n_rows=batchSize)
+
+    def _listYears(self, tableName: str) -> list[int | None]:
+        dataPath = os.path.join(self._tablePath(tableName), _DATA_DIR)
+        years: list[int | None] = []
+        for entry in os.listdir(dataPath):
+            text = entry.removeprefix(f"{YEAR_PARTITION}=")
+            if text == _HIVE_NULL:
+                years.append(None)
+            elif text != entry and text.lstrip("-").isdigit():
+                years.append(int(text))
+        return sorted(years, key=lambda year: (year is None, year or 0))
+
+    def fAggregate(
+        self,
+        tableName: str,
+        groupBy: list[str],
+        aggregations: list[ColumnAggregation],
+        callback: Callable[[pl.DataFrame], None] | None = None,
+        tableFilter: dict[str, Any] | TableFilter | None = None,
+        dateColumn: str | None = None,
+        startDate: date | None = None,
+        endDate: date | None = None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Grouped read run by the lazy Parquet scan, so the filters are pushed down and
+        only the aggregated rows are materialized. Returns a Future like fRead.
+        """
+        with self._lock:
+            writes = list(self._pendingWrites.get(tableName, []))
+
+        def operation() -> pl.DataFrame:
+            self._waitForWrites(writes)
+            layout = self._loadLayout(tableName)
+            tableColumns = self._tableColumns(layout)
+            missing = [
+                name for name in [*groupBy, *(aggregation.columnName for aggregation in aggregations)]
+                if name not in tableColumns
+            ]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in table '{tableName}'")
+
+            with self._readAccess(tableName):
+                scan = self._filteredScan(tableName, layout, tableFilter, dateColumn, startDate, endDate)
+                if scan is None:
+                    scan = pl.LazyFrame(schema={name: layout["schema"][name] for name in tableColumns})
+                df = (
+                    scan.group_by(groupBy)
+                    .agg([aggregation.toPolarsExpression() for aggregation in aggregations])
+                    .collect()
+                )
+            return df
+
+        return CallbackDispatcher().fChain(self._readExecutor.submit(operation), callback)
+
+    @staticmethod
+    def _tableColumns(layout: dict[str, Any]) -> list[str]:
+        return [name for name in layout["schema"] if not (name == YEAR_PARTITION and layout["dateColumn"])]
+
+    def _filteredScan(
+        self,
+        tableName: str,
+        layout: dict[str, Any],
+        tableFilter: dict[str, Any] | TableFilter | None,
+        dateColumn: str | None,
+        startDate: date | None,
+        endDate: date | None,
+    ) -> pl.LazyFrame | None:
+        predicates = self._buildPredicates(layout, tableFilter, dateColumn, startDate, endDate)
+        scan = self._scan(tableName, layout)
+        if scan is not None and predicates:
+            scan = scan.filter(pl.all_horizontal(predicates))
+        return scan
+
+    def fDeleteRows(self, tableName: str, tableFilter: dict[str, Any] | TableFilter) -> "Future[None]":
+        """
+        Rewrite the files holding rows that match tableFilter without them. The rewritten
+        files replace the old ones in one step for the reads.
+        """
+        def operation() -> None:
+            layout = self._loadLayout(tableName)
+            predicates = self._buildPredicates(layout, tableFilter, None, None, None)
+            if not predicates:
+                return
+            matches = pl.all_horizontal(predicates)
+            keys = self._partitionKeys(layout)
+            hiveSchema = {key: layout["schema"][key] for key in keys}
+            tablePath = self._tablePath(tableName)
+            dataPath = os.path.join(tablePath, _DATA_DIR)
+            # Old file, and the file written outside the dataset to take its place (None when no row is kept).
+            rewrites: list[tuple[str, str | None]] = []
+            try:
+                for directory, _, files in os.walk(dataPath):
+                    for fileName in files:
+                        filePath = os.path.join(directory, fileName)
+                        frame = pl.read_parquet(filePath, hive_partitioning=bool(keys), hive_schema=hiveSchema or None)
+                        kept = frame.filter(~matches.fill_null(False))
+                        if kept.height == frame.height:
+                            continue
+                        incomingPath = None
+                        if kept.height:
+                            incomingPath = os.path.join(tablePath, f"_incoming_{uuid.uuid4().hex}.parquet")
+                            kept.drop(keys).write_parquet(incomingPath)
+                        rewrites.append((filePath, incomingPath))
+                if rewrites:
+                    with self._swapAccess(tableName):
+                        for filePath, incomingPath in rewrites:
+                            os.remove(filePath)
+                            if incomingPath is not None:
+                                os.replace(incomingPath, os.path.join(os.path.dirname(filePath), f"{uuid.uuid4().hex}.parquet"))
+            finally:
+                for _, incomingPath in rewrites:
+                    if incomingPath is not None and os.path.exists(incomingPath):
+                        os.remove(incomingPath)
+
+        return self._submitWrite(tableName, operation)
+
+    def fShutdown(self) -> None:
+        self._is_shutting_down = True
+        self._writeExecutor.shutdown(wait=True)
+        self._readExecutor.shutdown(wait=True)
@@ -0,0 +1,163 @@
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from datetime import date
+from threading import Lock
+from typing import Any, cast
+import polars as pl
+
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
+from emater_data_science.library.table_filter import TableFilter
+
+# Table name first, then the hashable fetch arguments, see fResultCacheKey.
+ResultCacheKey = tuple[Hashable, ...]
+
+
+def _freeze(value: object) -> Hashable:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(item) for item in value)
+    # Raises TypeError for a value that cannot be part of a key.
+    hash(value)
+    return value
+
+
+def fResultCacheKey(
+    tableName: str,
+    tableFilter: dict[str, Any] | TableFilter | None,
+    dateColumn: str | None,
+    startDate: date | None,
+    endDate: date | None,
+    columns: list[str] | None,
+) -> ResultCacheKey | None:
+    """
+    Hashable key of one fFetchTable call, or None when a filter value cannot be hashed.
+    """
+    if tableFilter is None:
+        filterKey: tuple[Any, ...] = ()
+    elif isinstance(tableFilter, TableFilter):
+        filterKey = tuple(sorted(
+            (filterObject.columnName, filterObject.filterOperand, filterObject.filterValue)
+            for filterObject in tableFilter.filterObjects.values()
+        ))
+    else:
+        filterKey = tuple(sorted(tableFilter.items()))
+    try:
+        return (
+            tableName, _freeze(filterKey), dateColumn, startDate, endDate,
+            None if columns is None else tuple(columns),
+        )
+    except TypeError:
+        return None
+
+
+class ResultCache:
+    """
+    In-process LRU cache of fetch results, bounded by the estimated size of the cached
+    DataFrames. Entries hold the fetch Future itself, so identical fetches issued while
+    the first one is still running share it instead of reading the table again.
+
+    Every caller gets its own DataFrame cloned from the cached one; a Polars clone shares
+    the column buffers, so a hit copies no data and in-place changes by one caller do not
+    reach the others.
+
+    Entries are dropped with fInvalidate when a table is written or deleted from. A fetch
+    that was running when its table was invalidated is returned but not kept.
+    """
+
+    def __init__(self, maxBytes: int = 512 * 1024**2) -> None:
+        self.maxBytes = maxBytes
+        self._entries: OrderedDict[ResultCacheKey, Future[pl.DataFrame]] = OrderedDict()
+        self._sizes: dict[ResultCacheKey, int] = {}
+        self._generations: dict[str, int] = {}
+        self._lock = Lock()
+        self._cachedBytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fGet(self, key: ResultCacheKey) -> "Future[pl.DataFrame] | None":
+        with self._lock:
+            future = self._entries.get(key)
+            if future is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return future
+
+    def fPut(self, key: ResultCacheKey, future: "Future[pl.DataFrame]") -> None:
+        tableName = cast(str, key[0])
+        with self._lock:
+            generation = self._generations.get(tableName, 0)
+            self._entries[key] = future
+            self._entries.move_to_end(key)
+        future.add_done_callback(lambda done: self._onDone(key, done, generation))
+
+    def _onDone(self, key: ResultCacheKey, future: "Future[pl.DataFrame]", generation: int) -> None:
+        with self._lock:
+            if self._entries.get(key) is not future:
+                return
+            if future.cancelled() or future.exception() is not None or self._generations.get(cast(str, key[0]), 0) != generation:
+                del self._entries[key]
+                return
+            size = int(future.result().estimated_size())
+            if size > self.maxBytes:
+                del self._entries[key]
+                return
+            self._sizes[key] = size
+            self._cachedBytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        # Caller must hold self._lock. Running fetches have no size yet and are never evicted.
+        for key in list(self._entries):
+            if self._cachedBytes <= self.maxBytes:
+                return
+            if key in self._sizes:
+                self._drop(key)
+
+    def _drop(self, key: ResultCacheKey) -> None:
+        # Caller must hold self._lock.
+        del self._entries[key]
+        self._cachedBytes -= self._sizes.pop(key, 0)
+
+    def fInvalidate(self, tableName: str | None = None) -> None:
+        """
+        Drop the cached results of one table, or of every table when tableName is None.
+        """
+        with self._lock:
+            tableNames = {cast(str, key[0]) for key in self._entries} if tableName is None else {tableName}
+            for key in list(self._entries):
+                if key[0] in tableNames:
+                    self._drop(key)
+            # Fetches still running for these tables must not be kept when they finish.
+            for name in tableNames:
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+    @staticmethod
+    def fShare(
+        future: "Future[pl.DataFrame]",
+        callback: Callable[[pl.DataFrame], None] | None = None,
+    ) -> "Future[pl.DataFrame]":
+        """
+        Future resolving with a clone of the cached fetch's DataFrame, after callback ran on it.
+        """
+        shared: Future[pl.DataFrame] = Future()
+        shared.set_running_or_notify_cancel()
+
+        def resolve(done: "Future[pl.DataFrame]") -> None:
+            try:
+                CallbackDispatcher().fDeliver(shared, done.result().clone(), callback)
+            except BaseException as fetchError:
+                shared.set_exception(fetchError)
+
+        future.add_done_callback(resolve)
+        return shared
+
+    def fGetStats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._cachedBytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
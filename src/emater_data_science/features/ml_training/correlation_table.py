@@ -1,4 +1,8 @@
 import polars as pl
+from emater_data_science.data.api_data.bc_cotação_dollar import COTACAO_DOLAR_MENSAL
+from emater_data_science.data.api_data.bc_credito_rural import CREDITO_RURAL_MENSAL
+from emater_data_science.data.api_data.bc_selic import TAXA_SELIC_MENSAL
+from emater_data_science.data.api_data.first_generate_inmet_diario import INMET_DIARIO_MENSAL
 from emater_data_science.data.data_interface import DataInterface
 from emater_data_science.features.ml_training.first_selic import fAnalisarCorrelacoesSelic
 from emater_data_science.features.ml_training.second_dollar import fAnalisarCorrelacoesDollar
@@ -54,6 +58,9 @@ def fGerarTabelaCorrelacoes() :
 
 
 if __name__ == "__main__":
-    tabelaFinal = fGerarTabelaCorrelacoes()
+    # As análises só leem; as tabelas em disco são servidas de uma cópia em memória.
+    agregados = [INMET_DIARIO_MENSAL, TAXA_SELIC_MENSAL, COTACAO_DOLAR_MENSAL, CREDITO_RURAL_MENSAL]
+    with DataInterface().fSnapshotSession(["dados_safra_emater", *(agregado.name for agregado in agregados)]):
+        tabelaFinal = fGerarTabelaCorrelacoes()
     DataInterface().fStoreTable(CorrelacoesProdutividade, tabelaFinal)
     DataInterface().fShutdown()
@@ -1,19 +1,9 @@
 import polars as pl
-import time
 from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.api_data.bc_selic import TAXA_SELIC_MENSAL
 
 def fGetSelicMensal(df: pl.DataFrame) -> pl.DataFrame:
-    return (
-        df.with_columns(
-            [
-                pl.col("data").dt.year().alias("ano"),
-                pl.col("data").dt.month().alias("mes"),
-            ]
-        )
-        .group_by(["ano", "mes"])
-        .agg(pl.col("valor").mean().alias("selic_mensal"))
-        .sort(["ano", "mes"])
-    )
+    return TAXA_SELIC_MENSAL.fAggregate(df)
 
 
 def fCorrelacaoSelicPorProduto(selic: pl.DataFrame, safra: pl.DataFrame) -> dict[str, float]:
@@ -44,24 +34,10 @@ def fCorrelacaoSelicPorProduto(selic: pl.DataFrame, safra: pl.DataFrame) -> dict
 
 
 def fAnalisarCorrelacoesSelic() -> dict[str, float]:
-    resultado: dict[str, float] = {}
-
-    def _onSelic(selicDf: pl.DataFrame):
-        selicMensal = fGetSelicMensal(selicDf)
-
-        def _onSafra(safraDf: pl.DataFrame):
-            nonlocal resultado
-            resultado = fCorrelacaoSelicPorProduto(selicMensal, safraDf)
-
-        DataInterface().fFetchTable("dados_safra_emater", callback=_onSafra)
-
-    DataInterface().fFetchTable("taxa_selic", callback=_onSelic)
-
-    while not resultado:
-        time.sleep(1)
-
-    return resultado
-
+    # A média mensal já vem agregada da tabela materializada.
+    futuroSelic = DataInterface().fFetchAggregate(TAXA_SELIC_MENSAL)
+    tabelas = DataInterface().fFetchTables(["dados_safra_emater"])
+    return fCorrelacaoSelicPorProduto(futuroSelic.result(), tabelas["dados_safra_emater"])
 
 if __name__ == "__main__":
     fAnalisarCorrelacoesSelic()
@@ -1,26 +1,9 @@
 import polars as pl
-import time
 from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.api_data.first_generate_inmet_diario import INMET_DIARIO_MENSAL
 
 def fAgruparMeteorologiaMensal(df: pl.DataFrame) -> pl.DataFrame:
-    df = df.with_columns([
-        pl.col("data").dt.year().alias("ano"),
-        pl.col("data").dt.month().alias("mes")
-    ])
-
-    return (
-        df.group_by(["ano", "mes"])
-        .agg([
-            pl.col("precipitacao").sum().alias("precipitacao_total_dias"),
-            pl.col("precipitacao").mean().alias("precipitacao_media_uf"),
-            pl.col("pressao").mean().alias("pressao_media"),
-            pl.col("radiacao").mean().alias("radiacao_media"),
-            pl.col("temp_bulbo_seco").mean().alias("temperatura_media"),
-            pl.col("umidade").mean().alias("umidade_media"),
-            pl.col("vento_vel").mean().alias("vento_vel_media")
-        ])
-        .sort(["ano", "mes"])
-    )
+    return INMET_DIARIO_MENSAL.fAggregate(df)
 
 def fCorrelacaoClimaPorProduto(meteorologia: pl.DataFrame, safra: pl.DataFrame) -> dict[str, dict[str, float ]]:
     meteorologia = meteorologia.with_columns([
@@ -68,24 +51,12 @@ def fCorrelacaoClimaPorProduto(meteorologia: pl.DataFrame, safra: pl.DataFrame)
     return resultados
 
 def fAnalisarMeteorologia() -> dict[str, dict[str, float ]]:
-    dadosMet = None
-    dadosSafra = None
-
-    def fSetMet(d: pl.DataFrame):
-        nonlocal dadosMet
-        dadosMet = d
-
-    def fSetSafra(d: pl.DataFrame):
-        nonlocal dadosSafra
-        dadosSafra = d
-
-    DataInterface().fFetchTable("estacao_inmet_meteorologico_diario", callback=fSetMet)
-    DataInterface().fFetchTable("dados_safra_emater", callback=fSetSafra)
-
-    while dadosMet is None or dadosSafra is None:
-        time.sleep(1)
+    # O clima mensal já vem agregado da tabela materializada.
+    futuroClima = DataInterface().fFetchAggregate(INMET_DIARIO_MENSAL)
+    tabelas = DataInterface().fFetchTables(["dados_safra_emater"])
+    dadosSafra = tabelas["dados_safra_emater"]
 
-    metMensal = fAgruparMeteorologiaMensal(dadosMet)
+    metMensal = futuroClima.result()
     resultado = fCorrelacaoClimaPorProduto(metMensal, dadosSafra)
 
     return resultado
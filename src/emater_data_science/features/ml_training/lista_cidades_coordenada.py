@@ -1,5 +1,4 @@
 import polars as pl
-import time
 from emater_data_science.data.data_interface import DataInterface
 
 def fBuscarCoordenadasCSV() -> pl.DataFrame:
@@ -24,16 +23,7 @@ def fNormalizarNomeMunicipio(nome: str) -> str:
     return substituicoes.get(nome, nome)
 
 def fCriarTabelaMunicipios():
-    dadosSafra = None
-
-    def fSetSafra(safraDf: pl.DataFrame):
-        nonlocal dadosSafra
-        dadosSafra = safraDf
-
-    DataInterface().fFetchTable("dados_safra_emater", callback=fSetSafra)
-
-    while dadosSafra is None:
-        time.sleep(1)
+    dadosSafra = DataInterface().fFetchTable("dados_safra_emater").result()
 
     municipiosSafra = dadosSafra.select(pl.col("municipio").str.to_uppercase().alias("municipio"))
 
@@ -1,6 +1,5 @@
 from datetime import date
 import polars as pl
-import time
 import numpy as np
 import torch
 import torch.nn as nn
@@ -11,50 +10,35 @@ from sklearn.preprocessing import StandardScaler
 from emater_data_science.data.data_interface import DataInterface
 from tabulate import tabulate
 
-def fCarregarTabelas():
-    safra = selic = credito = dolar = clima = None
-
-    def fSetSafra(df):
-        nonlocal safra
-        safra = df.with_columns([
-            pl.col("nrAno").cast(pl.Int32),
-            pl.col("nrMes").cast(pl.Int32)
-        ])
-
-    def fSetSelic(df):
-        nonlocal selic
-        selic = df.with_columns([
-            pl.col("data").dt.year().cast(pl.Int32).alias("nrAno"),
-            pl.col("data").dt.month().cast(pl.Int32).alias("nrMes")
-        ])
+# Colunas de clima usadas na análise; as demais não são lidas do banco.
+COLUNAS_CLIMA = ["data", "precipitacao", "pressao", "radiacao", "temp_bulbo_seco", "umidade", "vento_vel"]
+# Tabelas lidas pela análise, copiadas para a memória na sessão de leitura.
+TABELAS_ANALISE = ["dados_safra_emater", "taxa_selic", "credito_rural", "cotacao_dolar", "estacao_inmet_meteorologico_diario"]
 
-    def fSetCredito(df):
-        nonlocal credito
-        credito = df.with_columns([
-            pl.col("data").dt.year().cast(pl.Int32).alias("nrAno"),
-            pl.col("data").dt.month().cast(pl.Int32).alias("nrMes")
-        ])
+def fCarregarTabelas():
+    tabelas = DataInterface().fFetchTables({
+        "dados_safra_emater": None,
+        "taxa_selic": None,
+        "credito_rural": None,
+        "cotacao_dolar": None,
+        "estacao_inmet_meteorologico_diario": {"columns": COLUNAS_CLIMA},
+    })
+
+    safra = tabelas["dados_safra_emater"].with_columns([
+        pl.col("nrAno").cast(pl.Int32),
+        pl.col("nrMes").cast(pl.Int32)
+    ])
 
-    def fSetDolar(df):
-        nonlocal dolar
-        dolar = df.with_columns([
+    def fComAnoMes(df: pl.DataFrame) -> pl.DataFrame:
+        return df.with_columns([
             pl.col("data").dt.year().cast(pl.Int32).alias("nrAno"),
             pl.col("data").dt.month().cast(pl.Int32).alias("nrMes")
         ])
 
-    def fSetClima(df):
-        nonlocal clima
-        clima = df
-
-    dataInterface = DataInterface()
-    dataInterface.fFetchTable("dados_safra_emater", callback=fSetSafra)
-    dataInterface.fFetchTable("taxa_selic", callback=fSetSelic)
-    dataInterface.fFetchTable("credito_rural", callback=fSetCredito)
-    dataInterface.fFetchTable("cotacao_dolar", callback=fSetDolar)
-    dataInterface.fFetchTable("estacao_inmet_meteorologico_diario", callback=fSetClima)
-
-    while safra is None or selic is None or credito is None or dolar is None or clima is None:
-        time.sleep(0.2)
+    selic = fComAnoMes(tabelas["taxa_selic"])
+    credito = fComAnoMes(tabelas["credito_rural"])
+    dolar = fComAnoMes(tabelas["cotacao_dolar"])
+    clima = tabelas["estacao_inmet_meteorologico_diario"]
 
     return safra, selic, credito, dolar, clima
 
@@ -519,5 +503,7 @@ def fPreverProdutividadeSoja2024():
     return resultado
 
 if __name__ == "__main__":
-    fPreverProdutividadeSoja2024()
+    # Só leitura: as tabelas em disco são servidas de uma cópia em memória.
+    with DataInterface().fSnapshotSession(TABELAS_ANALISE):
+        fPreverProdutividadeSoja2024()
     DataInterface().fShutdown()
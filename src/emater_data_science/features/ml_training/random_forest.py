@@ -1,5 +1,4 @@
 import polars as pl
-import time
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
@@ -7,55 +6,38 @@ from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler
 from emater_data_science.data.data_interface import DataInterface
 
-def fCarregarTabelas():
-    safra = selic = credito = dolar = clima = None
-
-    def fSetSafra(df):
-        nonlocal safra
-        print("Carregando dados de safra...")
-        safra = df.with_columns([
-            pl.col("nrAno").cast(pl.Int32),
-            pl.col("nrMes").cast(pl.Int32)
-        ])
+# Colunas de clima usadas na análise; as demais não são lidas do banco.
+COLUNAS_CLIMA = ["data", "precipitacao", "pressao", "radiacao", "temp_bulbo_seco", "umidade", "vento_vel"]
 
-    def fSetSelic(df):
-        nonlocal selic
-        print("Carregando dados de taxa Selic...")
-        selic = df.with_columns([
-            pl.col("data").dt.year().cast(pl.Int32).alias("nrAno"),
-            pl.col("data").dt.month().cast(pl.Int32).alias("nrMes")
-        ])
-
-    def fSetCredito(df):
-        nonlocal credito
-        print("Carregando dados de crédito rural...")
-        credito = df.with_columns([
-            pl.col("data").dt.year().cast(pl.Int32).alias("nrAno"),
-            pl.col("data").dt.month().cast(pl.Int32).alias("nrMes")
-        ])
+def fCarregarTabelas():
+    tabelas = DataInterface().fFetchTables({
+        "dados_safra_emater": None,
+        "taxa_selic": None,
+        "credito_rural": None,
+        "cotacao_dolar": None,
+        "estacao_inmet_meteorologico_diario": {"columns": COLUNAS_CLIMA},
+    })
+
+    print("Carregando dados de safra...")
+    safra = tabelas["dados_safra_emater"].with_columns([
+        pl.col("nrAno").cast(pl.Int32),
+        pl.col("nrMes").cast(pl.Int32)
+    ])
 
-    def fSetDolar(df):
-        nonlocal dolar
-        print("Carregando dados de cotação do dólar...")
-        dolar = df.with_columns([
+    def fComAnoMes(df: pl.DataFrame) -> pl.DataFrame:
+        return df.with_columns([
             pl.col("data").dt.year().cast(pl.Int32).alias("nrAno"),
             pl.col("data").dt.month().cast(pl.Int32).alias("nrMes")
         ])
 
-    def fSetClima(df):
-        print("Carregando dados de clima...")
-        nonlocal clima
-        clima = df
-
-    dataInterface = DataInterface()
-    dataInterface.fFetchTable("dados_safra_emater", callback=fSetSafra)
-    dataInterface.fFetchTable("taxa_selic", callback=fSetSelic)
-    dataInterface.fFetchTable("credito_rural", callback=fSetCredito)
-    dataInterface.fFetchTable("cotacao_dolar", callback=fSetDolar)
-    dataInterface.fFetchTable("estacao_inmet_meteorologico_diario", callback=fSetClima)
-
-    while safra is None or selic is None or credito is None or dolar is None or clima is None:
-        time.sleep(0.2)
+    print("Carregando dados de taxa Selic...")
+    selic = fComAnoMes(tabelas["taxa_selic"])
+    print("Carregando dados de crédito rural...")
+    credito = fComAnoMes(tabelas["credito_rural"])
+    print("Carregando dados de cotação do dólar...")
+    dolar = fComAnoMes(tabelas["cotacao_dolar"])
+    print("Carregando dados de clima...")
+    clima = tabelas["estacao_inmet_meteorologico_diario"]
 
     return safra, selic, credito, dolar, clima
 
@@ -1,22 +1,9 @@
 import polars as pl
 from emater_data_science.data.data_interface import DataInterface
-import time
+from emater_data_science.data.api_data.bc_cotação_dollar import COTACAO_DOLAR_MENSAL
 
 def fGetDolarMensal(df: pl.DataFrame) -> pl.DataFrame:
-    return (
-        df.with_columns([
-            pl.col("data").dt.year().alias("ano"),
-            pl.col("data").dt.month().alias("mes"),
-        ])
-        .group_by(["ano", "mes"])
-        .agg(
-            [
-                pl.col("cotacao_compra").mean().alias("dolar_compra_mensal"),
-                pl.col("cotacao_venda").mean().alias("dolar_venda_mensal"),
-            ]
-        )
-        .sort(["ano", "mes"])
-    )
+    return COTACAO_DOLAR_MENSAL.fAggregate(df)
 
 def fCorrelacaoDolarPorProduto(dolar: pl.DataFrame, safra: pl.DataFrame) -> dict[str, float]:
     # Normaliza tipos
@@ -53,22 +40,10 @@ def fCorrelacaoDolarPorProduto(dolar: pl.DataFrame, safra: pl.DataFrame) -> dict
     return resultados
 
 def fAnalisarCorrelacoesDollar():
-    resultado: dict[str, float] = {}
-    def _onDolar(dolarDf: pl.DataFrame):
-        dolarMensal = fGetDolarMensal(dolarDf)
-
-        def _onSafra(safraDf: pl.DataFrame):
-            nonlocal resultado
-            resultado = fCorrelacaoDolarPorProduto(dolarMensal, safraDf)
-
-        DataInterface().fFetchTable("dados_safra_emater", callback=_onSafra)
-
-    DataInterface().fFetchTable("cotacao_dolar", callback=_onDolar)
-
-    while not resultado:
-        time.sleep(1)
-
-    return resultado
+    # As médias mensais já vêm agregadas da tabela materializada.
+    futuroDolar = DataInterface().fFetchAggregate(COTACAO_DOLAR_MENSAL)
+    tabelas = DataInterface().fFetchTables(["dados_safra_emater"])
+    return fCorrelacaoDolarPorProduto(futuroDolar.result(), tabelas["dados_safra_emater"])
 
 if __name__ == "__main__":
     fAnalisarCorrelacoesDollar()
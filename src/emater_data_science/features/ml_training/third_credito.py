@@ -1,21 +1,9 @@
 import polars as pl
 from emater_data_science.data.data_interface import DataInterface
-import time
+from emater_data_science.data.api_data.bc_credito_rural import CREDITO_RURAL_MENSAL
 
 def fGetCreditoRuralMensal(df: pl.DataFrame) -> pl.DataFrame:
-    return (
-        df.with_columns([
-            pl.col("data").dt.year().alias("ano"),
-            pl.col("data").dt.month().alias("mes"),
-        ])
-        .group_by(["ano", "mes"])
-        .agg([
-            pl.col("vl_custeio").sum().alias("custeio_mensal"),
-            pl.col("vl_investimento").sum().alias("investimento_mensal"),
-            pl.col("vl_comercializacao").sum().alias("comercializacao_mensal"),
-        ])
-        .sort(["ano", "mes"])
-    )
+    return CREDITO_RURAL_MENSAL.fAggregate(df)
 
 def fCorrelacaoCreditoPorProduto(credito: pl.DataFrame, safra: pl.DataFrame) -> dict[str, dict[str, float]]:
     credito = credito.with_columns([
@@ -54,24 +42,12 @@ def fCorrelacaoCreditoPorProduto(credito: pl.DataFrame, safra: pl.DataFrame) ->
     return resultados
 
 def fAnalisarCorrelacoesCredito() -> dict[str, dict[str, float]]:
-    dadosSafra = None
-    dadosCredito = None
+    # Os totais mensais já vêm agregados da tabela materializada.
+    futuroCredito = DataInterface().fFetchAggregate(CREDITO_RURAL_MENSAL)
+    tabelas = DataInterface().fFetchTables(["dados_safra_emater"])
+    dadosSafra = tabelas["dados_safra_emater"]
 
-    def fSetSafra(safraDf: pl.DataFrame):
-        nonlocal dadosSafra
-        dadosSafra = safraDf
-
-    def fSetCredito(creditoDf: pl.DataFrame):
-        nonlocal dadosCredito
-        dadosCredito = creditoDf
-
-    DataInterface().fFetchTable("dados_safra_emater", callback=fSetSafra)
-    DataInterface().fFetchTable("credito_rural", callback=fSetCredito)
-
-    while dadosSafra is None or dadosCredito is None:
-        time.sleep(1)
-
-    creditoMensal = fGetCreditoRuralMensal(dadosCredito)
+    creditoMensal = futuroCredito.result()
     resultados = fCorrelacaoCreditoPorProduto(creditoMensal, dadosSafra)
 
     return resultados
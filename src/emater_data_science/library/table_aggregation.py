@@ -0,0 +1,100 @@
+#table_aggregation.py
+import polars as pl
+from dataclasses import dataclass
+from typing import Any
+from sqlalchemy import ColumnElement, Float, Table, case, func, literal
+
+
+@dataclass
+class ColumnAggregation:
+    """
+    One aggregated output column of a grouped read, compiled either to SQL or to a
+    Polars expression with the same result.
+
+    functions: sum (0 when every value is missing), mean, min, max, count (non-missing
+    values), any (the largest non-missing value on both backends; meant for columns
+    constant within a group, such as a name next to its code) and circular_mean (mean of angles in degrees, in [0, 360)).
+    missingValue marks a sentinel the source uses for missing data, e.g. -9999.0;
+    it is treated as null before aggregating.
+    """
+    validFunctions = {"sum", "mean", "min", "max", "count", "any", "circular_mean"}
+
+    columnName: str
+    function: str
+    outputName: str | None = None
+    missingValue: float | int | None = None
+
+    def __post_init__(self) -> None:
+        if self.function not in self.validFunctions:
+            raise ValueError(f"Invalid aggregation function: {self.function}")
+        if self.outputName is None:
+            self.outputName = self.columnName
+
+    @property
+    def _outputLabel(self) -> str:
+        # __post_init__ fills outputName in; this narrows its type.
+        return self.outputName if self.outputName is not None else self.columnName
+
+    def toSqlExpression(self, table: Table) -> ColumnElement[Any]:
+        """
+        SQLAlchemy aggregate expression labelled with outputName.
+        """
+        if self.columnName not in table.c:
+            raise ValueError(f"Invalid column name: {self.columnName}")
+        column: ColumnElement[Any] = table.c[self.columnName]
+        expression: ColumnElement[Any]
+        if self.missingValue is not None:
+            column = func.nullif(column, self.missingValue, type_=column.type)
+        match self.function:
+            case "sum":
+                expression = func.coalesce(func.sum(column), 0, type_=column.type)
+            case "mean":
+                expression = func.avg(column, type_=Float)
+            case "min":
+                expression = func.min(column)
+            case "max":
+                expression = func.max(column)
+            case "count":
+                expression = func.count(column)
+            case "any":
+                expression = func.max(column)
+            case "circular_mean":
+                radians = func.radians(column)
+                angle = func.degrees(func.atan2(func.sum(func.sin(radians)), func.sum(func.cos(radians))))
+                expression = case((angle < 0, angle + literal(360.0)), else_=angle).cast(Float)
+            case _:
+                raise ValueError(f"Invalid aggregation function: {self.function}")
+        return expression.label(self._outputLabel)
+
+    def toPolarsExpression(self) -> pl.Expr:
+        """
+        Polars aggregation expression aliased to outputName.
+        """
+        column = pl.col(self.columnName)
+        if self.missingValue is not None:
+            column = pl.when(column == self.missingValue).then(None).otherwise(column)
+        match self.function:
+            case "sum":
+                expression = column.sum()
+            case "mean":
+                expression = column.mean()
+            case "min":
+                expression = column.min()
+            case "max":
+                expression = column.max()
+            case "count":
+                expression = column.count()
+            case "any":
+                # max, like the SQL side, so both backends pick the same value.
+                expression = column.max()
+            case "circular_mean":
+                radians = column.radians()
+                angle = pl.arctan2(radians.sin().sum(), radians.cos().sum()).degrees()
+                expression = (
+                    pl.when(column.count() == 0).then(None)
+                    .when(angle < 0).then(angle + 360.0)
+                    .otherwise(angle)
+                )
+            case _:
+                raise ValueError(f"Invalid aggregation function: {self.function}")
+        return expression.alias(self._outputLabel)
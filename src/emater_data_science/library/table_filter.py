@@ -1,22 +1,89 @@
 #table_filter.py
 import polars as pl
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Iterable
+from sqlalchemy import ColumnElement, Table
 
 @dataclass
 class DataFilter:
     """
     Represents a single filter applied to a table column.
     """
-    validOperands = {"==", "!=", ">", "<", ">=", "<="}
+    validOperands = {"==", "!=", ">", "<", ">=", "<=", "in", "not in", "is null", "is not null"}
+    listOperands = {"in", "not in"}
+    nullOperands = {"is null", "is not null"}
 
     columnName: str
     filterOperand: str
-    filterValue: any
+    filterValue: any = None
 
     def __post_init__(self):
         if self.filterOperand not in self.validOperands:
             raise ValueError(f"Invalid filter operand: {self.filterOperand}")
+        if self.filterOperand in self.listOperands:
+            if isinstance(self.filterValue, (str, bytes)) or not isinstance(self.filterValue, Iterable):
+                raise ValueError(f"Filter operand '{self.filterOperand}' needs a list of values.")
+            self.filterValue = list(self.filterValue)
+
+    def toPolarsExpression(self) -> pl.Expr:
+        """
+        Polars expression selecting the rows that pass this filter.
+        """
+        column = pl.col(self.columnName)
+        match self.filterOperand:
+            case "==":
+                return column == self.filterValue
+            case "!=":
+                return column != self.filterValue
+            case ">":
+                return column > self.filterValue
+            case "<":
+                return column < self.filterValue
+            case ">=":
+                return column >= self.filterValue
+            case "<=":
+                return column <= self.filterValue
+            case "in":
+                return column.is_in(self.filterValue)
+            case "not in":
+                return ~column.is_in(self.filterValue)
+            case "is null":
+                return column.is_null()
+            case "is not null":
+                return column.is_not_null()
+            case _:
+                raise ValueError(f"Invalid filter operand: {self.filterOperand}")
+
+    def toSqlExpression(self, table: Table) -> ColumnElement[bool]:
+        """
+        SQLAlchemy WHERE condition selecting the rows that pass this filter.
+        """
+        if self.columnName not in table.c:
+            raise ValueError(f"Invalid column name: {self.columnName}")
+        column = table.c[self.columnName]
+        match self.filterOperand:
+            case "==":
+                return column == self.filterValue
+            case "!=":
+                return column != self.filterValue
+            case ">":
+                return column > self.filterValue
+            case "<":
+                return column < self.filterValue
+            case ">=":
+                return column >= self.filterValue
+            case "<=":
+                return column <= self.filterValue
+            case "in":
+                return column.in_(self.filterValue)
+            case "not in":
+                return column.not_in(self.filterValue)
+            case "is null":
+                return column.is_(None)
+            case "is not null":
+                return column.is_not(None)
+            case _:
+                raise ValueError(f"Invalid filter operand: {self.filterOperand}")
 
 
 class TableFilter:
@@ -58,23 +125,7 @@ class TableFilter:
         if not self.filterObjects:
             return self.originalTable
 
-        filters = []
-        for filterObject in self.filterObjects.values():
-            match filterObject.filterOperand:
-                case "==":
-                    filters.append(pl.col(filterObject.columnName) == filterObject.filterValue)
-                case "!=":
-                    filters.append(pl.col(filterObject.columnName) != filterObject.filterValue)
-                case ">":
-                    filters.append(pl.col(filterObject.columnName) > filterObject.filterValue)
-                case "<":
-                    filters.append(pl.col(filterObject.columnName) < filterObject.filterValue)
-                case ">=":
-                    filters.append(pl.col(filterObject.columnName) >= filterObject.filterValue)
-                case "<=":
-                    filters.append(pl.col(filterObject.columnName) <= filterObject.filterValue)
-                case _:
-                    raise ValueError(f"Invalid filter operand: {filterObject.filterOperand}")
+        filters = [filterObject.toPolarsExpression() for filterObject in self.filterObjects.values()]
 
         combinedFilter = filters[0] if filters else None
         for f in filters[1:]:
@@ -100,7 +151,7 @@ class TableFilter:
         """
         Adds or updates a filter.
         """
-        if filterObject.filterOperand == "!=":
+        if filterObject.filterOperand in ("!=", "not in"):
             key = f"{filterObject.columnName}{filterObject.filterOperand}{filterObject.filterValue}"
         else:
             key = f"{filterObject.columnName}{filterObject.filterOperand}"
@@ -130,6 +181,37 @@ class TableFilter:
             raise KeyError(f"Filter with key '{key}' does not exist.")
 
 
+def asDataFilters(tableFilter: "dict | TableFilter | None", columns: Iterable[str]) -> List[DataFilter]:
+    """
+    Normalize the tableFilter accepted by the fetch functions into DataFilter objects.
+
+    A dict maps column names to a value (==), a list of values (in) or None (is null);
+    its columns that are not in the table are ignored, as they always were.
+    A TableFilter is used as is, and an unknown column raises ValueError.
+    """
+    if not tableFilter:
+        return []
+    columnNames = set(columns)
+    if isinstance(tableFilter, TableFilter):
+        dataFilters = list(tableFilter.getFilters().values())
+        for filterObject in dataFilters:
+            if filterObject.columnName not in columnNames:
+                raise ValueError(f"Invalid column name: {filterObject.columnName}")
+        return dataFilters
+
+    dataFilters = []
+    for col, val in tableFilter.items():
+        if col not in columnNames:
+            continue
+        if val is None:
+            dataFilters.append(DataFilter(col, "is null"))
+        elif isinstance(val, (list, tuple, set, frozenset)):
+            dataFilters.append(DataFilter(col, "in", val))
+        else:
+            dataFilters.append(DataFilter(col, "==", val))
+    return dataFilters
+
+
 if __name__ == "__main__":
     # Example Usage
     def exampleTableData():
@@ -1,17 +1,18 @@
-from typing import Literal
+from typing import Any, Literal
 from emater_data_science.logging.logging_table_model import LoggingTable, LoggingTableModel
 
 AllowedLogLevels = Literal["ERROR", "userAction", "executionState"]
 
 class LogInDisk:
-    _instance = None
+    _instance: "LogInDisk | None" = None
+    _initialized: bool
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, *args: Any, **kwargs: Any) -> "LogInDisk":
         if cls._instance is None:
             cls._instance = super(LogInDisk, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self) -> None:
         if hasattr(self, "_initialized") and self._initialized:
             return
         self._initialized = True
@@ -0,0 +1,87 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import threading
+from zipfile import ZipFile
+import pytest
+
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+@pytest.fixture(scope="session", autouse=True)
+def localStorage(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """
+    Point the storage at a temporary folder before anything opens the real database;
+    the Parquet datasets follow databaseDirectory.
+    """
+    root = tmp_path_factory.mktemp("emater_data_science")
+    CentralDatabaseConnection.databaseDirectory = str(root)
+    yield root
+    from emater_data_science.data.data_interface import DataInterface
+
+    DataInterface().fShutdown()
+
+
+def fWaitForWrites() -> None:
+    """
+    Block until every operation queued on the database writer has run.
+    """
+    CentralDatabaseConnection()._operation_queue.join()
+
+
+@contextmanager
+def fHoldWriter(tableName: str | None = None) -> Iterator[None]:
+    """
+    Keep the database writer busy for the duration of the block, as a long write
+    to tableName would, so the operations queued in it wait in the queue together.
+    """
+    started = threading.Event()
+    release = threading.Event()
+
+    def hold() -> None:
+        started.set()
+        release.wait(timeout=30)
+
+    CentralDatabaseConnection()._enqueue_operation(hold, tableName)
+    assert started.wait(timeout=10)
+    try:
+        yield
+    finally:
+        release.set()
+
+
+# Header of the readings in the INMET CSVs, in the order the files list them.
+INMET_READING_HEADER = [
+    "Data", "Hora UTC", "PRECIPITAÇÃO TOTAL, HORÁRIO (mm)", "PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)",
+    "PRESSÃO ATMOSFERICA MAX.NA HORA ANT. (AUT) (mB)", "PRESSÃO ATMOSFERICA MIN. NA HORA ANT. (AUT) (mB)",
+    "RADIACAO GLOBAL (Kj/m²)", "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)", "TEMPERATURA DO PONTO DE ORVALHO (°C)",
+    "TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)", "TEMPERATURA MÍNIMA NA HORA ANT. (AUT) (°C)",
+    "TEMPERATURA ORVALHO MAX. NA HORA ANT. (AUT) (°C)", "TEMPERATURA ORVALHO MIN. NA HORA ANT. (AUT) (°C)",
+    "UMIDADE REL. MAX. NA HORA ANT. (AUT) (%)", "UMIDADE REL. MIN. NA HORA ANT. (AUT) (%)",
+    "UMIDADE RELATIVA DO AR, HORARIA (%)", "VENTO, DIREÇÃO HORARIA (gr) (° (gr))", "VENTO, RAJADA MAXIMA (m/s)",
+    "VENTO, VELOCIDADE HORARIA (m/s)",
+]
+
+
+def fInmetCsv(estacao: str, codigo: str, year: int, valor: str = "1,5") -> str:
+    """
+    Text of an INMET CSV with three hourly readings of one station on January 1st of year.
+    """
+    lines = [
+        "REGIAO:;SE", "UF:;MG", f"ESTACAO:;{estacao}", f"CODIGO (WMO):;{codigo}", "LATITUDE:;-16,16",
+        "LONGITUDE:;-40,68", "ALTITUDE:;189,71", "DATA DE FUNDACAO:;31/10/02", ";".join(INMET_READING_HEADER) + ";",
+    ]
+    for hour in ("0000", "0100", "0200"):
+        lines.append(";".join([f"{year}/01/01", f"{hour} UTC"] + [valor] * (len(INMET_READING_HEADER) - 2)) + ";")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def fWriteInmetZip(path: Path, year: int, stations: dict[str, str], valor: str = "1,5") -> Path:
+    """
+    Write an INMET zip of one year with a CSV per station, given as {estacao: codigo}.
+    """
+    with ZipFile(path, "w") as zipFile:
+        for estacao, codigo in stations.items():
+            name = f"{year}/INMET_SE_MG_{codigo}_{estacao}_01-01-{year}_A_31-12-{year}.CSV"
+            zipFile.writestr(name, fInmetCsv(estacao, codigo, year, valor).encode("latin1"))
+    return path
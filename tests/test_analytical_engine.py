@@ -0,0 +1,86 @@
+from datetime import date
+import os
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+duckdb = pytest.importorskip("duckdb")
+
+from emater_data_science.data.analytical_data.analytical_engine import AnalyticalEngine  # noqa: E402
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraAnalitica(Base):
+    __tablename__ = "teste_analitico_disco"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao_id: Mapped[int]
+    valor: Mapped[float]
+
+
+class LeituraAnaliticaParquet(Base):
+    __tablename__ = "teste_analitico_parquet"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao_id: Mapped[int]
+    chuva: Mapped[float]
+
+
+def fReadings() -> pl.DataFrame:
+    return pl.DataFrame({
+        "data": [date(2020, 1, 1), date(2020, 7, 1), date(2021, 1, 1), date(2021, 7, 1)] * 2,
+        "estacao_id": [1] * 4 + [2] * 4,
+        "valor": [float(value) for value in range(8)],
+    })
+
+
+@pytest.fixture(scope="module")
+def dataInterface() -> DataInterface:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(LeituraAnalitica, fReadings())
+    dataInterface.fStoreTable(LeituraAnaliticaParquet, fReadings().rename({"valor": "chuva"}), storageTarget="parquet")
+    fWaitForWrites()
+    assert AnalyticalEngine().databasePath == os.path.join(CentralDatabaseConnection.databaseDirectory, "Local_Database.db")
+    return dataInterface
+
+
+def fSkipWithoutDiskTables() -> None:
+    if not AnalyticalEngine()._databaseAttached:
+        pytest.skip("DuckDB could not load its sqlite extension, so disk tables are unavailable.")
+
+
+def test_sql_query_joins_disk_and_parquet_tables(dataInterface: DataInterface) -> None:
+    fSkipWithoutDiskTables()
+    result = dataInterface.fAnalyticalQuery(
+        "SELECT d.estacao_id, sum(d.valor) AS valor, sum(p.chuva) AS chuva "
+        "FROM teste_analitico_disco d JOIN teste_analitico_parquet p USING (estacao_id, data) "
+        "WHERE d.data >= ? GROUP BY d.estacao_id ORDER BY d.estacao_id",
+        [date(2021, 1, 1)],
+    )
+    assert pl.from_arrow(result).rows() == [(1, 5.0, 5.0), (2, 13.0, 13.0)]  # type: ignore[union-attr]
+
+
+@pytest.mark.parametrize("tableName, column", [("teste_analitico_disco", "valor"), ("teste_analitico_parquet", "chuva")])
+def test_scan_plan_is_filtered_and_projected_inside_duckdb(
+    dataInterface: DataInterface, tableName: str, column: str
+) -> None:
+    if tableName == LeituraAnalitica.__tablename__:
+        fSkipWithoutDiskTables()
+    scan = dataInterface.fAnalyticalScan(tableName)
+    plan = scan.filter((pl.col("estacao_id") == 2) & (pl.col("data") >= date(2021, 1, 1))).select("data", column)
+    # The filter is handed to the DuckDB source instead of running over its output.
+    source = plan.explain().split("PYTHON SCAN")[1]
+    assert "SELECTION" in source
+    assert pl.from_arrow(dataInterface.fAnalyticalQuery(plan)).sort("data").rows() == [  # type: ignore[union-attr]
+        (date(2021, 1, 1), 6.0), (date(2021, 7, 1), 7.0),
+    ]
@@ -0,0 +1,46 @@
+from datetime import date
+import polars as pl
+from sqlalchemy import Index, inspect
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class CreditoCarga(Base):
+    __tablename__ = "teste_carga_credito"
+    __table_args__ = (
+        Index("ux_teste_carga_credito_natural_key", "cod_munic_ibge", "data", unique=True, info={"naturalKey": True}),
+        Index("ix_teste_carga_credito_data", "data"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    cod_munic_ibge: Mapped[int]
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+def fIndexNames(tableName: str) -> set[str]:
+    engine = CentralDatabaseConnection()._engine
+    assert engine is not None
+    return {index["name"] for index in inspect(engine).get_indexes(tableName)}
+
+
+def test_table_created_in_bulk_load_gets_its_secondary_indexes_on_exit() -> None:
+    dataInterface = DataInterface()
+    tableName = CreditoCarga.__tablename__
+    with dataInterface.fBulkLoad([CreditoCarga]):
+        dataInterface.fStoreTable(
+            CreditoCarga, pl.DataFrame({"cod_munic_ibge": [3100104, 3100203], "data": [date(2020, 1, 1)] * 2,
+                                        "valor": [1.0, 2.0]})
+        )
+        fWaitForWrites()
+        # Only the natural key, which the upserts need, exists while loading.
+        assert fIndexNames(tableName) == {"ux_teste_carga_credito_natural_key"}
+    fWaitForWrites()
+    assert fIndexNames(tableName) == {"ux_teste_carga_credito_natural_key", "ix_teste_carga_credito_data"}
@@ -0,0 +1,86 @@
+from concurrent.futures import Future
+from datetime import date
+import threading
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.callback_dispatcher import CallbackDispatcher
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraCallback(Base):
+    __tablename__ = "teste_callback_disco"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+class LeituraCallbackParquet(Base):
+    __tablename__ = "teste_callback_parquet"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+def fStorageThreadIds() -> set[int | None]:
+    connection = CentralDatabaseConnection()
+    threads = [connection._worker_thread, *connection._reader_threads]
+    return {thread.ident for thread in threads if thread is not None}
+
+
+def test_fetch_callbacks_run_off_the_storage_threads() -> None:
+    dataInterface = DataInterface()
+    readings = pl.DataFrame({"data": [date(2020, 1, 1), date(2021, 1, 1)], "valor": [1.0, 2.0]})
+    dataInterface.fStoreTable(LeituraCallback, readings)
+    dataInterface.fStoreTable(LeituraCallbackParquet, readings, storageTarget="parquet")
+    fWaitForWrites()
+
+    threads: dict[str, threading.Thread] = {}
+    for tableName in (LeituraCallback.__tablename__, LeituraCallbackParquet.__tablename__):
+        def callback(df: pl.DataFrame, tableName: str = tableName) -> None:
+            threads[tableName] = threading.current_thread()
+
+        assert dataInterface.fFetchTable(tableName, callback=callback, useCache=False).result().height == 2
+
+    for thread in threads.values():
+        assert thread.name.startswith("fetch-callback")
+        assert thread.ident not in fStorageThreadIds()
+    assert len(threads) == 2
+
+
+def test_chained_future_carries_the_source_and_callback_exceptions() -> None:
+    dispatcher = CallbackDispatcher()
+    calls: list[int] = []
+
+    failed: "Future[pl.DataFrame]" = Future()
+    chained = dispatcher.fChain(failed, lambda df: calls.append(df.height))
+    failed.set_exception(OSError("arquivo"))
+    with pytest.raises(OSError, match="arquivo"):
+        chained.result(timeout=5)
+    # The callback is not called without data.
+    assert calls == []
+
+    def failingCallback(df: pl.DataFrame) -> None:
+        raise KeyError("coluna")
+
+    source: "Future[pl.DataFrame]" = Future()
+    chained = dispatcher.fChain(source, failingCallback)
+    source.set_result(pl.DataFrame({"valor": [1.0]}))
+    with pytest.raises(KeyError, match="coluna"):
+        chained.result(timeout=5)
+
+    source = Future()
+    chained = dispatcher.fChain(source, lambda df: calls.append(df.height))
+    source.set_result(pl.DataFrame({"valor": [1.0, 2.0]}))
+    assert chained.result(timeout=5).height == 2
+    assert calls == [2]
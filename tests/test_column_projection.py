@@ -0,0 +1,91 @@
+from datetime import date
+from typing import Any
+import polars as pl
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraProjecaoDisco(Base):
+    __tablename__ = "teste_projecao_disco"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str]
+    nome_estacao: Mapped[str]
+    valor: Mapped[float | None]
+
+
+class LeituraProjecaoParquet(Base):
+    __tablename__ = "teste_projecao_parquet"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str]
+    nome_estacao: Mapped[str]
+    valor: Mapped[float | None]
+
+
+LEITURAS = pl.DataFrame({
+    "data": [date(2020, 1, 1), date(2020, 1, 2)],
+    "estacao": ["A508", "A505"],
+    "nome_estacao": ["ALMENARA", "ARAXA"],
+    "valor": [1.5, None],
+})
+
+
+@pytest.fixture(scope="module")
+def storedTables() -> None:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(LeituraProjecaoDisco, LEITURAS)
+    dataInterface.fStoreTable(LeituraProjecaoParquet, LEITURAS, storageTarget="parquet")
+    fWaitForWrites()
+
+
+@pytest.mark.parametrize("model", [LeituraProjecaoDisco, LeituraProjecaoParquet], ids=["disk", "parquet"])
+def test_only_the_requested_columns_are_loaded_and_cached(storedTables: None, model: type[Base]) -> None:
+    dataInterface = DataInterface()
+    tableName = model.__tablename__
+    dataInterface.resultCache.fInvalidate(tableName)
+
+    valores = dataInterface.fFetchTable(tableName, columns=["valor", "data"]).result()
+    assert valores.columns == ["valor", "data"]
+    assert valores.schema == pl.Schema({"valor": pl.Float64, "data": pl.Date})
+    # Each projection is its own cache entry; the full table is not answered from the narrower one.
+    estacoes = dataInterface.fFetchTable(tableName, columns=["estacao"]).result()
+    assert estacoes.columns == ["estacao"]
+    assert dataInterface.fFetchTable(tableName, columns=["valor", "data"]).result().equals(valores)
+    assert set(dataInterface.fFetchTable(tableName).result().columns) >= set(LEITURAS.columns)
+
+
+def test_disk_projection_reaches_the_select_list(storedTables: None) -> None:
+    engine = CentralDatabaseConnection()._engine
+    assert engine is not None
+    statements: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if "FROM teste_projecao_disco" in statement and not statement.startswith("EXPLAIN"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        DataInterface().fFetchTable(LeituraProjecaoDisco.__tablename__, useCache=False, columns=["valor"]).result()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 1
+    selectList = statements[0].split("FROM")[0]
+    assert "valor" in selectList and "nome_estacao" not in selectList
+
+
+def test_unknown_columns_are_rejected(storedTables: None) -> None:
+    with pytest.raises(ValueError, match="inexistente"):
+        DataInterface().fFetchTable(LeituraProjecaoDisco.__tablename__, useCache=False, columns=["inexistente"]).result()
@@ -0,0 +1,95 @@
+from collections.abc import Iterator
+from datetime import date, datetime
+from typing import Any
+import polars as pl
+import pytest
+from sqlalchemy import Connection, Index, Table, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from emater_data_science.data.database_data import columnar_io
+from emater_data_science.data.database_data.columnar_io import fInsertColumnar
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraColunar(Base):
+    __tablename__ = "teste_colunar_leitura"
+    __table_args__ = (
+        Index("ux_teste_colunar_leitura_natural_key", "estacao", "data", unique=True, info={"naturalKey": True}),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    estacao: Mapped[str]
+    data: Mapped[date]
+    medido_em: Mapped[datetime | None]
+    valor: Mapped[float | None]
+    origem: Mapped[str] = mapped_column(default="inmet")
+
+
+TABLE: Table = LeituraColunar.__table__  # type: ignore[assignment]
+
+LEITURAS = pl.DataFrame({
+    "estacao": ["A508", "A508", "A505"],
+    "data": [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 1)],
+    "medido_em": [datetime(2020, 1, 1, 12, 30, 15, 250), None, datetime(2020, 1, 1)],
+    "valor": [1.5, None, 3.0],
+    # Not a column of the table, so it is left out of the insert.
+    "coluna_extra": [1, 2, 3],
+})
+
+
+def fStoredRows(conn: Connection) -> list[tuple[Any, ...]]:
+    query = select(TABLE.c.estacao, TABLE.c.data, TABLE.c.medido_em, TABLE.c.valor, TABLE.c.origem)
+    return [tuple(row) for row in conn.execute(query.order_by(TABLE.c.estacao, TABLE.c.data))]
+
+
+@pytest.fixture(params=["multi-row", "single-row"])
+def connection(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> Iterator[Connection]:
+    if request.param == "single-row":
+        # Old SQLite builds allow few bound variables, and the insert falls back to executemany.
+        monkeypatch.setattr(columnar_io, "fSqliteVariableLimit", lambda conn: 10)
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        TABLE.create(bind=conn)
+        yield conn
+    engine.dispose()
+
+
+def test_nulls_dates_and_defaults_are_written_as_the_orm_would(connection: Connection) -> None:
+    assert fInsertColumnar(connection, TABLE, LEITURAS) == 3
+    assert fStoredRows(connection) == [
+        ("A505", date(2020, 1, 1), datetime(2020, 1, 1), 3.0, "inmet"),
+        ("A508", date(2020, 1, 1), datetime(2020, 1, 1, 12, 30, 15, 250), 1.5, "inmet"),
+        ("A508", date(2020, 1, 2), None, None, "inmet"),
+    ]
+
+
+def test_upsert_on_the_natural_key_only_counts_changed_rows(connection: Connection) -> None:
+    keyColumns = ["estacao", "data"]
+    fInsertColumnar(connection, TABLE, LEITURAS)
+    again = pl.DataFrame({
+        "estacao": ["A508", "A508", "A565"],
+        "data": [date(2020, 1, 1), date(2020, 1, 2), date(2020, 1, 1)],
+        "medido_em": [datetime(2020, 1, 1, 12, 30, 15, 250), None, None],
+        # The first row is unchanged, the second gets a value and the third is new.
+        "valor": [1.5, 2.0, None],
+    })
+
+    assert fInsertColumnar(connection, TABLE, again, "ignore", keyColumns) == 1
+    assert fInsertColumnar(connection, TABLE, again.with_columns(pl.col("valor").fill_null(4.0)), "update",
+                           keyColumns) == 2
+    assert fStoredRows(connection) == [
+        ("A505", date(2020, 1, 1), datetime(2020, 1, 1), 3.0, "inmet"),
+        ("A508", date(2020, 1, 1), datetime(2020, 1, 1, 12, 30, 15, 250), 1.5, "inmet"),
+        ("A508", date(2020, 1, 2), None, 2.0, "inmet"),
+        ("A565", date(2020, 1, 1), None, 4.0, "inmet"),
+    ]
+
+
+def test_upsert_needs_the_key_columns(connection: Connection) -> None:
+    with pytest.raises(ValueError, match="needs the natural key columns"):
+        fInsertColumnar(connection, TABLE, LEITURAS, "update")
+    with pytest.raises(ValueError, match=r"missing key columns \['data'\]"):
+        fInsertColumnar(connection, TABLE, LEITURAS.drop("data"), "update", ["estacao", "data"])
@@ -0,0 +1,21 @@
+import polars as pl
+
+from emater_data_science.data.compact_encoding import CompactEncoding
+
+ENCODING = CompactEncoding(tableName="teste_compacto", categoricalColumns=["municipio", "sigla"])
+
+
+def test_categorical_columns_are_only_kept_when_smaller() -> None:
+    df = pl.DataFrame({
+        "municipio": ["BELO HORIZONTE", "UBERLANDIA", None, "CONTAGEM"] * 250,
+        # Shorter than a category code, and already loaded as one by the storage layer.
+        "sigla": pl.Series(["MG", None, "BH", None] * 250, dtype=pl.Categorical),
+    })
+    encoded = ENCODING.fEncode(df)
+    assert encoded.schema["municipio"] == pl.Categorical
+    assert encoded.schema["sigla"] == pl.Utf8
+
+    rawBytes = ENCODING.fRawBytes(encoded)
+    assert isinstance(rawBytes, int)
+    assert rawBytes == df.with_columns(pl.col("sigla").cast(pl.Utf8)).estimated_size()
+    assert rawBytes > encoded.estimated_size()
@@ -0,0 +1,63 @@
+from datetime import date
+import polars as pl
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from emater_data_science.data.data_interface import DataInterface
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraLotes(Base):
+    __tablename__ = "teste_lotes_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    estacao_id: Mapped[int]
+    data: Mapped[date]
+    valor: Mapped[float | None]
+
+
+def fStationFrame(stationId: int, days: int) -> pl.DataFrame:
+    return pl.DataFrame({
+        "estacao_id": [stationId] * days,
+        "data": [date(2020, 1, day) for day in range(1, days + 1)],
+        "valor": [float(day) if day % 3 else None for day in range(1, days + 1)],
+    })
+
+
+def test_disk_table_is_fetched_in_batches_and_partitions() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraLotes.__tablename__
+    stations = [fStationFrame(3, 2), fStationFrame(1, 5), fStationFrame(2, 3)]
+    dataInterface.fStoreTable(LeituraLotes, pl.concat(stations))
+
+    # The read waits for the write queued before it.
+    batches = list(dataInterface.fFetchTableBatches(tableName, batchSize=4, columns=["estacao_id", "valor"]))
+    assert [batch.height for batch in batches] == [4, 4, 2]
+    assert all(batch.columns == ["estacao_id", "valor"] for batch in batches)
+    assert pl.concat(batches)["valor"].null_count() == 2
+
+    # Partitions larger than a batch come back whole, one per station, in key order.
+    partitions = list(dataInterface.fFetchTableBatches(
+        tableName, batchSize=2, partitionBy="estacao_id", columns=["data", "valor"]
+    ))
+    assert [(partition["estacao_id"][0], partition.height) for partition in partitions] == [(1, 5), (2, 3), (3, 2)]
+    assert partitions[0].select("data", "valor").equals(fStationFrame(1, 5).select("data", "valor"))
+
+    filtered = list(dataInterface.fFetchTableBatches(
+        tableName, batchSize=10, tableFilter={"estacao_id": [1, 2]}, dateColumn="data", startDate=date(2020, 1, 3)
+    ))
+    assert filtered[0].sort("estacao_id", "data").select("estacao_id", "data").rows() == [
+        (1, date(2020, 1, 3)), (1, date(2020, 1, 4)), (1, date(2020, 1, 5)), (2, date(2020, 1, 3)),
+    ]
+
+
+def test_closing_the_generator_early_releases_the_reader() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraLotes.__tablename__
+    for _ in range(3):
+        batches = dataInterface.fFetchTableBatches(tableName, batchSize=1)
+        assert next(batches).height == 1
+        batches.close()
+    assert dataInterface.fFetchTable(tableName, useCache=False).result(timeout=10).height == 10
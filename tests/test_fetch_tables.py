@@ -0,0 +1,48 @@
+import polars as pl
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.dimension_join import DimensionJoin
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Posto(Base):
+    __tablename__ = "teste_posto"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    nome: Mapped[str]
+
+
+class LeituraPosto(Base):
+    __tablename__ = "teste_posto_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    posto_id: Mapped[int]
+    valor: Mapped[float]
+    umidade: Mapped[float]
+
+
+LEITURA_POSTO = DimensionJoin(factTable=LeituraPosto.__tablename__, keyColumn="posto_id", dimensionTable=Posto.__tablename__)
+
+
+def test_requests_with_dimensions_keep_the_dimension_columns() -> None:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(Posto, pl.DataFrame({"id": [1, 2], "nome": ["Viçosa", "Caratinga"]}))
+    dataInterface.fStoreTable(
+        LeituraPosto, pl.DataFrame({"posto_id": [1, 2], "valor": [1.0, 2.0], "umidade": [80.0, 70.0]})
+    )
+    fWaitForWrites()
+
+    tableName = LeituraPosto.__tablename__
+    results = dataInterface.fFetchTables({
+        "valores": {"tableName": tableName, "columns": ["valor"], "withDimensions": True},
+        "umidades": {"tableName": tableName, "columns": ["umidade"], "withDimensions": True},
+        "simples": {"tableName": tableName, "columns": ["valor"]},
+    })
+    assert results["valores"].columns == ["valor", "posto_id", "nome"]
+    assert results["umidades"].sort("posto_id")["nome"].to_list() == ["Viçosa", "Caratinga"]
+    assert results["simples"].columns == ["valor"]
@@ -0,0 +1,43 @@
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.api_data.api_data_interface import ApiDataInterface
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraFuturo(Base):
+    __tablename__ = "teste_futuro_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    valor: Mapped[float]
+
+
+def test_reads_queued_during_shutdown_fail_instead_of_hanging(monkeypatch: pytest.MonkeyPatch) -> None:
+    tableName = LeituraFuturo.__tablename__
+    DataInterface().fStoreTable(LeituraFuturo, pl.DataFrame({"valor": [1.0]}))
+    fWaitForWrites()
+    connection = CentralDatabaseConnection()
+    monkeypatch.setattr(connection, "_is_shutting_down", True)
+
+    with pytest.raises(RuntimeError, match="shutting down"):
+        connection.fRead(tableName).result(timeout=5)
+    with pytest.raises(RuntimeError, match="shutting down"):
+        next(connection.fReadBatches(tableName, batchSize=10))
+    with pytest.raises(RuntimeError, match="shutting down"):
+        connection.fOpenSnapshot([tableName]).result(timeout=5)
+
+
+def test_failing_api_callback_resolves_the_future() -> None:
+    def callback(df: pl.DataFrame) -> None:
+        raise KeyError("coluna")
+
+    future = ApiDataInterface().fFetchTable("tabela_api", callback, None)
+    with pytest.raises(KeyError, match="coluna"):
+        future.result(timeout=10)
@@ -0,0 +1,57 @@
+from datetime import date
+from pathlib import Path
+import polars as pl
+
+from conftest import fInmetCsv, fWaitForWrites
+from emater_data_science.data.api_data.bc_credito_rural import CreditoRural, fProcessAndSaveCreditoRuralCsv
+from emater_data_science.data.api_data.first_request_data import EstacaoInmetComDadosMeteorologicos, fParseInmetCsv
+from emater_data_science.data.data_interface import DataInterface
+
+# One line per contract, as SICOR exports them: several lines share a municipality and month.
+CREDITO_CSV = """nomeUF,AnoEmissao,MesEmissao,Municipio,codMunicIbge,VlCusteio,VlInvestimento,VlComercializacao,VlIndustrializacao,AreaCusteio,AreaInvestimento
+MG,2020,1,ABAETE,3100203,"1000,50",,"10,0",,"2,5",
+MG,2020,1,ABAETE,3100203,"500,25","300,0","20,0",,"1,5",
+MG,2020,2,ABAETE,3100203,"200,0",,,,,
+MG,2020,1,ABADIA DOS DOURADOS,3100104,"50,0","5,0",,,,"4,0"
+SP,2020,1,ADAMANTINA,3500105,"999,0",,,,,
+"""
+
+
+def test_reloading_a_credit_csv_keeps_one_total_per_municipality_and_month(tmp_path: Path) -> None:
+    dataInterface = DataInterface()
+    csvPath = tmp_path / "credito_rural_2020.csv"
+    csvPath.write_text(CREDITO_CSV, encoding="utf8")
+    source = pl.read_csv(csvPath).filter(pl.col("nomeUF") == "MG")
+
+    for _ in range(2):
+        fProcessAndSaveCreditoRuralCsv(csvPath)
+        fWaitForWrites()
+        df = dataInterface.fFetchTable(CreditoRural.__tablename__, useCache=False).result()
+        assert df.select("cod_munic_ibge", "data", "vl_custeio", "vl_investimento", "area_custeio").sort(
+            "cod_munic_ibge", "data"
+        ).rows() == [
+            (3100104, date(2020, 1, 1), 50.0, 5.0, None),
+            (3100203, date(2020, 1, 1), 1500.75, 300.0, 4.0),
+            (3100203, date(2020, 2, 1), 200.0, None, None),
+        ]
+        # No contract is lost to the key: the state totals are the CSV's.
+        assert df["vl_custeio"].sum() == source["VlCusteio"].str.replace(",", ".").cast(pl.Float64).sum()
+        assert df["vl_comercializacao"].sum() == 30.0
+        assert df["vl_industrializacao"].null_count() == df.height
+
+
+def test_reloading_an_inmet_csv_does_not_duplicate_readings() -> None:
+    dataInterface = DataInterface()
+    tableName = EstacaoInmetComDadosMeteorologicos.__tablename__
+    for valor in ("1,5", "1,5", "2,0"):
+        dataInterface.fStoreTable(
+            EstacaoInmetComDadosMeteorologicos, fParseInmetCsv(fInmetCsv("CAPELINHA", "A511", 2003, valor))
+        )
+    fWaitForWrites()
+
+    df = dataInterface.fFetchTable(
+        tableName, useCache=False, dateColumn="data", startDate=date(2003, 1, 1), endDate=date(2003, 12, 31)
+    ).result()
+    # The last load wins on the (estacao_id, data, hora) key.
+    assert df.height == 3
+    assert df["precipitacao"].to_list() == [2.0] * 3
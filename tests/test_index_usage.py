@@ -0,0 +1,37 @@
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraPlano(Base):
+    __tablename__ = "teste_plano_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    valor: Mapped[float]
+
+
+def fPlansOf(tableName: str) -> int:
+    report = DataInterface().fGetIndexUsageReport()
+    return report.filter(pl.col("tableName") == tableName).height
+
+
+def test_query_plans_are_only_recorded_when_sampled(monkeypatch: pytest.MonkeyPatch) -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraPlano.__tablename__
+    dataInterface.fStoreTable(LeituraPlano, pl.DataFrame({"valor": [1.0, 2.0]}))
+    fWaitForWrites()
+
+    dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert fPlansOf(tableName) == 0
+
+    monkeypatch.setattr(CentralDatabaseConnection(), "indexUsageSampleRate", 1.0)
+    dataInterface.fFetchTable(tableName, useCache=False, tableFilter={"id": 1}).result()
+    assert fPlansOf(tableName) == 1
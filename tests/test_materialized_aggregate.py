@@ -0,0 +1,95 @@
+from datetime import date
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.materialized_aggregate import MaterializedAggregate
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraMensal(Base):
+    __tablename__ = "teste_agregado_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str]
+    valor: Mapped[float]
+
+
+class LeituraMensalParquet(Base):
+    __tablename__ = "teste_agregado_leitura_parquet"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+LEITURA_MENSAL = MaterializedAggregate(
+    name="teste_agregado_leitura_mensal",
+    sourceTable=LeituraMensal.__tablename__,
+    dateColumn="data",
+    groupBy=["estacao"],
+    aggregations=[pl.col("valor").sum().alias("total"), pl.col("valor").mean().alias("media")],
+)
+
+
+def test_only_the_groups_touched_by_a_write_are_refreshed(capsys: pytest.CaptureFixture[str]) -> None:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(LeituraMensal, pl.DataFrame({
+        "data": [date(2020, 1, 1), date(2020, 1, 15), date(2020, 2, 1), date(2020, 1, 1)],
+        "estacao": ["A", "A", "A", "B"],
+        "valor": [1.0, 3.0, 5.0, 7.0],
+    }))
+    df = dataInterface.fFetchAggregate(LEITURA_MENSAL).result(timeout=30)
+    assert df.sort("mes", "estacao").rows() == [
+        (2020, 1, "A", 4.0, 2.0), (2020, 1, "B", 7.0, 7.0), (2020, 2, "A", 5.0, 5.0),
+    ]
+    capsys.readouterr()
+
+    dataInterface.fStoreTable(LeituraMensal, pl.DataFrame({
+        "data": [date(2020, 2, 20)], "estacao": ["A"], "valor": [9.0],
+    }))
+    fWaitForWrites()
+    # The write only touches February of station A, the other groups are not read again.
+    assert f"refreshed aggregate {LEITURA_MENSAL.name}: 1 groups" in capsys.readouterr().out
+    df = dataInterface.fFetchAggregate(LEITURA_MENSAL, tableFilter={"estacao": "A"}).result(timeout=30)
+    assert df.sort("mes").rows() == [(2020, 1, "A", 4.0, 2.0), (2020, 2, "A", 14.0, 7.0)]
+
+
+def test_aggregate_is_only_mapped_once_it_is_built() -> None:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(LeituraMensal, pl.DataFrame({
+        "data": [date(2021, 1, 1)], "estacao": ["A"], "valor": [1.0],
+    }))
+    fWaitForWrites()
+    broken = MaterializedAggregate(
+        name="teste_agregado_leitura_quebrado",
+        sourceTable=LeituraMensal.__tablename__,
+        dateColumn="data",
+        aggregations=[pl.col("coluna_inexistente").sum()],
+    )
+    with pytest.raises(ValueError, match="coluna_inexistente"):
+        dataInterface.fFetchAggregate(broken).result(timeout=30)
+    assert broken.name not in dataInterface.tablesMapping
+
+
+def test_aggregate_over_a_parquet_table_is_rejected() -> None:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(
+        LeituraMensalParquet, pl.DataFrame({"data": [date(2021, 1, 1)], "valor": [1.0]}), storageTarget="parquet"
+    )
+    aggregate = MaterializedAggregate(
+        name="teste_agregado_leitura_parquet_mensal",
+        sourceTable=LeituraMensalParquet.__tablename__,
+        dateColumn="data",
+        aggregations=[pl.col("valor").sum()],
+    )
+    with pytest.raises(ValueError, match="use fAggregateTable"):
+        dataInterface.fFetchAggregate(aggregate)
+    assert aggregate.name not in dataInterface.tablesMapping
@@ -0,0 +1,76 @@
+from queue import Empty
+import threading
+import time
+import pytest
+
+from emater_data_science.data.database_data.database_operation import DatabaseOperation
+from emater_data_science.data.database_data.operation_queue import PriorityOperationQueue
+
+
+def fOperation(sequence: int, priority: str, tableName: str | None = None, isBarrier: bool = False) -> DatabaseOperation:
+    return DatabaseOperation(
+        function=lambda: None, tableName=tableName, sequence=sequence, priority=priority, isBarrier=isBarrier
+    )
+
+
+def fServed(queue: PriorityOperationQueue) -> list[int]:
+    served: list[int] = []
+    while True:
+        try:
+            served.append(queue.get_nowait().sequence)
+        except Empty:
+            return served
+
+
+def test_interactive_reads_are_served_before_queued_bulk_work() -> None:
+    queue = PriorityOperationQueue()
+    queue.put(fOperation(1, "bulk", "carga"))
+    queue.put(fOperation(2, "logging", "log"))
+    queue.put(fOperation(3, "bulk", "carga"))
+    queue.put(fOperation(4, "interactive", "leitura"))
+    assert fServed(queue) == [4, 1, 3, 2]
+
+
+def test_bulk_work_is_served_once_it_waited_past_its_bound() -> None:
+    queue = PriorityOperationQueue(maxWait={"bulk": 0.05})
+    queue.put(fOperation(1, "bulk", "carga"))
+    time.sleep(0.1)
+    queue.put(fOperation(2, "interactive", "leitura"))
+    queue.put(fOperation(3, "bulk", "carga"))
+    # The old bulk head goes first; the next bulk operation has not waited long enough.
+    assert fServed(queue) == [1, 2, 3]
+
+
+def test_operations_on_a_table_keep_their_order_across_classes() -> None:
+    queue = PriorityOperationQueue()
+    queue.put(fOperation(1, "bulk", "tabela"))
+    queue.put(fOperation(2, "bulk", "carga"))
+    queue.put(fOperation(3, "interactive", "tabela"))
+    # The read of the table jumps the unrelated bulk write, not the earlier write to its table.
+    assert fServed(queue) == [1, 3, 2]
+
+
+def test_barrier_waits_for_every_earlier_operation() -> None:
+    queue = PriorityOperationQueue()
+    queue.put(fOperation(1, "logging", "log"))
+    queue.put(fOperation(2, "interactive", isBarrier=True))
+    queue.put(fOperation(3, "bulk", "carga"))
+    # Later work of other classes is not held back by the barrier.
+    assert fServed(queue) == [3, 1, 2]
+
+
+def test_join_returns_when_every_task_is_done() -> None:
+    queue = PriorityOperationQueue()
+    queue.put(fOperation(1, "bulk", "carga"))
+    queue.put(fOperation(2, "interactive", "leitura"))
+    joined = threading.Event()
+    waiter = threading.Thread(target=lambda: (queue.join(), joined.set()))
+    waiter.start()
+    for _ in range(2):
+        queue.get(timeout=1)
+        assert not joined.wait(0.05)
+        queue.task_done()
+    waiter.join(timeout=5)
+    assert joined.is_set()
+    with pytest.raises(ValueError):
+        queue.task_done()
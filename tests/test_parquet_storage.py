@@ -0,0 +1,64 @@
+from datetime import date
+import polars as pl
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.library.table_aggregation import ColumnAggregation
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraParquet(Base):
+    __tablename__ = "teste_parquet_leitura"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    codigo: Mapped[str]
+    pressao: Mapped[float | None]
+    area: Mapped[float | None]
+
+
+def test_dataset_schema_comes_from_the_model() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraParquet.__tablename__
+    # The first frame has an all-null column and lacks another one.
+    dataInterface.fStoreTable(
+        LeituraParquet,
+        pl.DataFrame({"data": [date(2021, 5, 1)], "codigo": ["A1"], "area": [None]}),
+        storageTarget="parquet",
+    )
+    dataInterface.fStoreTable(
+        LeituraParquet,
+        pl.DataFrame({"data": [date(2022, 5, 1), date(2022, 6, 1)], "codigo": ["A1", "A2"],
+                      "pressao": [910.5, 905.0], "area": [1.5, 2.5]}),
+    )
+
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df.schema == pl.Schema(
+        {"data": pl.Date, "codigo": pl.Utf8, "pressao": pl.Float64, "area": pl.Float64}
+    )
+    assert df.sort("data")["pressao"].to_list() == [None, 910.5, 905.0]
+
+    totals = dataInterface.fAggregateTable(
+        tableName, ["codigo"], [ColumnAggregation("pressao", "mean"), ColumnAggregation("area", "sum")]
+    ).result().sort("codigo")
+    assert totals.to_dicts() == [
+        {"codigo": "A1", "pressao": 910.5, "area": 1.5},
+        {"codigo": "A2", "pressao": 905.0, "area": 2.5},
+    ]
+
+
+def test_writes_are_cast_to_the_dataset_types() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraParquet.__tablename__
+    # Integer measures are stored as the model's Float64.
+    dataInterface.fStoreTable(
+        LeituraParquet,
+        pl.DataFrame({"data": [date(2023, 1, 1)], "codigo": ["A3"], "pressao": [900], "area": [3]}),
+    )
+    df = dataInterface.fFetchTable(tableName, useCache=False, tableFilter={"codigo": "A3"}).result()
+    assert df.schema["pressao"] == pl.Float64
+    assert df["area"].to_list() == [3.0]
@@ -0,0 +1,57 @@
+from datetime import date, datetime
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraMotor(Base):
+    __tablename__ = "teste_motor_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    medido_em: Mapped[datetime | None]
+    estacao: Mapped[str | None]
+    valor: Mapped[float | None]
+    valido: Mapped[bool | None]
+
+
+LEITURAS = pl.DataFrame({
+    "data": [date(2020, 1, day) for day in range(1, 7)],
+    "medido_em": [datetime(2020, 1, 1, 12, 30, 15, 250), None, datetime(2020, 1, 3), None, None, None],
+    "estacao": ["A508", None, "A505", "A508", None, "A565"],
+    "valor": [1.5, None, -2.25, 0.0, None, 3.0],
+    "valido": [True, False, None, True, None, False],
+})
+
+
+@pytest.mark.parametrize("fetchOptions", [
+    {},
+    {"columns": ["data", "valor"]},
+    {"tableFilter": {"estacao": ["A508", "A565"]}, "dateColumn": "data", "startDate": date(2020, 1, 2)},
+    # No row matches: both engines still return the table's columns and types.
+    {"tableFilter": {"estacao": "inexistente"}},
+])
+def test_columnar_and_row_reads_return_the_same_frame(
+    monkeypatch: pytest.MonkeyPatch, fetchOptions: dict[str, object]
+) -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraMotor.__tablename__
+    if tableName not in dataInterface.tablesMapping:
+        dataInterface.fStoreTable(LeituraMotor, LEITURAS)
+        fWaitForWrites()
+    connection = CentralDatabaseConnection()
+
+    frames = {}
+    for readEngine in ("columnar", "rows"):
+        monkeypatch.setattr(connection, "readEngine", readEngine)
+        frames[readEngine] = dataInterface.fFetchTable(tableName, useCache=False, **fetchOptions).result()
+    assert frames["columnar"].schema == frames["rows"].schema
+    assert frames["columnar"].sort("data").rows() == frames["rows"].sort("data").rows()
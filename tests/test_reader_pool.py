@@ -0,0 +1,77 @@
+from collections.abc import Iterator
+import time
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fHoldWriter, fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraPoolA(Base):
+    __tablename__ = "teste_pool_leitura_a"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    valor: Mapped[float]
+
+
+class LeituraPoolB(Base):
+    __tablename__ = "teste_pool_leitura_b"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    valor: Mapped[float]
+
+
+@pytest.fixture(autouse=True)
+def storedTables() -> None:
+    dataInterface = DataInterface()
+    for model in (LeituraPoolA, LeituraPoolB):
+        if model.__tablename__ not in dataInterface.tablesMapping:
+            dataInterface.fStoreTable(model, pl.DataFrame({"valor": [1.0, 2.0]}))
+    fWaitForWrites()
+
+
+@pytest.fixture
+def withoutReaderPool() -> Iterator[CentralDatabaseConnection]:
+    connection = CentralDatabaseConnection()
+    previous = connection.readerPoolSize
+    connection.fSetReaderPoolSize(0)
+    try:
+        yield connection
+    finally:
+        connection.fSetReaderPoolSize(previous)
+
+
+def test_reads_run_while_a_long_write_holds_the_writer() -> None:
+    dataInterface = DataInterface()
+    with fHoldWriter(LeituraPoolA.__tablename__):
+        # Another table is read by the reader pool while the write runs.
+        other = dataInterface.fFetchTable(LeituraPoolB.__tablename__, useCache=False)
+        assert other.result(timeout=10)["valor"].to_list() == [1.0, 2.0]
+        # A read of the table being written waits for the write.
+        same = dataInterface.fFetchTable(LeituraPoolA.__tablename__, useCache=False)
+        time.sleep(0.3)
+        assert not same.done()
+    assert same.result(timeout=10).height >= 2
+
+
+def test_reads_go_through_the_writer_without_a_reader_pool(withoutReaderPool: CentralDatabaseConnection) -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraPoolB.__tablename__
+    with fHoldWriter():
+        pending = dataInterface.fFetchTable(tableName, useCache=False)
+        time.sleep(0.3)
+        assert not pending.done()
+        dataInterface.fStoreTable(LeituraPoolB, pl.DataFrame({"valor": [3.0]}))
+        after = dataInterface.fFetchTable(tableName, useCache=False)
+    # The reads run in queue order on the writer, around the write queued between them.
+    assert pending.result(timeout=10)["valor"].to_list() == [1.0, 2.0]
+    assert after.result(timeout=10)["valor"].to_list() == [1.0, 2.0, 3.0]
+    fWaitForWrites()
+    dataInterface.fDeleteRowsFromTable(tableName, {"valor": 3.0})
+    fWaitForWrites()
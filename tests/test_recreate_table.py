@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+import polars as pl
+import pytest
+from sqlalchemy import Index
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites, fWriteInmetZip
+from emater_data_science.data.api_data.first_request_data import (
+    EstacaoInmetComDadosMeteorologicos, fReplaceInmetYearFromZip,
+)
+from emater_data_science.data.data_interface import DataInterface
+
+
+class BaseAntiga(DeclarativeBase):
+    pass
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraAntiga(BaseAntiga):
+    __tablename__ = "teste_leitura_estacao"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str]
+    valor: Mapped[float | None]
+
+
+class Leitura(Base):
+    __tablename__ = "teste_leitura_estacao"
+    __table_args__ = (
+        Index("ux_teste_leitura_estacao_natural_key", "estacao_id", "data", unique=True, info={"naturalKey": True}),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao_id: Mapped[int]
+    valor: Mapped[float | None]
+
+
+def test_table_of_an_older_model_is_reported_and_recreated() -> None:
+    dataInterface = DataInterface()
+    tableName = Leitura.__tablename__
+    dataInterface.fStoreTable(LeituraAntiga, pl.DataFrame({"data": [date(2020, 1, 1)], "estacao": ["A"], "valor": [1.0]}))
+    fWaitForWrites()
+
+    novas = pl.DataFrame({"data": [date(2020, 1, 1)], "estacao_id": [1], "valor": [2.0]})
+    with pytest.raises(ValueError, match=r"fRecreateTable\(Leitura\)"):
+        dataInterface.fStoreTable(Leitura, novas)
+
+    dataInterface.fRecreateTable(Leitura).result()
+    dataInterface.fStoreTable(Leitura, novas)
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df.columns == ["id", "data", "estacao_id", "valor"]
+    assert df.select("estacao_id", "valor").rows() == [(1, 2.0)]
+
+
+def test_recreated_weather_table_is_reloaded_from_an_inmet_zip(tmp_path: Path) -> None:
+    dataInterface = DataInterface()
+    tableName = EstacaoInmetComDadosMeteorologicos.__tablename__
+    dataInterface.fRecreateTable(EstacaoInmetComDadosMeteorologicos).result(timeout=30)
+    assert dataInterface.tablesMapping[tableName] == "disk"
+
+    # The recreated table is on disk, so each load replaces the year on the SQLite writer.
+    stations = {"ALMENARA": "A508", "ARAXA": "A505", "BAMBUI": "A565"}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for valor in ("1,0", "3,0"):
+            zipPath = fWriteInmetZip(tmp_path / f"inmet_2000_{valor}.zip", 2000, stations, valor)
+            executor.submit(fReplaceInmetYearFromZip, zipPath, 2000).result(timeout=60)
+
+    df = dataInterface.fFetchTable(tableName, useCache=False, withDimensions=True).result()
+    assert df.height == 9
+    assert df.group_by("codigo").agg(pl.col("umidade").sum()).sort("codigo").rows() == [
+        ("A505", 9.0), ("A508", 9.0), ("A565", 9.0),
+    ]
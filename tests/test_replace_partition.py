@@ -0,0 +1,195 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+import threading
+import time
+import polars as pl
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fInmetCsv, fWaitForWrites, fWriteInmetZip
+from emater_data_science.data.api_data.first_request_data import (
+    EstacaoInmet, EstacaoInmetComDadosMeteorologicos, fParseInmetCsv, fReplaceInmetYearFromZip,
+)
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.parquet_data.parquet_storage import ParquetStorage
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraEstacao(Base):
+    __tablename__ = "teste_particao_estacao"
+    __parquet_date_column__ = "data"
+    __parquet_partition_by__ = ("estacao_id",)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    estacao_id: Mapped[int]
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+class LeituraEstacaoDisco(Base):
+    __tablename__ = "teste_particao_disco"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    estacao_id: Mapped[int]
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+def fStationFrame(stationId: int, year: int, valor: float) -> pl.DataFrame:
+    return pl.DataFrame({
+        "estacao_id": [stationId] * 3,
+        "data": [date(year, 1, 1), date(year, 6, 1), date(year, 12, 31)],
+        "valor": [valor] * 3,
+    })
+
+
+def test_year_is_replaced_from_a_stream_of_station_frames() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraEstacao.__tablename__
+    consumed: list[int] = []
+
+    def stations(year: int, valor: float) -> Iterator[pl.DataFrame]:
+        for stationId in (1, 2, 3):
+            consumed.append(stationId)
+            yield fStationFrame(stationId, year, valor)
+
+    dataInterface.fReplacePartition(LeituraEstacao, 2020, stations(2020, 1.0)).result()
+    dataInterface.fReplacePartition(LeituraEstacao, 2021, stations(2021, 1.0)).result()
+    dataInterface.fReplacePartition(LeituraEstacao, 2021, stations(2021, 2.0)).result()
+    assert consumed == [1, 2, 3] * 3
+
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df.height == 18
+    assert df.group_by(pl.col("data").dt.year()).agg(pl.col("valor").sum()).sort("data").rows() == [
+        (2020, 9.0), (2021, 18.0),
+    ]
+
+
+def test_parquet_table_is_fetched_in_batches() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraEstacao.__tablename__
+    fWaitForWrites()
+
+    batches = list(dataInterface.fFetchTableBatches(tableName, batchSize=4, columns=["data", "valor"]))
+    assert [batch.height for batch in batches] == [4, 4, 1, 4, 4, 1]
+    assert batches[0].columns == ["data", "valor"]
+
+    stations = list(dataInterface.fFetchTableBatches(tableName, partitionBy="estacao_id", startDate=date(2021, 1, 1),
+                                                     dateColumn="data"))
+    assert [(batch["estacao_id"][0], batch.height) for batch in stations] == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_year_of_a_disk_table_is_replaced_in_place() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraEstacaoDisco.__tablename__
+    dataInterface.fStoreTable(
+        LeituraEstacaoDisco, pl.concat([fStationFrame(1, 2020, 1.0), fStationFrame(1, 2021, 1.0)])
+    )
+    fWaitForWrites()
+
+    replaced = dataInterface.fReplacePartition(
+        LeituraEstacaoDisco, 2021, iter([fStationFrame(1, 2021, 5.0), fStationFrame(2, 2021, 5.0)])
+    )
+    assert replaced.result() == 3
+    assert dataInterface.tablesMapping[tableName] == "disk"
+
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df.group_by(pl.col("data").dt.year()).agg(pl.len(), pl.col("valor").sum()).sort("data").rows() == [
+        (2020, 3, 3.0), (2021, 6, 30.0),
+    ]
+
+
+def test_year_of_a_disk_weather_table_is_reloaded_from_an_inmet_zip(tmp_path: Path) -> None:
+    dataInterface = DataInterface()
+    tableName = EstacaoInmetComDadosMeteorologicos.__tablename__
+    # Loaded row by row before the table moved to Parquet, so it stays on disk, where the
+    # replace runs on the SQLite writer that consumes the stations.
+    dataInterface.fStoreTable(EstacaoInmetComDadosMeteorologicos, fParseInmetCsv(fInmetCsv("ALMENARA", "A508", 1999)))
+    fWaitForWrites()
+    assert dataInterface.tablesMapping[tableName] == "disk"
+
+    stations = {"ALMENARA": "A508", "ARAXA": "A505", "BAMBUI": "A565"}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for valor in ("1,5", "2,5"):
+            zipPath = fWriteInmetZip(tmp_path / f"inmet_2000_{valor}.zip", 2000, stations, valor)
+            # Waits on the writer's Future; it used to deadlock on the station lookups.
+            executor.submit(fReplaceInmetYearFromZip, zipPath, 2000).result(timeout=60)
+
+    keys = dataInterface.fFetchTable(EstacaoInmet.__tablename__, useCache=False).result()
+    assert keys.filter(pl.col("codigo").is_in(list(stations.values()))).sort("codigo").select("codigo").rows() == [
+        ("A505",), ("A508",), ("A565",),
+    ]
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df.group_by(pl.col("data").dt.year()).agg(pl.len(), pl.col("precipitacao").sum()).sort("data").rows() == [
+        (1999, 3, 4.5), (2000, 9, 22.5),
+    ]
+
+
+class LeituraConcorrente(Base):
+    __tablename__ = "teste_particao_concorrente"
+    __parquet_date_column__ = "data"
+    __parquet_partition_by__ = ("estacao_id",)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    estacao_id: Mapped[int]
+    data: Mapped[date]
+    valor: Mapped[float]
+
+
+def test_swap_waits_for_the_reads_scanning_the_table() -> None:
+    dataInterface = DataInterface()
+    storage = ParquetStorage()
+    tableName = LeituraConcorrente.__tablename__
+    dataInterface.fReplacePartition(LeituraConcorrente, 2020, fStationFrame(1, 2020, 1.0)).result()
+
+    with storage._readAccess(tableName):
+        replaced = dataInterface.fReplacePartition(LeituraConcorrente, 2020, fStationFrame(1, 2020, 2.0))
+        time.sleep(0.3)
+        # The new files are staged, but the year is not swapped under the running read.
+        assert not replaced.done()
+    replaced.result(timeout=10)
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df["valor"].to_list() == [2.0] * 3
+
+
+def test_reads_see_whole_years_while_they_are_swapped_compacted_and_deleted() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraConcorrente.__tablename__
+    dataInterface.fReplacePartition(
+        LeituraConcorrente, 2021, [fStationFrame(1, 2021, 1.0), fStationFrame(2, 2021, 1.0)]
+    ).result()
+    stop = threading.Event()
+    seen: list[tuple[int, float]] = []
+
+    def read() -> None:
+        while not stop.is_set():
+            df = dataInterface.fFetchTable(
+                tableName, useCache=False, dateColumn="data", startDate=date(2021, 1, 1)
+            ).result()
+            seen.append((df.height, df["valor"].sum()))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        readers = [executor.submit(read) for _ in range(3)]
+        for step in range(10):
+            valor = float(step % 2 + 1)
+            # Each station goes in its own file, so the compaction merges and the delete rewrites.
+            dataInterface.fReplacePartition(
+                LeituraConcorrente, 2021, [fStationFrame(1, 2021, valor), fStationFrame(2, 2021, valor)]
+            )
+            dataInterface.fStoreTable(LeituraConcorrente, fStationFrame(3, 2021, valor))
+            dataInterface.fCompactTable(tableName, years=[2021])
+            dataInterface.fDeleteRowsFromTable(tableName, {"estacao_id": 3})
+            dataInterface.fCompactTable(tableName, years=[2021]).result(timeout=30)
+        stop.set()
+        for reader in readers:
+            reader.result(timeout=30)
+
+    # A read sees the two stations of one replace, or that plus the appended station,
+    # never a missing year or the files of a compaction twice.
+    assert seen
+    assert set(seen) <= {(6, 6.0), (9, 9.0), (6, 12.0), (9, 18.0)}
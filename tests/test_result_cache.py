@@ -0,0 +1,63 @@
+from concurrent.futures import Future
+from typing import Any
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.database_data_interface import DatabaseDataInterface
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraCache(Base):
+    __tablename__ = "teste_cache_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    codigo: Mapped[str]
+    valor: Mapped[float]
+
+
+def test_write_to_a_table_evicts_its_cached_fetches() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraCache.__tablename__
+    dataInterface.fStoreTable(LeituraCache, pl.DataFrame({"codigo": ["A"], "valor": [1.0]}))
+    fWaitForWrites()
+
+    first = dataInterface.fFetchTable(tableName, columns=["codigo", "valor"]).result()
+    hits = dataInterface.resultCache.hits
+    assert dataInterface.fFetchTable(tableName, columns=["codigo", "valor"]).result().equals(first)
+    assert dataInterface.resultCache.hits == hits + 1
+
+    dataInterface.fStoreTable(LeituraCache, pl.DataFrame({"codigo": ["B"], "valor": [2.0]}))
+    misses = dataInterface.resultCache.misses
+    df = dataInterface.fFetchTable(tableName, columns=["codigo", "valor"]).result()
+    assert dataInterface.resultCache.misses == misses + 1
+    assert df.sort("codigo").rows() == [("A", 1.0), ("B", 2.0)]
+
+
+def test_concurrent_identical_fetches_share_one_read(monkeypatch: pytest.MonkeyPatch) -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraCache.__tablename__
+    dataInterface.resultCache.fInvalidate(tableName)
+    reads: list["Future[pl.DataFrame]"] = []
+
+    def fetchTable(self: DatabaseDataInterface, tableName: str, **kwargs: Any) -> "Future[pl.DataFrame]":
+        # Held open until the test resolves it, so the second fetch arrives while the first runs.
+        read: "Future[pl.DataFrame]" = Future()
+        reads.append(read)
+        return read
+
+    monkeypatch.setattr(DatabaseDataInterface, "fFetchTable", fetchTable)
+    first = dataInterface.fFetchTable(tableName, tableFilter={"codigo": "A"})
+    second = dataInterface.fFetchTable(tableName, tableFilter={"codigo": "A"})
+    assert len(reads) == 1
+    assert not first.done() and not second.done()
+
+    reads[0].set_result(pl.DataFrame({"codigo": ["A"], "valor": [1.0]}))
+    firstFrame, secondFrame = first.result(timeout=5), second.result(timeout=5)
+    # Each caller gets its own clone of the shared result.
+    assert firstFrame.equals(secondFrame) and firstFrame is not secondFrame
@@ -0,0 +1,63 @@
+from pathlib import Path
+from typing import Any
+import polars as pl
+import pytest
+from sqlalchemy import Engine, create_engine, event, text
+
+from emater_data_science.data.database_data.schema_catalog import SchemaCatalog
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalogo.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE leitura (id INTEGER PRIMARY KEY, valor FLOAT)"))
+    return engine
+
+
+def fCountStatements(engine: Engine) -> list[str]:
+    statements: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_tables_are_reflected_once_and_then_served_from_the_cache(engine: Engine) -> None:
+    catalog = SchemaCatalog(engine)
+    statements = fCountStatements(engine)
+
+    table = catalog.fGetTable("leitura")
+    assert catalog.fGetPolarsSchema("leitura") == {"id": pl.Int64(), "valor": pl.Float64()}
+    assert statements
+    statements.clear()
+
+    for _ in range(3):
+        assert catalog.fGetTable("leitura") is table
+        assert catalog.fHasTable("leitura")
+        catalog.fGetPolarsSchema("leitura")
+    # No PRAGMA or sqlite_master query once the table is known.
+    assert statements == []
+
+
+def test_schema_changes_are_seen_after_invalidation(engine: Engine) -> None:
+    catalog = SchemaCatalog(engine)
+    assert catalog.fListTables() == ["leitura"]
+    catalog.fGetTable("leitura")
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE leitura ADD COLUMN estacao VARCHAR"))
+        conn.execute(text("CREATE TABLE estacao (id INTEGER PRIMARY KEY)"))
+
+    assert "estacao" not in catalog.fGetTable("leitura").c
+    catalog.fInvalidate("leitura")
+    assert "estacao" in catalog.fGetTable("leitura").c
+    assert catalog.fGetPolarsSchema("leitura")["estacao"] == pl.Utf8()
+
+    # A table made by another connection is found on first use, and a registered one at once.
+    assert catalog.fGetTable("estacao").name == "estacao"
+    catalog.fRegisterTable("registrada")
+    assert catalog.fHasTable("registrada")
+    with pytest.raises(ValueError, match="'inexistente' not found"):
+        catalog.fGetTable("inexistente")
@@ -0,0 +1,46 @@
+import polars as pl
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraSnapshot(Base):
+    __tablename__ = "teste_snapshot_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    valor: Mapped[float]
+
+
+def fFrame(rows: int) -> pl.DataFrame:
+    return pl.DataFrame({"valor": [float(value) for value in range(rows)]})
+
+
+def test_snapshot_runs_after_bulk_writes_queued_before_it() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraSnapshot.__tablename__
+    dataInterface.fStoreTable(LeituraSnapshot, fFrame(1))
+    fWaitForWrites()
+
+    # Bulk writes still queued when the session opens; the interactive snapshot must not overtake them.
+    for _ in range(3):
+        dataInterface.fStoreTable(LeituraSnapshot, fFrame(20_000))
+    with dataInterface.fSnapshotSession([tableName]) as tables:
+        assert tables == [tableName]
+        assert dataInterface.fFetchTable(tableName, useCache=False).result().height == 60_001
+
+
+def test_snapshot_table_written_in_session_is_read_from_disk() -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraSnapshot.__tablename__
+    fWaitForWrites()
+    before = dataInterface.fFetchTable(tableName, useCache=False).result().height
+
+    with dataInterface.fSnapshotSession([tableName]) as tables:
+        assert tables == [tableName]
+        dataInterface.fStoreTable(LeituraSnapshot, fFrame(5))
+        assert dataInterface.fFetchTable(tableName, useCache=False).result().height == before + 5
@@ -0,0 +1,77 @@
+from datetime import date
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.library.table_aggregation import ColumnAggregation
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraAgregadaDisco(Base):
+    __tablename__ = "teste_agregacao_disco"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    codigo: Mapped[str]
+    nome: Mapped[str | None]
+    valor: Mapped[float | None]
+    direcao: Mapped[float | None]
+
+
+class LeituraAgregadaParquet(Base):
+    __tablename__ = "teste_agregacao_parquet"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    codigo: Mapped[str]
+    nome: Mapped[str | None]
+    valor: Mapped[float | None]
+    direcao: Mapped[float | None]
+
+
+LEITURAS = pl.DataFrame({
+    "data": [date(2020, 1, day) for day in (1, 2, 3, 4, 5)],
+    "codigo": ["A1", "A1", "A1", "A2", "A2"],
+    # "any" has to pick the same name on both backends even when it differs within a group.
+    "nome": [None, "ALMENARA", "ARAXA", None, None],
+    "valor": [1.0, -9999.0, 3.0, None, -9999.0],
+    "direcao": [350.0, 30.0, None, 90.0, None],
+})
+
+AGGREGATIONS = [
+    ColumnAggregation("valor", "sum", "soma", missingValue=-9999.0),
+    ColumnAggregation("valor", "mean", "media", missingValue=-9999.0),
+    ColumnAggregation("valor", "min", "minimo", missingValue=-9999.0),
+    ColumnAggregation("valor", "max", "maximo", missingValue=-9999.0),
+    ColumnAggregation("valor", "count", "contagem", missingValue=-9999.0),
+    ColumnAggregation("nome", "any"),
+    ColumnAggregation("direcao", "circular_mean"),
+]
+
+
+@pytest.mark.parametrize("model, storageTarget", [
+    (LeituraAgregadaDisco, "disk"),
+    (LeituraAgregadaParquet, "parquet"),
+])
+def test_aggregations_agree_on_both_backends(model: type[Base], storageTarget: str) -> None:
+    dataInterface = DataInterface()
+    tableName = model.__tablename__
+    dataInterface.fStoreTable(model, LEITURAS, storageTarget=storageTarget)
+    fWaitForWrites()
+    assert dataInterface.tablesMapping[tableName] == storageTarget
+
+    rows = dataInterface.fAggregateTable(tableName, ["codigo"], AGGREGATIONS).result().sort("codigo").to_dicts()
+    for row in rows:
+        row["direcao"] = pytest.approx(row["direcao"]) if row["direcao"] is not None else None
+    assert rows == [
+        {"codigo": "A1", "soma": 4.0, "media": 2.0, "minimo": 1.0, "maximo": 3.0, "contagem": 2,
+         "nome": "ARAXA", "direcao": 10.0},
+        {"codigo": "A2", "soma": 0.0, "media": None, "minimo": None, "maximo": None, "contagem": 0,
+         "nome": None, "direcao": 90.0},
+    ]
@@ -0,0 +1,80 @@
+from datetime import date
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.library.table_filter import DataFilter, TableFilter, asDataFilters
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraFiltroDisco(Base):
+    __tablename__ = "teste_filtro_disco"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str | None]
+    valor: Mapped[float | None]
+
+
+class LeituraFiltroParquet(Base):
+    __tablename__ = "teste_filtro_parquet"
+    __parquet_date_column__ = "data"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str | None]
+    valor: Mapped[float | None]
+
+
+LEITURAS = pl.DataFrame({
+    "data": [date(2020, 1, 1), date(2020, 6, 1), date(2021, 1, 1), date(2021, 6, 1), date(2022, 1, 1)],
+    "estacao": ["A508", "A505", None, "A565", "A508"],
+    "valor": [1.0, None, 3.0, None, 5.0],
+})
+
+
+def fTableFilter(*dataFilters: DataFilter) -> TableFilter:
+    tableFilter = TableFilter()
+    for dataFilter in dataFilters:
+        tableFilter.setFilter(dataFilter)
+    return tableFilter
+
+
+FILTERS = {
+    "list is IN": {"estacao": ["A508", "A565"]},
+    "None is IS NULL": {"valor": None},
+    "value and None": {"estacao": "A508", "valor": None},
+    "unknown dict column is ignored": {"coluna_inexistente": 1, "estacao": "A505"},
+    "!= leaves nulls out": fTableFilter(DataFilter("estacao", "!=", "A508")),
+    "not in leaves nulls out": fTableFilter(DataFilter("estacao", "not in", ["A505"])),
+    "range and is not null": fTableFilter(
+        DataFilter("data", ">=", date(2020, 6, 1)), DataFilter("valor", "is not null")
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def storedTables() -> None:
+    dataInterface = DataInterface()
+    dataInterface.fStoreTable(LeituraFiltroDisco, LEITURAS)
+    dataInterface.fStoreTable(LeituraFiltroParquet, LEITURAS, storageTarget="parquet")
+    fWaitForWrites()
+
+
+@pytest.mark.parametrize("model", [LeituraFiltroDisco, LeituraFiltroParquet], ids=["disk", "parquet"])
+@pytest.mark.parametrize("tableFilter", FILTERS.values(), ids=FILTERS.keys())
+def test_filters_select_the_same_rows_on_both_backends(
+    storedTables: None, model: type[Base], tableFilter: dict[str, object] | TableFilter
+) -> None:
+    dataFilters = asDataFilters(tableFilter, LEITURAS.columns)
+    expected = LEITURAS.filter(*(dataFilter.toPolarsExpression() for dataFilter in dataFilters))
+
+    df = DataInterface().fFetchTable(
+        model.__tablename__, useCache=False, tableFilter=tableFilter, columns=LEITURAS.columns
+    ).result()
+    assert df.sort("data").rows() == expected.sort("data").rows()
@@ -0,0 +1,90 @@
+from datetime import date
+from pathlib import Path
+import polars as pl
+import pytest
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from conftest import fHoldWriter, fWaitForWrites
+from emater_data_science.data.data_interface import DataInterface
+from emater_data_science.data.database_data.central_database_connection import CentralDatabaseConnection
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LeituraFila(Base):
+    __tablename__ = "teste_fila_leitura"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str | None]
+    valor: Mapped[float | None]
+
+
+def fLeituras(day: int) -> pl.DataFrame:
+    return pl.DataFrame({
+        "data": [date(2020, 1, day), date(2020, 2, day)],
+        "estacao": ["A508", None],
+        "valor": [None, float(day)],
+    })
+
+
+def test_writes_over_the_byte_budget_are_spilled_and_removed_once_inserted(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraFila.__tablename__
+    connection = CentralDatabaseConnection()
+    dataInterface.fStoreTable(LeituraFila, fLeituras(1))
+    fWaitForWrites()
+    monkeypatch.setattr(connection, "writeQueueByteBudget", 1)
+    monkeypatch.setattr(connection, "writeOverflowPolicy", "spill")
+    monkeypatch.setattr(connection, "spillDirectory", str(tmp_path))
+
+    with fHoldWriter():
+        # Only the first write fits in the queue, and not even that one if a log flush got there first.
+        for day in (2, 3, 4):
+            dataInterface.fStoreTable(LeituraFila, fLeituras(day))
+        # A log flush queued meanwhile may be spilled too.
+        spilled = [pl.read_ipc(path) for path in tmp_path.iterdir()]
+        readings = sorted(frame.rows() for frame in spilled if frame.columns == fLeituras(3).columns)
+        assert readings[-2:] == [fLeituras(3).rows(), fLeituras(4).rows()]
+        assert readings[:-2] in ([], [fLeituras(2).rows()])
+    monkeypatch.undo()
+    fWaitForWrites()
+
+    assert list(tmp_path.iterdir()) == []
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    expected = pl.concat([fLeituras(day) for day in (1, 2, 3, 4)])
+    assert df.drop("id").sort("data").equals(expected.sort("data"))
+
+
+class LeituraLote(Base):
+    __tablename__ = "teste_fila_lote"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    data: Mapped[date]
+    estacao: Mapped[str]
+    valor: Mapped[float | None]
+
+
+def test_a_failing_write_in_a_coalesced_batch_does_not_discard_the_others(
+    capsys: pytest.CaptureFixture[str]
+) -> None:
+    dataInterface = DataInterface()
+    tableName = LeituraLote.__tablename__
+    dataInterface.fStoreTable(LeituraLote, pl.DataFrame({"data": [date(2020, 1, 1)], "estacao": ["A508"]}))
+    fWaitForWrites()
+
+    with fHoldWriter():
+        for estacao in ("A505", None, "A565"):
+            # estacao is NOT NULL, so the second write breaks the batch's transaction.
+            dataInterface.fStoreTable(LeituraLote, pl.DataFrame({
+                "data": [date(2020, 1, 2), date(2020, 1, 3)], "estacao": [estacao] * 2, "valor": [1.0, 2.0],
+            }, schema_overrides={"estacao": pl.Utf8}))
+    fWaitForWrites()
+
+    assert "Error during coalesced insert of 3 writes" in capsys.readouterr().out
+    df = dataInterface.fFetchTable(tableName, useCache=False).result()
+    assert df.group_by("estacao").len().sort("estacao").rows() == [("A505", 2), ("A508", 1), ("A565", 2)]